@@ -0,0 +1,113 @@
+"""
+Microbenchmark of parsing responses: the single parse pipeline in
+habanero against the previous one, which parsed error bodies twice (once
+to test they were JSON, again for the message) and matched a regex on
+the content type of every response
+
+Usage::
+
+    python benchmarks/parse.py
+    python benchmarks/parse.py -n 200000
+"""
+
+import argparse
+import contextlib
+import json
+import re
+import timeit
+
+import httpx2
+
+from habanero.exceptions import RequestError
+from habanero.habanero_utils import check_json
+from habanero.request import parse_response
+
+HEADERS = {"Content-Type": "application/json;charset=UTF-8"}
+
+
+def old_check_json(x):
+    ctype = x.headers["Content-Type"]
+    matched = re.match("application/json", ctype)
+    if matched.__class__.__name__ == "NoneType":
+        raise RequestError(x.status_code, str(x.text))
+
+
+def old_is_json(x):
+    try:
+        json.loads(x.content)
+    except ValueError:
+        return False
+    return True
+
+
+def old_parse_json_err(x):
+    msg = x.json()["message"]
+    if isinstance(msg, str):
+        return msg
+    try:
+        return msg[0]["message"]
+    except TypeError:
+        return "failed to parse error message"
+
+
+def old_parse_response(r):
+    try:
+        r.raise_for_status()
+    except httpx2.HTTPStatusError as e:
+        if old_is_json(r):
+            raise RequestError(r.status_code, old_parse_json_err(r)) from e
+        r.raise_for_status()
+    old_check_json(r)
+    return r.json()
+
+
+def response(status, body):
+    request = httpx2.Request("GET", "https://api.crossref.org/works/10.1/a")
+    return httpx2.Response(status, headers=HEADERS, json=body, request=request)
+
+
+def run(fun, r):
+    with contextlib.suppress(RequestError, httpx2.HTTPStatusError):
+        fun(r)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", type=int, default=100000, help="calls per case")
+    args = parser.parse_args()
+
+    cases = {
+        "200 work": response(
+            200, {"status": "ok", "message-type": "work", "message": {"DOI": "10.1/a"}}
+        ),
+        "404 json error": response(
+            404,
+            {
+                "status": "failed",
+                "message-type": "validation-failure",
+                "message": [{"message": "Resource not found."}],
+            },
+        ),
+        "400 json error": response(
+            400, {"status": "failed", "message": "Invalid filter"}
+        ),
+    }
+    print("%-16s %12s %12s %8s" % ("case", "old (us)", "new (us)", "speedup"))
+    for name, r in cases.items():
+        old = timeit.timeit(lambda r=r: run(old_parse_response, r), number=args.n)
+        new = timeit.timeit(lambda r=r: run(parse_response, r), number=args.n)
+        print(
+            "%-16s %12.2f %12.2f %7.2fx"
+            % (name, old / args.n * 1e6, new / args.n * 1e6, old / new)
+        )
+    r = cases["200 work"]
+    old = timeit.timeit(lambda: old_check_json(r), number=args.n)
+    new = timeit.timeit(lambda: check_json(r), number=args.n)
+    print(
+        "%-16s %12.2f %12.2f %7.2fx"
+        % ("content type", old / args.n * 1e6, new / args.n * 1e6, old / new)
+    )
+
+
+if __name__ == "__main__":
+    main()
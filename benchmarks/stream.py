@@ -0,0 +1,58 @@
+"""
+Benchmark of streaming pages of works: splitting the items out of a
+response body as it's read with :class:`~habanero.stream.ItemSplitter`,
+then decoding each, against decoding the whole page at once. Streaming
+costs more CPU per page, for less memory per page and the first items
+sooner.
+
+Usage::
+
+    python benchmarks/stream.py
+    python benchmarks/stream.py -n 50
+"""
+
+import argparse
+import timeit
+
+from work import page
+
+from habanero.decoder import json_decoder
+from habanero.stream import ItemSplitter
+
+CHUNK = 65536
+
+
+def split(content, decode):
+    splitter = ItemSplitter()
+    items = []
+    for i in range(0, len(content), CHUNK):
+        items.extend(decode(z) for z in splitter.feed(content[i : i + CHUNK]))
+    decode(splitter.close())
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", type=int, default=20, help="pages per case")
+    args = parser.parse_args()
+
+    content = page()
+    print("%s bytes per page, read in chunks of %s bytes" % (len(content), CHUNK))
+    print("%-8s %14s %14s %8s" % ("decoder", "whole (ms)", "stream (ms)", "ratio"))
+    for name in ("json", "orjson", "msgspec"):
+        try:
+            decode = json_decoder(name)
+        except ImportError:
+            continue
+        whole = timeit.timeit(lambda decode=decode: decode(content), number=args.n)
+        stream = timeit.timeit(
+            lambda decode=decode: split(content, decode), number=args.n
+        )
+        print(
+            "%-8s %14.2f %14.2f %7.1fx"
+            % (name, whole / args.n * 1e3, stream / args.n * 1e3, stream / whole)
+        )
+
+
+if __name__ == "__main__":
+    main()
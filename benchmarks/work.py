@@ -0,0 +1,121 @@
+"""
+Benchmark of decoding pages of works to dicts against decoding them to
+:class:`~habanero.Work` records: time per page and memory per record
+kept. Works are decoded straight from bytes when msgspec is installed.
+
+Usage::
+
+    python benchmarks/work.py
+    python benchmarks/work.py -n 50
+"""
+
+import argparse
+import json
+import timeit
+import tracemalloc
+
+from habanero.decoder import json_decoder
+from habanero.work import _has_msgspec, decode_work_page
+
+ROWS = 1000
+
+
+def item(i):
+    return {
+        "indexed": {
+            "date-parts": [[2024, 3, 1]],
+            "date-time": "2024-03-01T10:00:00Z",
+            "timestamp": 1709287200000,
+        },
+        "reference-count": 40,
+        "publisher": "Some Publisher",
+        "issue": "4",
+        "license": [
+            {
+                "start": {"date-parts": [[2020, 1, 1]]},
+                "content-version": "vor",
+                "delay-in-days": 0,
+                "URL": "http://creativecommons.org/licenses/by/4.0/",
+            }
+        ],
+        "content-domain": {"domain": [], "crossmark-restriction": False},
+        "short-container-title": ["J. Ecol."],
+        "DOI": "10.1000/%s" % i,
+        "type": "journal-article",
+        "created": {"date-parts": [[2020, 1, 2]], "timestamp": 1577923200000},
+        "page": "100-120",
+        "source": "Crossref",
+        "is-referenced-by-count": 12,
+        "title": ["A study of things number %s" % i],
+        "prefix": "10.1000",
+        "volume": "12",
+        "author": [
+            {
+                "given": "Given%s" % j,
+                "family": "Family%s" % j,
+                "sequence": "first" if j == 0 else "additional",
+                "affiliation": [{"name": "University of Somewhere"}],
+            }
+            for j in range(4)
+        ],
+        "member": "1",
+        "reference": [
+            {"key": "ref%s" % j, "DOI": "10.1000/ref%s" % j} for j in range(40)
+        ],
+        "container-title": ["Journal of Ecology"],
+        "link": [
+            {
+                "URL": "https://example.org/%s.pdf" % i,
+                "content-type": "application/pdf",
+                "content-version": "vor",
+                "intended-application": "text-mining",
+            }
+        ],
+        "references-count": 40,
+        "issued": {"date-parts": [[2020, 1, 2]]},
+        "published": {"date-parts": [[2020, 1, 2]]},
+        "ISSN": ["0022-0477", "1365-2745"],
+        "subject": ["Ecology"],
+        "URL": "https://doi.org/10.1000/%s" % i,
+        "score": 1.0,
+    }
+
+
+def page():
+    message = {
+        "total-results": ROWS,
+        "items": [item(i) for i in range(ROWS)],
+        "next-cursor": "abc",
+    }
+    return json.dumps(
+        {"status": "ok", "message-type": "work-list", "message": message}
+    ).encode()
+
+
+def retained(fun, content):
+    """Bytes still allocated per record after decoding a page"""
+    tracemalloc.start()
+    res = fun(content)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del res
+    return size / ROWS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-n", type=int, default=20, help="pages per case")
+    args = parser.parse_args()
+
+    content = page()
+    decode = json_decoder()
+    cases = {"dict": decode, "Work": lambda x: decode_work_page(x, decode)}
+    print("msgspec installed: %s; %s bytes per page" % (_has_msgspec, len(content)))
+    print("%-6s %14s %18s" % ("items", "ms per page", "bytes per record"))
+    for name, fun in cases.items():
+        t = timeit.timeit(lambda fun=fun: fun(content), number=args.n)
+        print("%-6s %14.2f %18.0f" % (name, t / args.n * 1e3, retained(fun, content)))
+
+
+if __name__ == "__main__":
+    main()
@@ -41,7 +41,14 @@ __version__ = "2.9.2"
 __author__ = "Scott Chamberlain"
 __license__ = "MIT"
 
-from .cn import content_negotiation, csl_styles
+from .cache import Cache, MemoryCache, SQLiteCache
+from .cn import async_content_negotiation, content_negotiation, csl_styles
 from .counts import citation_count
-from .crossref import Crossref, WorksContainer, WorksQuery
+from .crossref import AsyncCrossref, Crossref, WorksContainer, WorksQuery
 from .exceptions import Error, RequestError
+from .harvest import Checkpoint
+from .ratelimit import RateLimiter
+from .retry import Retry
+from .session import AsyncSession, Session
+from .sink import NDJSONSink
+from .work import Work
@@ -0,0 +1,294 @@
+import json
+from datetime import datetime, timezone
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.compute as pc  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+except ImportError:
+    _has_pyarrow = False
+else:
+    _has_pyarrow = True
+
+# fields of a Crossref date, in an arrow struct
+DATE_FIELDS = ("date-parts", "date-time", "timestamp", "version")
+DATE_TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# fields kept for each contributor, in an arrow struct; columns with other
+# fields are stored as JSON text
+CONTRIBUTOR_FIELDS = ("given", "family", "name", "ORCID", "sequence", "suffix")
+CONTRIBUTOR_KEYS = ("author", "editor", "chair", "translator")
+AFFILIATION_ID_FIELDS = ("id", "id-type", "asserted-by")
+ROLE_FIELDS = ("role", "vocabulary")
+
+# metadata key of each field, giving how the column is encoded
+KIND = b"habanero"
+
+
+def check_pyarrow():
+    if not _has_pyarrow:
+        raise ImportError("pyarrow is required; install it with: pip install pyarrow")
+
+
+def column_kind(key, values) -> str:
+    """
+    How a column is stored: `"string"`, `"int"`, `"float"`, `"bool"`,
+    `"strings"` (lists of strings), `"date"` (Crossref dates with one list
+    of date parts), `"contributors"`, or else `"json"` (JSON text). Values
+    with fields the arrow types don't have are stored as JSON text, so that
+    they're read back as they were
+    """
+    present = [z for z in values if z is not None]
+    if all(isinstance(z, str) for z in present):
+        return "string"
+    if all(isinstance(z, bool) for z in present):
+        return "bool"
+    if all(isinstance(z, int) and not isinstance(z, bool) for z in present):
+        return "int"
+    if all(isinstance(z, (int, float)) and not isinstance(z, bool) for z in present):
+        return "float"
+    if all(is_date(z) for z in present):
+        return "date"
+    if all(isinstance(z, list) and all(isinstance(y, str) for y in z) for z in present):
+        return "strings"
+    if key in CONTRIBUTOR_KEYS and all(
+        isinstance(z, list) and all(is_contributor(y) for y in z) for z in present
+    ):
+        return "contributors"
+    return "json"
+
+
+def encode(values, kind) -> list:
+    """Values of a column as stored in arrow"""
+    if kind == "date":
+        return [None if z is None else date_row(z) for z in values]
+    if kind == "contributors":
+        return [None if z is None else [contributor_row(y) for y in z] for z in values]
+    if kind == "json":
+        return [None if z is None else json.dumps(z) for z in values]
+    return values
+
+
+def decode(values, kind) -> list:
+    """Values of a column read from arrow, as in Crossref responses"""
+    if kind == "date":
+        return [None if z is None else date_dict(z) for z in values]
+    if kind == "contributors":
+        return [None if z is None else [contributor_dict(y) for y in z] for z in values]
+    if kind == "json":
+        return [None if z is None else json.loads(z) for z in values]
+    return values
+
+
+def is_strings(x) -> bool:
+    return isinstance(x, list) and all(isinstance(z, str) for z in x)
+
+
+def is_date(x) -> bool:
+    """Whether `x` is a Crossref date that fits the arrow `date` struct"""
+    if not isinstance(x, dict) or "date-parts" not in x or set(x) - set(DATE_FIELDS):
+        return False
+    parts = x["date-parts"]
+    if not isinstance(parts, list) or len(parts) != 1:
+        return False
+    if not isinstance(parts[0], list) or not all(
+        z is None or (isinstance(z, int) and not isinstance(z, bool)) for z in parts[0]
+    ):
+        return False
+    if "date-time" in x:
+        try:
+            when = datetime.strptime(x["date-time"], DATE_TIME_FORMAT)
+        except (TypeError, ValueError):
+            return False
+        if when.strftime(DATE_TIME_FORMAT) != x["date-time"]:
+            return False
+    if "timestamp" in x and (
+        not isinstance(x["timestamp"], int) or isinstance(x["timestamp"], bool)
+    ):
+        return False
+    return "version" not in x or isinstance(x["version"], str)
+
+
+def is_contributor(x) -> bool:
+    """Whether `x` is a contributor that fits the arrow contributor struct"""
+    if not isinstance(x, dict):
+        return False
+    for k, v in x.items():
+        if k in CONTRIBUTOR_FIELDS:
+            ok = isinstance(v, str)
+        elif k == "authenticated-orcid":
+            ok = isinstance(v, bool)
+        elif k == "affiliation":
+            ok = isinstance(v, list) and all(is_affiliation(z) for z in v)
+        elif k == "role":
+            ok = is_records(v, ROLE_FIELDS)
+        else:
+            ok = False
+        if not ok:
+            return False
+    return True
+
+
+def is_affiliation(x) -> bool:
+    if not isinstance(x, dict):
+        return False
+    for k, v in x.items():
+        if k == "name":
+            ok = isinstance(v, str)
+        elif k == "place":
+            ok = is_strings(v)
+        elif k == "id":
+            ok = is_records(v, AFFILIATION_ID_FIELDS)
+        else:
+            ok = False
+        if not ok:
+            return False
+    return True
+
+
+def is_records(x, fields) -> bool:
+    """Whether `x` is a list of dicts of strings, with keys among `fields`"""
+    return isinstance(x, list) and all(
+        isinstance(z, dict)
+        and set(z) <= set(fields)
+        and all(isinstance(y, str) for y in z.values())
+        for z in x
+    )
+
+
+def first_date_parts(x):
+    parts = (x or {}).get("date-parts") or [[]]
+    if not parts[0] or parts[0][0] is None:
+        return None
+    return parts[0]
+
+
+def date_row(x) -> dict:
+    when = x.get("date-time")
+    if when is not None:
+        when = datetime.strptime(when, DATE_TIME_FORMAT).replace(tzinfo=timezone.utc)
+    return {
+        "date-parts": x["date-parts"][0],
+        "date-time": when,
+        "timestamp": x.get("timestamp"),
+        "version": x.get("version"),
+    }
+
+
+def date_dict(x) -> dict:
+    out = drop_none(x)
+    out["date-parts"] = [x["date-parts"]]
+    if "date-time" in out:
+        out["date-time"] = out["date-time"].strftime(DATE_TIME_FORMAT)
+    return out
+
+
+def contributor_row(x) -> dict:
+    row = {k: x.get(k) for k in CONTRIBUTOR_FIELDS}
+    row["authenticated-orcid"] = x.get("authenticated-orcid")
+    affiliation = x.get("affiliation")
+    row["affiliation"] = (
+        None
+        if affiliation is None
+        else [
+            {"name": z.get("name"), "place": z.get("place"), "id": z.get("id")}
+            for z in affiliation
+        ]
+    )
+    row["role"] = x.get("role")
+    return row
+
+
+def contributor_dict(x) -> dict:
+    out = drop_none(x)
+    if "affiliation" in out:
+        out["affiliation"] = [drop_none(z) for z in out["affiliation"]]
+        for z in out["affiliation"]:
+            if "id" in z:
+                z["id"] = [drop_none(y) for y in z["id"]]
+    if "role" in out:
+        out["role"] = [drop_none(z) for z in out["role"]]
+    return out
+
+
+def drop_none(x) -> dict:
+    return {k: v for k, v in x.items() if v is not None}
+
+
+def arrow_type(kind):
+    date = pa.struct(
+        [
+            ("date-parts", pa.list_(pa.int32())),
+            ("date-time", pa.timestamp("s", tz="UTC")),
+            ("timestamp", pa.int64()),
+            ("version", pa.string()),
+        ]
+    )
+    affiliation = pa.struct(
+        [
+            ("name", pa.string()),
+            ("place", pa.list_(pa.string())),
+            (
+                "id",
+                pa.list_(pa.struct([(z, pa.string()) for z in AFFILIATION_ID_FIELDS])),
+            ),
+        ]
+    )
+    contributor = pa.struct(
+        [(z, pa.string()) for z in CONTRIBUTOR_FIELDS]
+        + [
+            ("authenticated-orcid", pa.bool_()),
+            ("affiliation", pa.list_(affiliation)),
+            ("role", pa.list_(pa.struct([(z, pa.string()) for z in ROLE_FIELDS]))),
+        ]
+    )
+    return {
+        "string": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "bool": pa.bool_(),
+        "strings": pa.list_(pa.string()),
+        "date": date,
+        "contributors": pa.list_(contributor),
+        "json": pa.string(),
+    }[kind]
+
+
+def to_table(columns):
+    """
+    An arrow table from `(key, values)` pairs, recording how each column
+    is encoded in the metadata of its field
+    """
+    check_pyarrow()
+    fields, arrays = [], []
+    for key, values in columns:
+        kind = column_kind(key, values)
+        typ = arrow_type(kind)
+        arrays.append(pa.array(encode(values, kind), type=typ))
+        fields.append(pa.field(key, typ, metadata={KIND: kind.encode()}))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def table_column(table, key) -> list:
+    """The values of column `key` of `table`, as in Crossref responses"""
+    field = table.schema.field(key)
+    kind = (field.metadata or {}).get(KIND, b"").decode()
+    return decode(table.column(key).to_pylist(), kind)
+
+
+def table_date_parts(table, key) -> list:
+    """The date parts of date column `key` of `table`, without making dicts"""
+    field = table.schema.field(key)
+    if (field.metadata or {}).get(KIND) != b"date":
+        raise ValueError("%r is not a date column" % key)
+    return pc.struct_field(table.column(key), "date-parts").to_pylist()
+
+
+def read_parquet(path, memory_map=True):
+    check_pyarrow()
+    return pq.read_table(path, memory_map=memory_map)
+
+
+def write_parquet(table, path, **kwargs) -> None:
+    check_pyarrow()
+    pq.write_table(table, path, **kwargs)
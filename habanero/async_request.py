@@ -0,0 +1,350 @@
+import asyncio
+import math
+import warnings
+from functools import partial
+
+import httpx2
+from urllib3.exceptions import ConnectTimeoutError
+
+from .habanero_utils import check_json, make_ua
+from .prefetch import async_read_ahead
+from .request import (
+    assemble_batches,
+    batch_tasks,
+    id_url,
+    merge_pages,
+    offset_pages,
+    offset_rows,
+    parse_id_response,
+    parse_response,
+)
+from .request_class import Request, make_payload
+from .stream import ItemSplitter
+from .work import decode_work, decode_work_page
+
+
+async def async_request(
+    cr,
+    path,
+    ids=None,
+    query=None,
+    filters=None,
+    offset=None,
+    limit=None,
+    sample=None,
+    sort=None,
+    order=None,
+    facet=None,
+    select=None,
+    works=None,
+    cursor=None,
+    cursor_max=5000,
+    agency=False,
+    progress_bar=False,
+    should_warn=False,
+    max_workers=None,
+    **kwargs,
+):
+    """Async HTTP request helper, the asyncio counterpart of `request`"""
+    url = cr.base_url + path
+
+    if cursor_max and not isinstance(cursor_max, int):
+        raise ValueError("cursor_max must be of class int")
+
+    payload = make_payload(
+        query,
+        filters,
+        offset,
+        limit,
+        sample,
+        sort,
+        order,
+        facet,
+        select,
+        cursor,
+        kwargs,
+    )
+
+    if ids is None:
+        url = url.strip("/")
+        try:
+            r = await cr.session.get(
+                url,
+                params=payload,
+                headers=make_ua(cr.mailto, cr.ua_string),
+                timeout=cr.timeout,
+            )
+        except httpx2.HTTPError as e:
+            raise RuntimeError(f"HTTP Exception for {e.request.url} - {e}") from e
+        return parse_response(r, cr.session.decoder)
+
+    if isinstance(ids, str):
+        ids = ids.split()
+    if isinstance(ids, int):
+        ids = [ids]
+
+    async def fetch(ident):
+        if works:
+            return await AsyncRequest(
+                cr.mailto,
+                cr.ua_string,
+                cr.timeout,
+                url,
+                str(ident) + "/works",
+                query,
+                filters,
+                offset,
+                limit,
+                sample,
+                sort,
+                order,
+                facet,
+                select,
+                cursor,
+                cursor_max,
+                None,
+                progress_bar,
+                session=cr.session,
+                **kwargs,
+            ).do_request(should_warn=should_warn), None
+        r = await cr.session.get(
+            id_url(url, ident, agency),
+            params=payload,
+            headers=make_ua(cr.mailto, cr.ua_string),
+            timeout=cr.timeout,
+        )
+        return parse_id_response(r, ident, should_warn, cr.session.decoder)
+
+    if max_workers:
+        slots = asyncio.Semaphore(max_workers)
+
+        async def bounded_fetch(ident):
+            async with slots:
+                return await fetch(ident)
+
+        results = await asyncio.gather(*[bounded_fetch(z) for z in ids])
+    else:
+        results = await asyncio.gather(*[fetch(z) for z in ids])
+
+    coll = []
+    for res, mssg in results:
+        if mssg is not None:
+            warnings.warn(mssg, stacklevel=2)
+        coll.append(res)
+    if len(coll) == 1:
+        coll = coll[0]
+    return coll
+
+
+async def async_offset_request(
+    cr,
+    path,
+    query,
+    filters,
+    offset,
+    limit,
+    sort,
+    order,
+    facet,
+    select,
+    offset_max,
+    max_workers,
+    kwargs,
+):
+    """Async offset paging, the asyncio counterpart of `offset_request`"""
+    rows, start = offset_rows(offset, limit, offset_max)
+    slots = asyncio.Semaphore(max_workers or 4)
+
+    async def fetch(off, facet=None):
+        async with slots:
+            return await async_request(
+                cr,
+                path,
+                None,
+                query,
+                filters,
+                off or None,
+                rows,
+                None,
+                sort,
+                order,
+                facet,
+                select,
+                **kwargs,
+            )
+
+    first = await fetch(start, facet)
+    offsets = offset_pages(first, start, rows, offset_max)
+    pages = await asyncio.gather(*[fetch(z) for z in offsets])
+    return merge_pages(first, pages, offset_max)
+
+
+class AsyncRequest(Request):
+    """
+    Habanero: async request class
+
+    The asyncio counterpart of :class:`Request`; `session` must be an
+    :class:`~habanero.session.AsyncSession`
+    """
+
+    async def do_request(self, should_warn=False):
+        payload = self._payload()
+        js = await self._req(payload=payload, should_warn=should_warn)
+        if js is None:
+            return js
+        cu = js["message"].get("next-cursor")
+        max_avail = js["message"]["total-results"]
+        res = await self._redo_req(js, payload, cu, max_avail, should_warn)
+        return res
+
+    async def _redo_req(self, js, payload, cu, max_avail, should_warn):
+        cursor_max = math.inf if self.cursor_max is None else self.cursor_max
+        if cu is not None and cursor_max > len(js["message"]["items"]):
+            pages = self._cursor_pages(js, payload, cu, max_avail, should_warn)
+            return [js] + [z async for z in pages]
+        else:
+            return js
+
+    async def iter_pages(self, should_warn=False, decode=None):
+        payload = self._payload()
+        js = await self._req(payload=payload, should_warn=should_warn, decode=decode)
+        if js is None:
+            return
+        yield js
+        cu = js["message"].get("next-cursor")
+        max_avail = js["message"]["total-results"]
+        async for page in self._cursor_pages(
+            js, payload, cu, max_avail, should_warn, decode
+        ):
+            yield page
+
+    async def iter_items(
+        self, should_warn=False, prefetch=0, typed=False, stream=False
+    ):
+        if stream:
+            if prefetch:
+                raise ValueError("prefetch can not be used with stream")
+            decode = self.session.decoder
+            if typed:
+                decode = partial(decode_work, decode=self.session.decoder)
+            async for item in self._stream_items(should_warn, decode):
+                yield item
+            return
+        decode = None
+        if typed:
+            decode = partial(decode_work_page, decode=self.session.decoder)
+        pages = self.iter_pages(should_warn=should_warn, decode=decode)
+        if prefetch:
+            pages = async_read_ahead(pages, prefetch)
+        async for page in pages:
+            for item in page["message"]["items"]:
+                yield item
+
+    async def _cursor_pages(self, js, payload, cu, max_avail, should_warn, decode=None):
+        total = len(js["message"]["items"])
+        cursor_max = math.inf if self.cursor_max is None else self.cursor_max
+        if cu is None or cursor_max <= total:
+            return
+        pbar = self._progress_bar(max_avail) if self.progress_bar else None
+        try:
+            while cu is not None and cursor_max > total and total < max_avail:
+                payload["cursor"] = cu
+                out = await self._req(
+                    payload=payload, should_warn=should_warn, decode=decode
+                )
+                if out is None:
+                    return
+                cu = out["message"].get("next-cursor")
+                total += len(out["message"]["items"])
+                if pbar is not None:
+                    pbar.update(1)
+                yield out
+        finally:
+            if pbar is not None:
+                pbar.close()
+
+    async def _stream_items(self, should_warn, decode):
+        payload = self._payload()
+        cursor_max = math.inf if self.cursor_max is None else self.cursor_max
+        total, pbar = 0, None
+        try:
+            while True:
+                splitter, n, failed = ItemSplitter(), 0, None
+                try:
+                    async with self.session.stream(
+                        self._url(),
+                        params=payload,
+                        headers=make_ua(self.mailto, self.ua_string),
+                        timeout=self.timeout,
+                    ) as r:
+                        if not r.is_success:
+                            await r.aread()
+                            failed = r
+                        else:
+                            check_json(r)
+                            async for chunk in r.aiter_bytes():
+                                for raw in splitter.feed(chunk):
+                                    n += 1
+                                    yield decode(raw)
+                except ConnectTimeoutError as e:
+                    raise httpx2.ConnectTimeout(str(e)) from e
+                except httpx2.HTTPError as e:
+                    raise RuntimeError(e) from e
+                if failed is not None:
+                    # outside the try above, so that failed requests raise
+                    # as they do without streaming
+                    self._parse(failed, should_warn)
+                    return
+                self.envelope = self.session.decoder(splitter.close())
+                total += n
+                cu = self.envelope["message"].get("next-cursor")
+                max_avail = self.envelope["message"]["total-results"]
+                if pbar is not None:
+                    pbar.update(1)
+                if cu is None or not n or cursor_max <= total or total >= max_avail:
+                    return
+                if pbar is None and self.progress_bar:
+                    pbar = self._progress_bar(max_avail)
+                payload["cursor"] = cu
+        finally:
+            if pbar is not None:
+                pbar.close()
+
+    async def _req(self, payload, should_warn, decode=None):
+        try:
+            r = await self.session.get(
+                self._url(),
+                params=payload,
+                headers=make_ua(self.mailto, self.ua_string),
+                timeout=self.timeout,
+            )
+        except ConnectTimeoutError as e:
+            raise httpx2.ConnectTimeout(str(e)) from e
+        except httpx2.HTTPError as e:
+            raise RuntimeError(e) from e
+        return self._parse(r, should_warn, decode)
+
+
+async def async_batch_request(
+    cr, ids, batch_size, select=None, should_warn=False, max_workers=None
+):
+    """Async batched DOI lookup, the asyncio counterpart of `batch_request`"""
+    ids, tasks, select = batch_tasks(ids, batch_size, select)
+    slots = asyncio.Semaphore(max_workers or len(tasks) or 1)
+
+    async def fetch(task):
+        kind, x = task
+        async with slots:
+            if kind == "single":
+                r = await cr.session.get(
+                    id_url(cr.base_url + "/works/", x, False),
+                    headers=make_ua(cr.mailto, cr.ua_string),
+                    timeout=cr.timeout,
+                )
+                return parse_id_response(r, x, True, cr.session.decoder)[0]
+            return await async_request(
+                cr, "/works/", None, filters={"doi": x}, limit=len(x), select=select
+            )
+
+    envelopes = await asyncio.gather(*[fetch(z) for z in tasks])
+    return assemble_batches(ids, envelopes, should_warn)
@@ -0,0 +1,284 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import httpx2
+
+DAY = 86400
+
+# static routes change rarely, so are kept for a week by default
+DEFAULT_ROUTE_TTLS = {"/types": 7 * DAY, "/licenses": 7 * DAY}
+
+# random samples and deep paging cursors must come fresh from the server each time
+UNCACHEABLE_PARAMS = {"sample", "cursor"}
+
+# these describe the body as sent over the wire, not the decoded body we store
+DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class Cache(ABC):
+    """
+    Habanero: cache base class
+
+    Stores successful responses, keyed on the request's canonical URL,
+    query parameters and `Accept` header. Subclasses store entries somewhere:
+    see :class:`~habanero.MemoryCache` and :class:`~habanero.SQLiteCache`.
+
+    When a response has expired but came with an `ETag` or `Last-Modified`
+    header, it's revalidated with a conditional request: if the server
+    answers `304 Not Modified` the cached body is used again, without
+    downloading it.
+
+    :param ttl: Number of seconds a response is kept, for routes not in
+        `route_ttls`. Default: 3600
+    :param route_ttls: A dict of URL path prefix to number of seconds
+        responses under that path are kept, e.g., `{"/works": 300}`. The
+        longest matching prefix wins. Default: `/types` and `/licenses`
+        are kept for 7 days
+    """
+
+    def __init__(self, ttl: float = 3600, route_ttls: dict | None = None) -> None:
+        self.ttl = ttl
+        self.route_ttls = DEFAULT_ROUTE_TTLS if route_ttls is None else route_ttls
+
+    def __repr__(self) -> str:
+        return "<%s: ttl: %ss, route ttls: %s>" % (
+            type(self).__name__,
+            self.ttl,
+            self.route_ttls,
+        )
+
+    def ttl_for(self, url) -> float:
+        """Number of seconds a response for `url` is kept"""
+        path = httpx2.URL(url).path
+        matches = [z for z in self.route_ttls if path.startswith(z)]
+        if not matches:
+            return self.ttl
+        return self.route_ttls[max(matches, key=len)]
+
+    @abstractmethod
+    def get(self, key: str) -> dict | None:
+        """The entry stored for `key`, or `None`"""
+
+    @abstractmethod
+    def set(self, key: str, entry: dict) -> None:
+        """Store `entry` for `key`"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete the entry stored for `key`, if any"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Delete all entries"""
+
+
+class MemoryCache(Cache):
+    """
+    Habanero: in-memory cache class
+
+    A bounded least recently used cache, shared by all threads in a process
+
+    :param maxsize: Max number of responses kept. Default: 1024
+    :param ttl: see :class:`~habanero.Cache`
+    :param route_ttls: see :class:`~habanero.Cache`
+
+    Usage::
+
+        from habanero import Crossref, MemoryCache
+        cr = Crossref(cache = MemoryCache(maxsize = 10000, route_ttls = {"/works": 300}))
+        cr.types()
+        cr.types() # from the cache
+    """
+
+    def __init__(
+        self, maxsize: int = 1024, ttl: float = 3600, route_ttls: dict | None = None
+    ) -> None:
+        super(MemoryCache, self).__init__(ttl, route_ttls)
+        self.maxsize = maxsize
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(Cache):
+    """
+    Habanero: SQLite cache class
+
+    A cache in a SQLite file, which can be shared by many processes
+
+    :param path: Path to the SQLite file, created if it doesn't exist
+    :param ttl: see :class:`~habanero.Cache`
+    :param route_ttls: see :class:`~habanero.Cache`
+
+    Usage::
+
+        from habanero import Crossref, SQLiteCache
+        cr = Crossref(cache = SQLiteCache("crossref-cache.sqlite"))
+        cr.works(ids = '10.1371/journal.pone.0033693')
+    """
+
+    def __init__(self, path, ttl: float = 3600, route_ttls: dict | None = None):
+        super(SQLiteCache, self).__init__(ttl, route_ttls)
+        self.path = str(path)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT, "
+                "content BLOB, expires REAL)"
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, status, headers, content, expires FROM responses "
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "url": row[0],
+            "status": row[1],
+            "headers": json.loads(row[2]),
+            "content": row[3],
+            "expires": row[4],
+        }
+
+    def set(self, key, entry):
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry["url"],
+                    entry["status"],
+                    json.dumps(entry["headers"]),
+                    entry["content"],
+                    entry["expires"],
+                ),
+            )
+
+    def delete(self, key):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM responses")
+
+    def purge(self, grace: float = 0) -> None:
+        """
+        Delete expired responses
+
+        Expired responses with an `ETag` or `Last-Modified` header can still
+        be revalidated cheaply, so you may want to keep them for a while.
+
+        :param grace: Only delete responses expired for more than this many
+            seconds. Default: 0
+        """
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM responses WHERE expires < ?", (time.time() - grace,)
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def cacheable(params=None) -> bool:
+    """Whether a request with query parameters `params` can be cached"""
+    return not UNCACHEABLE_PARAMS.intersection(params or {})
+
+
+def cache_key(url, params=None, headers=None) -> str:
+    """
+    A key for a request from its canonical URL: query parameters sorted, and
+    filters within the `filter` parameter sorted
+    """
+    params = dict(params or {})
+    if params.get("filter"):
+        params["filter"] = ",".join(sorted(params["filter"].split(",")))
+    full = httpx2.URL(url, params=sorted((str(k), str(v)) for k, v in params.items()))
+    accept = (headers or {}).get("Accept", "")
+    return hashlib.sha256(("%s %s" % (full, accept)).encode()).hexdigest()
+
+
+def make_entry(r: httpx2.Response, ttl: float) -> dict:
+    headers = [(k, v) for k, v in r.headers.items() if k.lower() not in DROP_HEADERS]
+    return {
+        "url": str(r.url),
+        "status": r.status_code,
+        "headers": headers,
+        "content": r.content,
+        "expires": time.time() + ttl,
+    }
+
+
+def conditional_headers(entry: dict | None) -> dict:
+    """Headers to revalidate a cached response with"""
+    if entry is None:
+        return {}
+    stored = httpx2.Headers(entry["headers"])
+    headers = {}
+    if "etag" in stored:
+        headers["If-None-Match"] = stored["etag"]
+    if "last-modified" in stored:
+        headers["If-Modified-Since"] = stored["last-modified"]
+    return headers
+
+
+def revalidated_entry(entry: dict, r: httpx2.Response, ttl: float) -> dict:
+    """A cached response refreshed by a `304 Not Modified` response"""
+    headers = httpx2.Headers(entry["headers"])
+    headers.update({k: v for k, v in r.headers.items() if k not in DROP_HEADERS})
+    return {
+        **entry,
+        "headers": list(headers.items()),
+        "expires": time.time() + ttl,
+    }
+
+
+def entry_response(entry: dict, url) -> httpx2.Response:
+    return httpx2.Response(
+        entry["status"],
+        headers=entry["headers"],
+        content=entry["content"],
+        request=httpx2.Request("GET", url),
+    )
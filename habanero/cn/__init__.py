@@ -1,4 +1,4 @@
 # -*- coding: utf-8 -*-
 
-from .cn import content_negotiation
+from .cn import async_content_negotiation, content_negotiation
 from .styles import csl_styles
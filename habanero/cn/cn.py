@@ -1,4 +1,5 @@
-from ..cnrequest import CNRequest
+from ..cnrequest import AsyncCNRequest, CNRequest
+from ..session import AsyncSession, Session
 from .constants import CN_BASE_URL
 
 
@@ -8,6 +9,7 @@ def content_negotiation(
     style: str = "apa",
     locale: str = "en-US",
     url: str = "",
+    session: Session | None = None,
     **kwargs,
 ) -> str:
     """
@@ -25,7 +27,11 @@ def content_negotiation(
         you'll get a `(500) Internal Server Error`
     :param locale: Language locale. See `locale.locale_alias`
     :param url: Base URL for the content negotiation request. Default: `https://doi.org`
-    :param kwargs: any additional arguments will be passed on to `httpx2.get`
+    :param session: A :class:`~habanero.Session` to send requests through, e.g.,
+        `Crossref().session`. Default: a module wide session
+    :param kwargs: any additional arguments will be passed on to `httpx2.Client.get`,
+        except `verify`, `cert`, `proxy` and `trust_env`, which are used to make
+        the client for this call
     :rtype: str, which can be parsed to various formats depending on what
         format you request (e.g., JSON vs. XML vs. bibtex)
 
@@ -88,4 +94,42 @@ def content_negotiation(
     if not url:
         url = CN_BASE_URL
 
-    return CNRequest(url, ids, citation_format, style, locale, **kwargs)
+    return CNRequest(url, ids, citation_format, style, locale, session, **kwargs)
+
+
+async def async_content_negotiation(
+    ids: str,
+    citation_format: str = "bibtex",
+    style: str = "apa",
+    locale: str = "en-US",
+    url: str = "",
+    session: AsyncSession | None = None,
+    **kwargs,
+) -> str:
+    """
+    Get citations in various formats from CrossRef, with asyncio
+
+    The asyncio counterpart of :func:`~habanero.cn.content_negotiation`, taking
+    the same parameters. When many DOIs are passed in they are all requested
+    concurrently.
+
+    :param session: An :class:`~habanero.AsyncSession` to send requests through,
+        e.g., `AsyncCrossref().session`. Default: a session opened and closed
+        for this call
+    :rtype: str
+
+    Usage::
+
+        import asyncio
+        from habanero import cn
+        asyncio.run(cn.async_content_negotiation(ids = "10.1126/science.169.3946.635"))
+
+        dois = ['10.5167/UZH-30455','10.5167/UZH-49216','10.5167/UZH-503']
+        asyncio.run(cn.async_content_negotiation(ids = dois, citation_format = "citeproc-json"))
+    """
+    if not url:
+        url = CN_BASE_URL
+
+    return await AsyncCNRequest(
+        url, ids, citation_format, style, locale, session, **kwargs
+    )
@@ -1,15 +1,18 @@
 import re
 
-import httpx2
-
 from ..habanero_utils import check_json
+from ..session import Session, session_for
 
 
-def csl_styles(**kwargs) -> list:
+def csl_styles(session: Session | None = None, **kwargs) -> list:
     """
     Get list of styles from https://github.com/citation-style-language/styles
 
-    :param kwargs: any additional arguments will be passed on to `httpx2.get`
+    :param session: A :class:`~habanero.Session` to send requests through.
+        Default: a module wide session
+    :param kwargs: any additional arguments will be passed on to `httpx2.Client.get`,
+        except `verify`, `cert`, `proxy` and `trust_env`, which are used to make
+        the client for this call
     :rtype: list, of CSL styles
 
     Usage::
@@ -18,15 +21,16 @@ def csl_styles(**kwargs) -> list:
         cn.csl_styles()
     """
     base = "https://api.github.com/repos/citation-style-language/styles"
-    tt = httpx2.get(base + "/commits?per_page=1", **kwargs)
-    tt.raise_for_status()
-    check_json(tt)
-    commres = tt.json()
-    sha = commres[0]["sha"]
-    sty = httpx2.get(base + "/git/trees/" + sha, **kwargs)
-    sty.raise_for_status()
-    check_json(sty)
-    res = sty.json()
+    with session_for(session, kwargs) as session:
+        tt = session.get(base + "/commits?per_page=1", **kwargs)
+        tt.raise_for_status()
+        check_json(tt)
+        commres = session.decoder(tt.content)
+        sha = commres[0]["sha"]
+        sty = session.get(base + "/git/trees/" + sha, **kwargs)
+        sty.raise_for_status()
+        check_json(sty)
+        res = session.decoder(sty.content)
     files = [z["path"] for z in res["tree"]]
     matches = [re.search(".csl", g) for g in files]
     csls = [x.string for x in filter(None, matches)]
@@ -1,10 +1,16 @@
+import asyncio
 import warnings
 
-import httpx2
 from packaging.version import Version
 
 from .cn_formats import cn_format_headers
 from .habanero_utils import make_ua
+from .session import (
+    AsyncSession,
+    pop_client_options,
+    session_for,
+    session_settings,
+)
 
 try:
     import bibtexparser  # type: ignore
@@ -14,34 +20,87 @@ else:
     _has_bibtexparser = True
 
 
-def CNRequest(url, ids, citation_format=None, style=None, locale=None, **kwargs):
+def CNRequest(
+    url, ids, citation_format=None, style=None, locale=None, session=None, **kwargs
+):
+    ids = check_ids(ids)
+    with session_for(session, kwargs) as session:
+        if len(ids) == 1:
+            return make_request(
+                url, ids[0], citation_format, style, locale, True, session, **kwargs
+            )
+        else:
+            coll = []
+            for i in range(len(ids)):
+                tt = make_request(
+                    url,
+                    ids[i],
+                    citation_format,
+                    style,
+                    locale,
+                    False,
+                    session,
+                    **kwargs,
+                )
+                coll.append(tt)
+
+            if len(coll) == 1:
+                coll = coll[0]
+            return coll
+
+
+async def AsyncCNRequest(
+    url, ids, citation_format=None, style=None, locale=None, session=None, **kwargs
+):
+    ids = check_ids(ids)
+    options = pop_client_options(kwargs)
+    if session is None or options:
+        settings = session_settings(session)
+        async with AsyncSession(**settings, **options) as session:
+            return await AsyncCNRequest(
+                url, ids, citation_format, style, locale, session, **kwargs
+            )
+
+    if len(ids) == 1:
+        return await async_make_request(
+            url, ids[0], citation_format, style, locale, True, session, **kwargs
+        )
+    else:
+        coll = await asyncio.gather(
+            *[
+                async_make_request(
+                    url, z, citation_format, style, locale, False, session, **kwargs
+                )
+                for z in ids
+            ]
+        )
+        return list(coll)
+
+
+def check_ids(ids):
     if not isinstance(ids, (str, list)):
         raise TypeError("'ids' must be a str or list of str's")
     if isinstance(ids, list) and not all(isinstance(z, str) for z in ids):
         raise TypeError("'ids' must be a str or list of all str's")
 
-    should_split = isinstance(ids, str)
-    if should_split:
+    if isinstance(ids, str):
         ids = ids.split()
+    return ids
 
-    if len(ids) == 1:
-        return make_request(
-            url, ids[0], citation_format, style, locale, fail=True, **kwargs
-        )
-    else:
-        coll = []
-        for i in range(len(ids)):
-            tt = make_request(
-                url, ids[i], citation_format, style, locale, fail=False, **kwargs
-            )
-            coll.append(tt)
 
-        if len(coll) == 1:
-            coll = coll[0]
-        return coll
+def make_request(url, ids, for_mat, style, locale, fail, session, **kwargs):
+    url, head = cn_url_headers(url, ids, for_mat, style, locale)
+    r = session.get(url, headers=head, follow_redirects=True, **kwargs)
+    return cn_text(r, for_mat, fail)
+
 
+async def async_make_request(url, ids, for_mat, style, locale, fail, session, **kwargs):
+    url, head = cn_url_headers(url, ids, for_mat, style, locale)
+    r = await session.get(url, headers=head, follow_redirects=True, **kwargs)
+    return cn_text(r, for_mat, fail)
 
-def make_request(url, ids, for_mat, style, locale, fail, **kwargs):
+
+def cn_url_headers(url, ids, for_mat, style, locale):
     ty_pe = cn_format_headers[for_mat]
 
     if for_mat == "citeproc-json":
@@ -53,8 +112,10 @@ def make_request(url, ids, for_mat, style, locale, fail, **kwargs):
 
     htype = {"Accept": ty_pe}
     head = dict(make_ua(), **htype)
-    r = httpx2.get(url, headers=head, follow_redirects=True, **kwargs)
+    return url, head
+
 
+def cn_text(r, for_mat, fail):
     # Raise an HTTPError if the status code of the response is 4XX or 5XX
     # or warn if fail=False
     if not r.is_success:
@@ -62,7 +123,7 @@ def make_request(url, ids, for_mat, style, locale, fail, **kwargs):
             r.raise_for_status()
         else:
             mssg = "%s: %s" % (r.status_code, r.url)
-            warnings.warn(mssg, stacklevel=2)
+            warnings.warn(mssg, stacklevel=3)
             return None
 
     r.encoding = "UTF-8"
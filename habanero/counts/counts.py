@@ -1,15 +1,15 @@
 from typing import Any
 from xml.dom import minidom
 
-import httpx2
-
 from ..habanero_utils import make_ua
+from ..session import Session, session_for
 
 
 def citation_count(
     doi: str,
     url: str = "http://www.crossref.org/openurl/",
     key: str = "cboettig@ropensci.org",
+    session: Session | None = None,
     **kwargs,
 ) -> int:
     """
@@ -18,6 +18,11 @@ def citation_count(
     :param doi: DOI, digital object identifier
     :param url: the API url for the function (should be left to default)
     :param key: your API key
+    :param session: A :class:`~habanero.Session` to send requests through.
+        Default: a module wide session
+    :param kwargs: any additional arguments will be passed on to `httpx2.Client.get`,
+        except `verify`, `cert`, `proxy` and `trust_env`, which are used to make
+        the client for this call
 
     See http://labs.crossref.org/openurl/ for more info on this Crossref API service.
 
@@ -32,7 +37,8 @@ def citation_count(
     """
     args = {"id": "doi:" + doi, "pid": key, "noredirect": True}
     new_args: dict[str, Any] = {k: v for k, v in args.items() if v}
-    res = httpx2.get(url, params=new_args, headers=make_ua(), **kwargs)
+    with session_for(session, kwargs) as session:
+        res = session.get(url, params=new_args, headers=make_ua(), **kwargs)
     xmldoc = minidom.parseString(res.content)
     val = xmldoc.getElementsByTagName("query")[0].attributes["fl_count"].value
     return int(str(val))
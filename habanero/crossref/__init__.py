@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 
+from .async_crossref import AsyncCrossref
 from .crossref import Crossref
 from .workscontainer import WorksContainer
 from .worksquery import WorksQuery
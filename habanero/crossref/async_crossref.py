@@ -0,0 +1,798 @@
+from typing import AsyncIterator, Callable, List, Optional
+
+from ..async_request import (
+    AsyncRequest,
+    async_batch_request,
+    async_offset_request,
+    async_request,
+)
+from ..cache import Cache
+from ..habanero_utils import check_kwargs, sub_str
+from ..ratelimit import RateLimiter
+from ..retry import Retry
+from ..session import AsyncSession, check_session_settings
+from ..sink import NDJSONSink, async_write_items
+
+
+class AsyncCrossref:
+    """
+    AsyncCrossref: Class for Crossref search API methods, with asyncio
+
+    The asyncio counterpart of :class:`~habanero.Crossref`: it takes the same
+    parameters and has the same methods with the same signatures, but each
+    method is a coroutine. Requests are sent through an
+    :class:`~habanero.AsyncSession` owned by the instance, so many lookups can
+    be in flight on one event loop. When many `ids` are passed, they are all
+    requested concurrently, bounded by `max_connections`, or by the
+    `max_workers` method parameter when given.
+
+    :param base_url: Base URL to use for http requests
+    :param api_key: An API key to send with each http request
+    :param mailto: A mailto string, see :class:`~habanero.Crossref`
+    :param ua_string: A user agent string, see :class:`~habanero.Crossref`
+    :param timeout: curl timeout
+    :param session: An :class:`~habanero.AsyncSession` to send requests through.
+        If not given, a new one is created from the connection pool settings
+        below. `rate_limit`, `retry`, `cache` and `decoder` are settings of the
+        session: give them to :class:`~habanero.AsyncSession` instead, giving
+        them with `session` raises a `ValueError`
+    :param max_connections: Max number of concurrent requests and pooled
+        connections. Default: 100
+    :param max_keepalive_connections: Max number of idle connections kept alive.
+        Default: 20
+    :param keepalive_expiry: Number of seconds an idle connection is kept alive.
+        Default: 5.0
+    :param max_connections_per_host: Max number of concurrent requests to a
+        single host. Default: None (no per host limit)
+    :param rate_limit: If `True`, throttle all requests from all threads to the
+        rate Crossref allows, see :class:`~habanero.RateLimiter`. Default: False
+    :param retry: A :class:`~habanero.Retry` policy, to send requests that fail
+        with e.g. a 429 or 503 again after a backoff. Default: None (no retries)
+    :param cache: A :class:`~habanero.Cache` to keep responses in, e.g., a
+        :class:`~habanero.MemoryCache` or a :class:`~habanero.SQLiteCache`.
+        Default: None (no caching)
+    :param decoder: JSON decoder for responses: `"orjson"` or `"msgspec"` (much
+        faster on large pages, if installed), `"json"` (the standard library),
+        a function decoding bytes, or `"auto"`. Default: None ("auto", the first
+        of orjson, msgspec and json installed)
+
+    Usage::
+
+        import asyncio
+        from habanero import AsyncCrossref
+
+        async def main():
+            async with AsyncCrossref(mailto = "foo@bar.com") as cr:
+                res = await cr.works(query = "ecology")
+                dois = [z["DOI"] for z in res["message"]["items"]]
+                return await cr.works(ids = dois, warn = True)
+
+        asyncio.run(main())
+    """
+
+    def __init__(
+        self,
+        base_url: str = "https://api.crossref.org",
+        api_key: Optional[str] = None,
+        mailto: Optional[str] = None,
+        ua_string: Optional[str] = None,
+        timeout: int = 5,
+        session: Optional[AsyncSession] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        max_connections_per_host: Optional[int] = None,
+        rate_limit: bool = False,
+        retry: Optional[Retry] = None,
+        cache: Optional[Cache] = None,
+        decoder: str | Callable | None = None,
+    ) -> None:
+        self.base_url = base_url
+        self.api_key = api_key
+        self.mailto = mailto
+        self.ua_string = ua_string
+        self.timeout = timeout
+        check_session_settings(
+            session, rate_limit=rate_limit, retry=retry, cache=cache, decoder=decoder
+        )
+        self._owns_session = session is None
+        self.session = session or AsyncSession(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            max_connections_per_host=max_connections_per_host,
+            rate_limiter=RateLimiter() if rate_limit else None,
+            retry=retry,
+            cache=cache,
+            decoder=decoder,
+        )
+
+    def __repr__(self):
+        return (
+            """< %s \nURL: %s\nKEY: %s\nMAILTO: %s\nADDITIONAL UA STRING: %s\nTimeout: %s\n>"""
+            % (
+                type(self).__name__,
+                self.base_url,
+                sub_str(self.api_key),
+                self.mailto,
+                self.ua_string,
+                self.timeout,
+            )
+        )
+
+    async def __aenter__(self) -> "AsyncCrossref":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """
+        Close the connection pool used by this instance
+
+        A session passed in via `session` is left open, as it may be
+        shared with other objects.
+        """
+        if self._owns_session:
+            await self.session.aclose()
+
+    async def works(
+        self,
+        ids: List[str] | str | None = None,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        offset: Optional[float] = None,
+        limit: Optional[float] = None,
+        sample: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        facet: str | bool | None = None,
+        select: List[str] | str | None = None,
+        cursor: Optional[str] = None,
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        max_workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        offset_max: Optional[int] = None,
+        sink: NDJSONSink | str | None = None,
+        **kwargs,
+    ) -> dict | list[dict] | int:
+        """
+        Search Crossref works, see :func:`~habanero.Crossref.works`
+
+        Usage::
+
+            from habanero import AsyncCrossref
+            cr = AsyncCrossref()
+            await cr.works(query = "ecology")
+            await cr.works(ids = ['10.1371/journal.pone.0033693', '10.1126/science.169.3946.635'])
+            await cr.works(query = "widget", cursor = "*", cursor_max = 100)
+        """
+        if sink is not None and (ids is not None or offset_max):
+            raise ValueError("sink can't be used with ids or offset_max")
+        if ids.__class__.__name__ != "NoneType" and batch_size:
+            return await async_batch_request(
+                self, ids, batch_size, select, warn, max_workers
+            )
+        if ids.__class__.__name__ == "NoneType" and offset_max:
+            if cursor:
+                raise ValueError("offset_max can't be used with cursor")
+            return await async_offset_request(
+                self,
+                "/works/",
+                query,
+                filters,
+                offset,
+                limit,
+                sort,
+                order,
+                facet,
+                select,
+                offset_max,
+                max_workers,
+                kwargs,
+            )
+        if ids.__class__.__name__ != "NoneType":
+            return await async_request(
+                self,
+                "/works/",
+                ids,
+                query,
+                filters,
+                offset,
+                limit,
+                sample,
+                sort,
+                order,
+                facet,
+                select,
+                None,
+                None,
+                None,
+                None,
+                progress_bar,
+                warn,
+                max_workers=max_workers,
+                **kwargs,
+            )
+        else:
+            req = AsyncRequest(
+                self.mailto,
+                self.ua_string,
+                self.timeout,
+                self.base_url,
+                "/works/",
+                query,
+                filters,
+                offset,
+                limit,
+                sample,
+                sort,
+                order,
+                facet,
+                select,
+                cursor,
+                cursor_max,
+                None,
+                progress_bar,
+                session=self.session,
+                **kwargs,
+            )
+            if sink is not None:
+                return await async_write_items(sink, req.iter_items(should_warn=warn))
+            return await req.do_request(should_warn=warn)
+
+    async def members(
+        self,
+        ids: List[str] | str | int | None = None,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        offset: Optional[float] = None,
+        limit: Optional[float] = None,
+        sample: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        facet: str | bool | None = None,
+        works: bool = False,
+        select: List[str] | str | None = None,
+        cursor: Optional[str] = None,
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Search Crossref members, see :func:`~habanero.Crossref.members`
+
+        Usage::
+
+            from habanero import AsyncCrossref
+            cr = AsyncCrossref()
+            await cr.members(ids = 98)
+            await cr.members(ids = 98, works = True, limit = 5)
+        """
+        return await async_request(
+            self,
+            "/members/",
+            ids,
+            query,
+            filters,
+            offset,
+            limit,
+            sample,
+            sort,
+            order,
+            facet,
+            select,
+            works,
+            cursor,
+            cursor_max,
+            None,
+            progress_bar,
+            warn,
+            max_workers=max_workers,
+            **kwargs,
+        )
+
+    async def prefixes(
+        self,
+        ids: List[str] | str,
+        filters: Optional[dict] = None,
+        offset: Optional[float] = None,
+        limit: Optional[float] = None,
+        sample: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        facet: str | bool | None = None,
+        works: bool = False,
+        select: List[str] | str | None = None,
+        cursor: Optional[str] = None,
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Search Crossref prefixes, see :func:`~habanero.Crossref.prefixes`
+
+        Usage::
+
+            from habanero import AsyncCrossref
+            cr = AsyncCrossref()
+            await cr.prefixes(ids = "10.1016")
+            await cr.prefixes(ids = ['10.1016','10.1371'], works = True, limit = 3)
+        """
+        check_kwargs(["query"], kwargs)
+        return await async_request(
+            self,
+            "/prefixes/",
+            ids,
+            query=None,
+            filters=filters,
+            offset=offset,
+            limit=limit,
+            sample=sample,
+            sort=sort,
+            order=order,
+            facet=facet,
+            select=select,
+            works=works,
+            cursor=cursor,
+            cursor_max=cursor_max,
+            progress_bar=progress_bar,
+            should_warn=warn,
+            max_workers=max_workers,
+            **kwargs,
+        )
+
+    async def funders(
+        self,
+        ids: List[str] | str | None = None,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        offset: Optional[float] = None,
+        limit: Optional[float] = None,
+        sample: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        facet: str | bool | None = None,
+        works: bool = False,
+        select: List[str] | str | None = None,
+        cursor: Optional[str] = None,
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Search Crossref funders, see :func:`~habanero.Crossref.funders`
+
+        Usage::
+
+            from habanero import AsyncCrossref
+            cr = AsyncCrossref()
+            await cr.funders(query = "NSF")
+            await cr.funders(ids = '10.13039/100000001', works = True)
+        """
+        return await async_request(
+            self,
+            "/funders/",
+            ids,
+            query,
+            filters,
+            offset,
+            limit,
+            sample,
+            sort,
+            order,
+            facet,
+            select,
+            works,
+            cursor,
+            cursor_max,
+            None,
+            progress_bar,
+            warn,
+            max_workers=max_workers,
+            **kwargs,
+        )
+
+    async def journals(
+        self,
+        ids: List[str] | str | None = None,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        offset: Optional[float] = None,
+        limit: Optional[float] = None,
+        sample: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        facet: str | bool | None = None,
+        works: bool = False,
+        select: List[str] | str | None = None,
+        cursor: Optional[str] = None,
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Search Crossref journals, see :func:`~habanero.Crossref.journals`
+
+        Usage::
+
+            from habanero import AsyncCrossref
+            cr = AsyncCrossref()
+            await cr.journals(ids = "2167-8359")
+            await cr.journals(ids = "2167-8359", works = True, cursor = "*", cursor_max = 200)
+        """
+        return await async_request(
+            self,
+            "/journals/",
+            ids,
+            query,
+            filters,
+            offset,
+            limit,
+            sample,
+            sort,
+            order,
+            facet,
+            select,
+            works,
+            cursor,
+            cursor_max,
+            None,
+            progress_bar,
+            warn,
+            max_workers=max_workers,
+            **kwargs,
+        )
+
+    async def types(
+        self,
+        ids: List[str] | str | None = None,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        offset: Optional[float] = None,
+        limit: Optional[float] = None,
+        sample: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        facet: str | bool | None = None,
+        works: bool = False,
+        select: List[str] | str | None = None,
+        cursor: Optional[str] = None,
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Search Crossref types, see :func:`~habanero.Crossref.types`
+
+        Usage::
+
+            from habanero import AsyncCrossref
+            cr = AsyncCrossref()
+            await cr.types()
+            await cr.types(ids = "journal", works = True)
+        """
+        return await async_request(
+            self,
+            "/types/",
+            ids,
+            query,
+            filters,
+            offset,
+            limit,
+            sample,
+            sort,
+            order,
+            facet,
+            select,
+            works,
+            cursor,
+            cursor_max,
+            None,
+            progress_bar,
+            warn,
+            max_workers=max_workers,
+            **kwargs,
+        )
+
+    async def licenses(
+        self,
+        query: Optional[str] = None,
+        offset: Optional[float] = None,
+        limit: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        facet: str | bool | None = None,
+        **kwargs,
+    ) -> dict:
+        """
+        Search Crossref licenses, see :func:`~habanero.Crossref.licenses`
+
+        Usage::
+
+            from habanero import AsyncCrossref
+            cr = AsyncCrossref()
+            await cr.licenses(query = "creative")
+        """
+        check_kwargs(["ids", "filter", "works"], kwargs)
+        return await async_request(
+            self,
+            "/licenses/",
+            None,
+            query,
+            None,
+            offset,
+            limit,
+            None,
+            sort,
+            order,
+            facet,
+            None,
+            None,
+            None,
+            None,
+            **kwargs,
+        )
+
+    async def registration_agency(
+        self, ids: List[str] | str, max_workers: Optional[int] = None, **kwargs
+    ) -> list:
+        """
+        Determine registration agency for DOIs, see
+        :func:`~habanero.Crossref.registration_agency`
+
+        Usage::
+
+            from habanero import AsyncCrossref
+            cr = AsyncCrossref()
+            await cr.registration_agency('10.1371/journal.pone.0033693')
+        """
+        check_kwargs(
+            [
+                "query",
+                "filter",
+                "offset",
+                "limit",
+                "sample",
+                "sort",
+                "order",
+                "facet",
+                "works",
+            ],
+            kwargs,
+        )
+        res = await async_request(
+            self,
+            "/works/",
+            ids,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            None,
+            True,
+            max_workers=max_workers,
+            **kwargs,
+        )
+        if not isinstance(res, list):
+            k = []
+            k.append(res)
+        else:
+            k = res
+        return [z["message"]["agency"]["label"] for z in k]
+
+    async def random_dois(self, sample: int = 10, **kwargs) -> list:
+        """
+        Get a random set of DOIs, see :func:`~habanero.Crossref.random_dois`
+
+        Usage::
+
+            from habanero import AsyncCrossref
+            cr = AsyncCrossref()
+            await cr.random_dois(10)
+        """
+        res = await async_request(
+            self,
+            "/works/",
+            None,
+            None,
+            None,
+            None,
+            None,
+            sample,
+            None,
+            None,
+            None,
+            None,
+            True,
+            None,
+            None,
+            None,
+            **kwargs,
+        )
+        return [z["DOI"] for z in res["message"]["items"]]
+
+    def iter_works(
+        self,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        limit: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        select: List[str] | str | None = None,
+        cursor: str = "*",
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        prefetch: int = 0,
+        typed: bool = False,
+        stream: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over Crossref works, see :func:`~habanero.Crossref.iter_works`
+
+        Usage::
+
+            from habanero import AsyncCrossref
+            cr = AsyncCrossref()
+            async for item in cr.iter_works(query = "ecology", cursor_max = 1000):
+                print(item['DOI'])
+        """
+        return self._iter_works(
+            "/works/",
+            query,
+            filters,
+            limit,
+            sort,
+            order,
+            select,
+            cursor,
+            cursor_max,
+            progress_bar,
+            warn,
+            prefetch,
+            typed,
+            stream,
+            kwargs,
+        )
+
+    def iter_members_works(
+        self,
+        ids: str | int,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        limit: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        select: List[str] | str | None = None,
+        cursor: str = "*",
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        prefetch: int = 0,
+        typed: bool = False,
+        stream: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over the works of a Crossref member, see
+        :func:`~habanero.Crossref.iter_members_works`
+        """
+        return self._iter_works(
+            "/members/%s/works" % ids,
+            query,
+            filters,
+            limit,
+            sort,
+            order,
+            select,
+            cursor,
+            cursor_max,
+            progress_bar,
+            warn,
+            prefetch,
+            typed,
+            stream,
+            kwargs,
+        )
+
+    def iter_journal_works(
+        self,
+        ids: str,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        limit: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        select: List[str] | str | None = None,
+        cursor: str = "*",
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        prefetch: int = 0,
+        typed: bool = False,
+        stream: bool = False,
+        **kwargs,
+    ) -> AsyncIterator[dict]:
+        """
+        Iterate over the works of a journal, see
+        :func:`~habanero.Crossref.iter_journal_works`
+        """
+        return self._iter_works(
+            "/journals/%s/works" % ids,
+            query,
+            filters,
+            limit,
+            sort,
+            order,
+            select,
+            cursor,
+            cursor_max,
+            progress_bar,
+            warn,
+            prefetch,
+            typed,
+            stream,
+            kwargs,
+        )
+
+    def _iter_works(
+        self,
+        path,
+        query,
+        filters,
+        limit,
+        sort,
+        order,
+        select,
+        cursor,
+        cursor_max,
+        progress_bar,
+        warn,
+        prefetch,
+        typed,
+        stream,
+        kwargs,
+    ):
+        return AsyncRequest(
+            self.mailto,
+            self.ua_string,
+            self.timeout,
+            self.base_url,
+            path,
+            query,
+            filters,
+            None,
+            limit,
+            None,
+            sort,
+            order,
+            None,
+            select,
+            cursor,
+            cursor_max,
+            None,
+            progress_bar,
+            session=self.session,
+            **kwargs,
+        ).iter_items(should_warn=warn, prefetch=prefetch, typed=typed, stream=stream)
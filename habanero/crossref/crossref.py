@@ -1,8 +1,15 @@
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional
 
+from ..cache import Cache
 from ..habanero_utils import check_kwargs, sub_str
-from ..request import request
+from ..harvest import Checkpoint, harvest
+from ..ratelimit import RateLimiter
+from ..request import batch_request, offset_request, request
 from ..request_class import Request
+from ..retry import Retry
+from ..session import Session, check_session_settings
+from ..sharding import date_windows, plan_shards, sharded_items
+from ..sink import NDJSONSink, write_items
 from .filters import (
     funders_filter_details,
     members_filter_details,
@@ -19,6 +26,29 @@ class Crossref:
     :param mailto: A mailto string, see section below
     :param ua_string: A user agent string, see section below
     :param timeout: curl timeout
+    :param session: A :class:`~habanero.Session` to send requests through. If not
+        given, a new one is created from the connection pool settings below.
+        `rate_limit`, `retry`, `cache` and `decoder` are settings of the
+        session: give them to :class:`~habanero.Session` instead, giving them
+        with `session` raises a `ValueError`
+    :param max_connections: Max number of pooled connections. Default: 100
+    :param max_keepalive_connections: Max number of idle connections kept alive.
+        Default: 20
+    :param keepalive_expiry: Number of seconds an idle connection is kept alive.
+        Default: 5.0
+    :param max_connections_per_host: Max number of concurrent requests to a
+        single host. Default: None (no per host limit)
+    :param rate_limit: If `True`, throttle all requests from all threads to the
+        rate Crossref allows, see RateLimits_. Default: False
+    :param retry: A :class:`~habanero.Retry` policy, to send requests that fail
+        with e.g. a 429 or 503 again after a backoff. Default: None (no retries)
+    :param cache: A :class:`~habanero.Cache` to keep responses in, e.g., a
+        :class:`~habanero.MemoryCache` or a :class:`~habanero.SQLiteCache`.
+        Default: None (no caching)
+    :param decoder: JSON decoder for responses: `"orjson"` or `"msgspec"` (much
+        faster on large pages, if installed), `"json"` (the standard library),
+        a function decoding bytes, or `"auto"`. Default: None ("auto", the first
+        of orjson, msgspec and json installed)
 
     |
     |
@@ -84,6 +114,17 @@ class Crossref:
         # set an additional user-agent string
         Crossref(ua_string = "foo bar")
 
+    **Connection pooling**
+
+    Each `Crossref` instance owns a pool of connections that is reused across
+    all requests made with it, including deep paging with cursors. Use the
+    instance as a context manager, or call :func:`~habanero.Crossref.close`,
+    to close the pool when you're done::
+
+        from habanero import Crossref
+        with Crossref(mailto = "foo@bar.com", max_connections = 20) as cr:
+            cr.works(query = "ecology")
+
     .. _RateLimits:
 
     **Rate limits**
@@ -93,6 +134,14 @@ class Crossref:
     but that could change. In addition, it's not clear what the time is to reset.
     See below for getting header info for your requests.
 
+    With `rate_limit=True`, a :class:`~habanero.RateLimiter` shared by all
+    threads reads these headers from every response, and holds back requests
+    so that they go out at the allowed rate, including deep paging with
+    cursors and parallel lookups with `max_workers`::
+
+        cr = Crossref(mailto = "foo@bar.com", rate_limit = True)
+        cr.works(ids = dois, max_workers = 16)
+
     .. _CurlOpts:
 
     **Verbose curl output**::
@@ -192,12 +241,35 @@ class Crossref:
         mailto: Optional[str] = None,
         ua_string: Optional[str] = None,
         timeout: int = 5,
+        session: Optional[Session] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        max_connections_per_host: Optional[int] = None,
+        rate_limit: bool = False,
+        retry: Optional[Retry] = None,
+        cache: Optional[Cache] = None,
+        decoder: str | Callable | None = None,
     ) -> None:
         self.base_url = base_url
         self.api_key = api_key
         self.mailto = mailto
         self.ua_string = ua_string
         self.timeout = timeout
+        check_session_settings(
+            session, rate_limit=rate_limit, retry=retry, cache=cache, decoder=decoder
+        )
+        self._owns_session = session is None
+        self.session = session or Session(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+            max_connections_per_host=max_connections_per_host,
+            rate_limiter=RateLimiter() if rate_limit else None,
+            retry=retry,
+            cache=cache,
+            decoder=decoder,
+        )
 
     def __repr__(self):
         return (
@@ -212,6 +284,22 @@ class Crossref:
             )
         )
 
+    def __enter__(self) -> "Crossref":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the connection pool used by this instance
+
+        A session passed in via `session` is left open, as it may be
+        shared with other objects.
+        """
+        if self._owns_session:
+            self.session.close()
+
     def works(
         self,
         ids: List[str] | str | None = None,
@@ -228,8 +316,12 @@ class Crossref:
         cursor_max: float = 5000,
         progress_bar: bool = False,
         warn: bool = False,
+        max_workers: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        offset_max: Optional[int] = None,
+        sink: NDJSONSink | str | None = None,
         **kwargs,
-    ) -> dict | list[dict]:
+    ) -> dict | list[dict] | int:
         """
         Search Crossref works
 
@@ -272,10 +364,29 @@ class Crossref:
         :param warn: warn instead of raise error upon HTTP request error. default: False
             Especially helpful when passing in many DOIs where some may lead to request failures.
             Returns `None` when `warn=True` for each DOI that errors.
+        :param max_workers: Number of threads used to fetch `ids` in parallel. Results
+            are returned in the same order as `ids`. Default: None (one at a time)
+        :param batch_size: Look up DOIs given in `ids` in batches of up to this many per
+            request, with the `doi` filter of the works route, instead of one request
+            per DOI. Results are returned in the same order as `ids`, with `None` for
+            DOIs that aren't found. Only `select` is used with batches. A value of
+            about 100 keeps URLs short. Default: None (one request per DOI). Max: 1000
+        :param offset_max: Max records to retrieve with offset paging: the first page
+            gives the number of results, then the other pages of `limit` records are
+            fetched in parallel with `max_workers` threads (default: 4), and all items
+            are merged into one response. Much faster than a cursor for queries with
+            fewer than 10000 results, the most offset paging can reach. Can't be used
+            with `cursor`. Default: None
+        :param sink: An :class:`~habanero.NDJSONSink`, or a path to one, to write the
+            items to as each page arrives instead of returning them, so that a deep
+            paging harvest of any size only holds one page in memory. The sink is
+            closed once all items are written. Can't be used with `ids` or
+            `offset_max`. Default: None
         :param kwargs: additional named arguments passed on to `requests.get`, e.g., field
             queries (see examples and FieldQueries_)
-        :returns: list[dict] when cursor is used, and dict when cursor is not used
-        :rtype: dict | list[dict]
+        :returns: list[dict] when cursor is used, and dict when cursor is not used; with
+            `sink`, the number of items written
+        :rtype: dict | list[dict] | int
 
         Usage::
 
@@ -351,6 +462,21 @@ class Crossref:
             ## or as a list
             cr.works(query = "ecology", select = ["DOI","title"])
 
+            # look up many DOIs, 100 per request
+            dois = [ z['DOI'] for z in cr.works(limit = 300)['message']['items'] ]
+            res = cr.works(ids = dois, batch_size = 100)
+            ## with only a few fields
+            res = cr.works(ids = dois, batch_size = 100, select = ["DOI", "title"])
+
+            # all results of a mid-sized query, 8 pages at a time
+            res = cr.works(query = "octopus", limit = 1000, offset_max = 10000, max_workers = 8)
+            len(res['message']['items'])
+
+            # write a deep paging harvest to a gzipped NDJSON file as it arrives
+            from habanero import NDJSONSink
+            cr.works(query = "ecology", limit = 1000, cursor = "*", cursor_max = 100000,
+                sink = NDJSONSink("ecology.ndjson.gz", compress = "gzip"))
+
             # set an additional user-agent string
             ## the string is additional because it's added to the UA string we send in every request
             ## turn on verbose curl output to see the request headers sent
@@ -361,6 +487,28 @@ class Crossref:
             x = Crossref()
             x.works(ids = '10.1371/journal.pone.0033693')
         """
+        if sink is not None and (ids is not None or offset_max):
+            raise ValueError("sink can't be used with ids or offset_max")
+        if ids.__class__.__name__ != "NoneType" and batch_size:
+            return batch_request(self, ids, batch_size, select, warn, max_workers)
+        if ids.__class__.__name__ == "NoneType" and offset_max:
+            if cursor:
+                raise ValueError("offset_max can't be used with cursor")
+            return offset_request(
+                self,
+                "/works/",
+                query,
+                filters,
+                offset,
+                limit,
+                sort,
+                order,
+                facet,
+                select,
+                offset_max,
+                max_workers,
+                kwargs,
+            )
         if ids.__class__.__name__ != "NoneType":
             return request(
                 self,
@@ -381,10 +529,11 @@ class Crossref:
                 None,
                 progress_bar,
                 warn,
+                max_workers=max_workers,
                 **kwargs,
             )
         else:
-            return Request(
+            req = Request(
                 self.mailto,
                 self.ua_string,
                 self.timeout,
@@ -403,8 +552,12 @@ class Crossref:
                 cursor_max,
                 None,
                 progress_bar,
+                session=self.session,
                 **kwargs,
-            ).do_request(should_warn=warn)
+            )
+            if sink is not None:
+                return write_items(sink, req.iter_items(should_warn=warn))
+            return req.do_request(should_warn=warn)
 
     def members(
         self,
@@ -423,6 +576,7 @@ class Crossref:
         cursor_max: float = 5000,
         progress_bar: bool = False,
         warn: bool = False,
+        max_workers: Optional[int] = None,
         **kwargs,
     ) -> dict:
         """
@@ -469,6 +623,8 @@ class Crossref:
         :param warn: warn instead of raise error upon HTTP request error. default: False
             Especially helpful when passing in many DOIs where some may lead to request failures.
             Returns `None` when `warn=True` for each DOI that errors.
+        :param max_workers: Number of threads used to fetch `ids` in parallel. Results
+            are returned in the same order as `ids`. Default: None (one at a time)
         :param kwargs: additional named arguments passed on to `requests.get`, e.g., field
             queries (see examples and FieldQueries_)
         :rtype: dict
@@ -519,6 +675,7 @@ class Crossref:
             None,
             progress_bar,
             warn,
+            max_workers=max_workers,
             **kwargs,
         )
 
@@ -538,6 +695,7 @@ class Crossref:
         cursor_max: float = 5000,
         progress_bar: bool = False,
         warn: bool = False,
+        max_workers: Optional[int] = None,
         **kwargs,
     ) -> dict:
         """
@@ -581,6 +739,8 @@ class Crossref:
         :param warn: warn instead of raise error upon HTTP request error. default: False
             Especially helpful when passing in many DOIs where some may lead to request failures.
             Returns `None` when `warn=True` for each DOI that errors.
+        :param max_workers: Number of threads used to fetch `ids` in parallel. Results
+            are returned in the same order as `ids`. Default: None (one at a time)
         :param kwargs: additional named arguments passed on to `requests.get`, e.g., field
             queries (see examples and FieldQueries_)
         :rtype: dict
@@ -634,6 +794,7 @@ class Crossref:
             cursor_max=cursor_max,
             progress_bar=progress_bar,
             should_warn=warn,
+            max_workers=max_workers,
             **kwargs,
         )
 
@@ -654,6 +815,7 @@ class Crossref:
         cursor_max: float = 5000,
         progress_bar: bool = False,
         warn: bool = False,
+        max_workers: Optional[int] = None,
         **kwargs,
     ) -> dict:
         """
@@ -703,6 +865,8 @@ class Crossref:
         :param warn: warn instead of raise error upon HTTP request error. default: False
             Especially helpful when passing in many DOIs where some may lead to request failures.
             Returns `None` when `warn=True` for each DOI that errors.
+        :param max_workers: Number of threads used to fetch `ids` in parallel. Results
+            are returned in the same order as `ids`. Default: None (one at a time)
         :param kwargs: additional named arguments passed on to `requests.get`, e.g., field
             queries (see examples and FieldQueries_)
         :rtype: dict
@@ -762,6 +926,7 @@ class Crossref:
             None,
             progress_bar,
             warn,
+            max_workers=max_workers,
             **kwargs,
         )
 
@@ -782,6 +947,7 @@ class Crossref:
         cursor_max: float = 5000,
         progress_bar: bool = False,
         warn: bool = False,
+        max_workers: Optional[int] = None,
         **kwargs,
     ) -> dict:
         """
@@ -826,6 +992,8 @@ class Crossref:
         :param warn: warn instead of raise error upon HTTP request error. default: False
             Especially helpful when passing in many DOIs where some may lead to request failures.
             Returns `None` when `warn=True` for each DOI that errors.
+        :param max_workers: Number of threads used to fetch `ids` in parallel. Results
+            are returned in the same order as `ids`. Default: None (one at a time)
         :param kwargs: additional named arguments passed on to `requests.get`, e.g., field
             queries (see examples and FieldQueries_)
         :rtype: dict
@@ -885,6 +1053,7 @@ class Crossref:
             None,
             progress_bar,
             warn,
+            max_workers=max_workers,
             **kwargs,
         )
 
@@ -905,6 +1074,7 @@ class Crossref:
         cursor_max: float = 5000,
         progress_bar: bool = False,
         warn: bool = False,
+        max_workers: Optional[int] = None,
         **kwargs,
     ) -> dict:
         """
@@ -946,6 +1116,8 @@ class Crossref:
             found than this value, you will get only those found. Only used if `works=True`
         :param progress_bar: print progress bar. only used when doing deep paging (
             when using cursor parameter). Only used if `works=True`. default: False
+        :param max_workers: Number of threads used to fetch `ids` in parallel. Results
+            are returned in the same order as `ids`. Default: None (one at a time)
         :param kwargs: additional named arguments passed on to `requests.get`, e.g., field
             queries (see examples and FieldQueries_)
         :rtype: dict
@@ -987,6 +1159,7 @@ class Crossref:
             None,
             progress_bar,
             warn,
+            max_workers=max_workers,
             **kwargs,
         )
 
@@ -1045,11 +1218,15 @@ class Crossref:
         )
         return res
 
-    def registration_agency(self, ids: List[str] | str, **kwargs) -> list:
+    def registration_agency(
+        self, ids: List[str] | str, max_workers: Optional[int] = None, **kwargs
+    ) -> list:
         """
         Determine registration agency for DOIs
 
         :param ids: DOIs (digital object identifier) or other identifiers
+        :param max_workers: Number of threads used to fetch `ids` in parallel. Results
+            are returned in the same order as `ids`. Default: None (one at a time)
         :param kwargs: additional named arguments passed on to `requests.get`, e.g., field
             queries (see examples)
         :rtype: list
@@ -1092,6 +1269,7 @@ class Crossref:
             None,
             None,
             True,
+            max_workers=max_workers,
             **kwargs,
         )
         if not isinstance(res, list):
@@ -1140,6 +1318,425 @@ class Crossref:
         )
         return [z["DOI"] for z in res["message"]["items"]]
 
+    def iter_works(
+        self,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        limit: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        select: List[str] | str | None = None,
+        cursor: str = "*",
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        prefetch: int = 0,
+        typed: bool = False,
+        stream: bool = False,
+        **kwargs,
+    ) -> Iterator[dict]:
+        """
+        Iterate over Crossref works, one item at a time
+
+        Like :func:`~habanero.Crossref.works` with deep paging, but items are
+        yielded as pages arrive instead of collecting all pages first, so
+        memory use stays at about one page however many records are
+        harvested. A page is only requested once the items of the previous
+        page have been consumed, unless `prefetch` is used.
+
+        :param query: A query string
+        :param filters: Filter options, see :func:`~habanero.Crossref.works`
+        :param limit: Number of results per page. Default: 20. Max: 1000
+        :param sort: Field to sort on, see :func:`~habanero.Crossref.works`
+        :param order: Sort order, one of 'asc' or 'desc'
+        :param select: Elements to return, see :func:`~habanero.Crossref.works`
+        :param cursor: Cursor to start deep paging from. Default: '*'
+        :param cursor_max: Max records to retrieve, see
+            :func:`~habanero.Crossref.works`. Default: 5000
+        :param progress_bar: print progress bar. default: False
+        :param warn: warn instead of raise error upon HTTP request error, and
+            stop iterating. default: False
+        :param prefetch: Number of pages to fetch ahead in a background thread,
+            so that requests overlap with processing the items of the current
+            page. Default: 0 (a page is requested when its items are needed)
+        :param typed: Yield :class:`~habanero.Work` records instead of dicts:
+            compact typed records of the fields most often used, decoded
+            straight from the response bytes when msgspec is installed.
+            Default: False
+        :param stream: Parse the body of each response as it's read, yielding
+            each item as soon as it's complete instead of once the whole page
+            has been read and parsed: less memory per page, and the first
+            items sooner, for about twice the CPU per page (see
+            `benchmarks/stream.py`). Responses are not cached, and `prefetch`
+            can't be used. Default: False
+        :param kwargs: additional named arguments, e.g., field queries
+        :rtype: Iterator[dict]
+
+        Usage::
+
+            from habanero import Crossref
+            cr = Crossref()
+            for item in cr.iter_works(query = "ecology", limit = 1000, cursor_max = 100000):
+                print(item['DOI'])
+
+            # fetch the next page while items of this one are processed
+            for item in cr.iter_works(query = "ecology", limit = 1000, prefetch = 1):
+                print(item['DOI'])
+
+            # typed records, using much less memory than dicts
+            for work in cr.iter_works(query = "ecology", typed = True):
+                print(work.doi, work.title)
+
+            # items as each response is read, with full pages of 1000
+            for item in cr.iter_works(query = "ecology", limit = 1000, stream = True):
+                print(item['DOI'])
+
+            # take the first few
+            import itertools
+            list(itertools.islice(cr.iter_works(query = "widget"), 5))
+        """
+        return self._iter_works(
+            "/works/",
+            query,
+            filters,
+            limit,
+            sort,
+            order,
+            select,
+            cursor,
+            cursor_max,
+            progress_bar,
+            warn,
+            prefetch,
+            typed,
+            stream,
+            kwargs,
+        )
+
+    def iter_members_works(
+        self,
+        ids: str | int,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        limit: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        select: List[str] | str | None = None,
+        cursor: str = "*",
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        prefetch: int = 0,
+        typed: bool = False,
+        stream: bool = False,
+        **kwargs,
+    ) -> Iterator[dict]:
+        """
+        Iterate over the works of a Crossref member, one item at a time
+
+        :param ids: A member id
+        :param query: see :func:`~habanero.Crossref.iter_works` for this and
+            all other parameters
+        :rtype: Iterator[dict]
+
+        Usage::
+
+            from habanero import Crossref
+            cr = Crossref()
+            for item in cr.iter_members_works(98, limit = 500, cursor_max = 2000):
+                print(item['DOI'])
+        """
+        return self._iter_works(
+            "/members/%s/works" % ids,
+            query,
+            filters,
+            limit,
+            sort,
+            order,
+            select,
+            cursor,
+            cursor_max,
+            progress_bar,
+            warn,
+            prefetch,
+            typed,
+            stream,
+            kwargs,
+        )
+
+    def iter_journal_works(
+        self,
+        ids: str,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        limit: Optional[float] = None,
+        sort: Optional[str] = None,
+        order: Optional[str] = None,
+        select: List[str] | str | None = None,
+        cursor: str = "*",
+        cursor_max: float = 5000,
+        progress_bar: bool = False,
+        warn: bool = False,
+        prefetch: int = 0,
+        typed: bool = False,
+        stream: bool = False,
+        **kwargs,
+    ) -> Iterator[dict]:
+        """
+        Iterate over the works of a journal, one item at a time
+
+        :param ids: A journal ISSN
+        :param query: see :func:`~habanero.Crossref.iter_works` for this and
+            all other parameters
+        :rtype: Iterator[dict]
+
+        Usage::
+
+            from habanero import Crossref
+            cr = Crossref()
+            for item in cr.iter_journal_works("2167-8359", limit = 500, cursor_max = 2000):
+                print(item['DOI'])
+        """
+        return self._iter_works(
+            "/journals/%s/works" % ids,
+            query,
+            filters,
+            limit,
+            sort,
+            order,
+            select,
+            cursor,
+            cursor_max,
+            progress_bar,
+            warn,
+            prefetch,
+            typed,
+            stream,
+            kwargs,
+        )
+
+    def harvest_works(
+        self,
+        checkpoint: Checkpoint | str,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        limit: int = 1000,
+        select: List[str] | str | None = None,
+        **kwargs,
+    ) -> Iterator[dict]:
+        """
+        Harvest Crossref works, resuming from a checkpoint
+
+        Iterates over all works matching a query, like
+        :func:`~habanero.Crossref.iter_works`, saving the cursor, the number
+        of items harvested so far and a fingerprint of the query to
+        `checkpoint` once the items of each page are consumed. If the harvest
+        is interrupted, calling this method again with the same query and
+        checkpoint carries on from the last page saved.
+
+        Works are sorted by `indexed` date, oldest first. Cursors expire after
+        a few minutes unused; when the saved cursor is stale, the harvest
+        restarts with the `from_index_date` filter set to the day of the last
+        item seen. Items are yielded at least once: those of a page that
+        wasn't finished, or indexed on that day, can be yielded again, so
+        deduplicate on `DOI` if needed.
+
+        :param checkpoint: A :class:`~habanero.Checkpoint`, or a path to its
+            JSON file
+        :param query: A query string
+        :param filters: Filter options, see :func:`~habanero.Crossref.works`
+        :param limit: Number of results per page. Default: 1000 (the max)
+        :param select: Elements to return, see :func:`~habanero.Crossref.works`;
+            `indexed` is added if not given
+        :param kwargs: additional named arguments, e.g., field queries
+        :rtype: Iterator[dict]
+
+        Usage::
+
+            from habanero import Crossref, Retry
+            cr = Crossref(retry = Retry())
+            for item in cr.harvest_works("funder.json", filters = {"funder": "10.13039/100000001"}):
+                print(item['DOI'])
+
+            # start again
+            from habanero import Checkpoint
+            Checkpoint("funder.json").clear()
+        """
+        return harvest(
+            self, "/works/", checkpoint, query, filters, select, limit, kwargs
+        )
+
+    def iter_works_sharded(
+        self,
+        start: str,
+        end: str,
+        shards: int = 8,
+        date_filter: Optional[str] = None,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        limit: int = 1000,
+        select: List[str] | str | None = None,
+        queue_size: Optional[int] = None,
+        balance: bool = False,
+        resplit: float = 2.0,
+        **kwargs,
+    ) -> Iterator[dict]:
+        """
+        Iterate over Crossref works, harvesting date range shards in parallel
+
+        A single cursor fetches one page per round trip. This splits the days
+        from `start` to `end` into `shards` disjoint windows, with the
+        `from_<date_filter>_date` and `until_<date_filter>_date` filters,
+        and runs a deep paging cursor for each window in its own thread. All
+        items come out of one iterator, in the order pages arrive, not sorted.
+
+        Throughput grows with `shards` up to what the API allows: pair this
+        with `Crossref(rate_limit=True)` to stay within the rate limit, and
+        with `max_connections_per_host` of at least `shards`.
+
+        Equal width windows are often skewed, as recent years hold most
+        records. With `balance=True`, windows are planned on published dates
+        to hold about the same number of records (see
+        :func:`~habanero.Crossref.plan_shards`), and a window found to hold
+        more than `resplit` times its estimate is split again.
+
+        :param start: First day, e.g., `"2020-01-01"` or a `datetime.date`
+        :param end: Last day, included
+        :param shards: Number of windows, each harvested by a thread.
+            Default: 8
+        :param date_filter: Date filter to split on, e.g., `"index"`
+            (`from_index_date`), `"pub"` (`from_pub_date`), `"created"`.
+            Default: "index", or "pub" when `balance=True`
+        :param query: A query string
+        :param filters: Other filter options, see :func:`~habanero.Crossref.works`
+        :param limit: Number of results per page. Default: 1000 (the max)
+        :param select: Elements to return, see :func:`~habanero.Crossref.works`
+        :param queue_size: Max number of pages fetched but not yet consumed.
+            Default: twice `shards`
+        :param balance: Plan windows of about the same number of records from
+            the `published` facet, instead of equal width windows. Default: False
+        :param resplit: With `balance=True`, split a window again when it
+            holds more than this many times its estimated records. Default: 2
+        :param kwargs: additional named arguments, e.g., field queries
+        :rtype: Iterator[dict]
+
+        Usage::
+
+            from habanero import Crossref
+            cr = Crossref(rate_limit = True)
+            items = cr.iter_works_sharded("2024-01-01", "2024-01-31", shards = 8,
+                filters = {"type": "journal-article"}, select = ["DOI", "title"])
+            for item in items:
+                print(item['DOI'])
+
+            # windows of about the same size, for skewed date ranges
+            items = cr.iter_works_sharded("2000-01-01", "2024-12-31", shards = 16,
+                balance = True, filters = {"member": 98})
+        """
+        if balance:
+            if date_filter not in (None, "pub"):
+                raise ValueError("balance=True splits on published dates only")
+            date_filter = "pub"
+            windows = plan_shards(
+                self, "/works/", start, end, shards, query, filters, kwargs
+            )
+        else:
+            windows = [(z, None) for z in date_windows(start, end, shards)]
+        return sharded_items(
+            self,
+            "/works/",
+            windows,
+            date_filter or "index",
+            query,
+            filters,
+            limit,
+            select,
+            queue_size or 2 * len(windows),
+            resplit,
+            kwargs,
+        )
+
+    def plan_shards(
+        self,
+        start: str,
+        end: str,
+        shards: int = 8,
+        query: Optional[str] = None,
+        filters: Optional[dict] = None,
+        **kwargs,
+    ) -> list[dict]:
+        """
+        Plan date range shards holding about the same number of works
+
+        Makes one request, with `rows=0` and the `published:*` facet, for the
+        number of works per year matching a query, and splits the days from
+        `start` to `end` into up to `shards` published date windows of about
+        the same number of works, assuming works are spread evenly within a
+        year. Used by :func:`~habanero.Crossref.iter_works_sharded` with
+        `balance=True`.
+
+        :param start: First day, e.g., `"2020-01-01"` or a `datetime.date`
+        :param end: Last day, included
+        :param shards: Max number of windows. Default: 8
+        :param query: A query string
+        :param filters: Other filter options, see :func:`~habanero.Crossref.works`
+        :param kwargs: additional named arguments, e.g., field queries
+        :return: A list of dicts with `from` and `until` dates, and the
+            estimated `count` of works
+        :rtype: list[dict]
+
+        Usage::
+
+            from habanero import Crossref
+            cr = Crossref()
+            cr.plan_shards("1990-01-01", "2024-12-31", shards = 10)
+        """
+        windows = plan_shards(
+            self, "/works/", start, end, shards, query, filters, kwargs
+        )
+        return [{"from": a, "until": b, "count": round(n)} for (a, b), n in windows]
+
+    def _iter_works(
+        self,
+        path,
+        query,
+        filters,
+        limit,
+        sort,
+        order,
+        select,
+        cursor,
+        cursor_max,
+        progress_bar,
+        warn,
+        prefetch,
+        typed,
+        stream,
+        kwargs,
+    ):
+        return Request(
+            self.mailto,
+            self.ua_string,
+            self.timeout,
+            self.base_url,
+            path,
+            query,
+            filters,
+            None,
+            limit,
+            None,
+            sort,
+            order,
+            None,
+            select,
+            cursor,
+            cursor_max,
+            None,
+            progress_bar,
+            session=self.session,
+            **kwargs,
+        ).iter_items(should_warn=warn, prefetch=prefetch, typed=typed, stream=stream)
+
     def filter_names(self, route: str = "works") -> list:
         """
         Filter names - just the names of each filter
@@ -1,7 +1,26 @@
+import itertools
+
+from ..arrow import (
+    column_kind,
+    read_parquet,
+    table_column,
+    table_date_parts,
+    to_table,
+    write_parquet,
+)
+from ..frames import pandas_frame, parse_date_parts, parse_dates, polars_frame
+from ..habanero_utils import normalize_doi
+
+
 class WorksContainer:
     """
     WorksContainer: Class for working with works results
 
+    Each key found in any of the works is a column: a list with the value
+    of that key for each work, or `None` for works without it, e.g.,
+    `container-title` is `x.container_title`. A column is made when it's
+    first used, and kept.
+
     :rtype: list
 
     Usage::
@@ -17,6 +36,26 @@ class WorksContainer:
             x.license
             x.title
             x.abstract
+            x.columns
+
+            # works by DOI, in any case, with or without https://doi.org/
+            x['10.1136/JCLINPATH-2020-206745']
+            x.get('https://doi.org/10.1136/esmoopen-2020-000776')
+            '10.1136/esmoopen-2020-000776' in x
+            x.take(['10.1136/esmoopen-2020-000776'])
+            x.join(['10.1136/esmoopen-2020-000776', '10.1/missing'], how = "left")
+
+            # to data frames with typed columns; needs pandas or polars
+            x.to_pandas()
+            x.to_polars()
+
+            # dates as numpy datetime64, and their precision
+            issued, precision = x.dates("issued")
+
+            # to columnar files, and back; needs pyarrow
+            x.to_parquet("works.parquet")
+            y = WorksContainer.from_parquet("works.parquet")
+            y.doi
 
             res2 = cr.works(limit = 2)
             x = WorksContainer(res2)
@@ -41,19 +80,263 @@ class WorksContainer:
         super(WorksContainer, self).__init__()
         if not data:
             raise ValueError("data len must be > zero")
-        self.__data = data
-        self.works = self.works_handler(self.__data)
-        keys = list(self.works[0].keys())
-        for key in keys:
-            values = [work.get(key, None) for work in self.works]
-            setattr(self, key.lower().replace("-", "_"), values)
+        self.works = self.works_handler(data)
+        self._table = None
+        self._index = None
+        # column name: key, for every key found in any work; columns are only
+        # made when first used, as lists sharing the values of `works`
+        self._keys = {
+            key.lower().replace("-", "_"): key
+            for key in dict.fromkeys(itertools.chain.from_iterable(self.works))
+        }
 
     def __repr__(self) -> str:
         return """<%s: No. works: %s>""" % (
             type(self).__name__,
-            len(self.works),
+            len(self),
         )
 
+    def __len__(self) -> int:
+        if self._table is not None:
+            return self._table.num_rows
+        return len(self.works)
+
+    def __getattr__(self, name):
+        table = self.__dict__.get("_table")
+        if name == "works" and table is not None:
+            cols = [table_column(table, z) for z in table.column_names]
+            works = [
+                {
+                    k: v
+                    for k, v in zip(table.column_names, row, strict=True)
+                    if v is not None
+                }
+                for row in zip(*cols, strict=True)
+            ]
+            self.works = works
+            return works
+        keys = self.__dict__.get("_keys")
+        if keys is None or name not in keys:
+            raise AttributeError(
+                "%r object has no attribute %r" % (type(self).__name__, name)
+            )
+        key = keys[name]
+        if table is not None:
+            values = table_column(table, key)
+        else:
+            values = [work.get(key) for work in self.works]
+        setattr(self, name, values)
+        return values
+
+    def __dir__(self):
+        return sorted({*super().__dir__(), "works", *self._keys})
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError("work index out of range")
+            return self._work(key)
+        i = self._doi_index.get(normalize_doi(key))
+        if i is None:
+            raise KeyError(key)
+        return self._work(i)
+
+    def __contains__(self, doi) -> bool:
+        return normalize_doi(doi) in self._doi_index
+
+    @property
+    def _doi_index(self) -> dict:
+        # position of the work with each normalized DOI, made when first
+        # used; for a DOI found more than once, the first work is kept
+        if self._index is None:
+            dois = self.doi if "doi" in self._keys else []
+            index: dict = {}
+            for i, doi in enumerate(dois):
+                if doi is not None:
+                    index.setdefault(normalize_doi(doi), i)
+            self._index = index
+        return self._index
+
+    def get(self, doi, default=None):
+        """
+        The work with DOI `doi`, in any case and with or without a resolver
+        prefix such as `https://doi.org/`, or `default` if there's none
+
+        :param doi: A DOI
+        :param default: What to give back for a DOI not found. Default: None
+        """
+        i = self._doi_index.get(normalize_doi(doi))
+        return default if i is None else self._work(i)
+
+    def take(self, dois) -> "WorksContainer":
+        """
+        A WorksContainer of the works with DOIs `dois`, in that order;
+        DOIs not found are left out
+
+        :param dois: An iterable of DOIs
+        """
+        index = self._doi_index
+        rows = (index.get(normalize_doi(z)) for z in dois)
+        items = [self._work(i) for i in rows if i is not None]
+        return type(self)({"message-type": "work-list", "message": {"items": items}})
+
+    def join(self, dois, how: str = "inner") -> list:
+        """
+        Match an iterable of DOIs against the works, with one lookup each
+
+        :param dois: An iterable of DOIs
+        :param how: `"inner"` to keep only DOIs found, or `"left"` to keep
+            all DOIs, with `None` for those not found. Default: "inner"
+
+        :return: list of `(doi, work)` tuples, in the order of `dois`, each
+            DOI as given
+        """
+        if how not in ("inner", "left"):
+            raise ValueError("how must be one of inner, left")
+        index = self._doi_index
+        out = []
+        for doi in dois:
+            i = index.get(normalize_doi(doi))
+            if i is not None:
+                out.append((doi, self._work(i)))
+            elif how == "left":
+                out.append((doi, None))
+        return out
+
+    def _work(self, i) -> dict:
+        if "works" in self.__dict__ or self._table is None:
+            return self.works[i]
+        # decode only the row wanted from the arrow table
+        row = self._table.slice(i, 1)
+        work = {key: table_column(row, key)[0] for key in row.column_names}
+        return {k: v for k, v in work.items() if v is not None}
+
+    @property
+    def columns(self) -> list:
+        """Names of the columns, one for each key found in any work"""
+        return list(self._keys)
+
+    @classmethod
+    def from_arrow(cls, table) -> "WorksContainer":
+        """
+        A WorksContainer backed by a `pyarrow.Table` made by
+        :func:`~habanero.WorksContainer.to_arrow`; columns, and `works`, are
+        only converted to Python objects when first used
+
+        :param table: A `pyarrow.Table`
+        """
+        x = cls.__new__(cls)
+        x._table = table
+        x._index = None
+        x._keys = {z.lower().replace("-", "_"): z for z in table.column_names}
+        return x
+
+    @classmethod
+    def from_parquet(cls, path, memory_map: bool = True) -> "WorksContainer":
+        """
+        A WorksContainer read from a Parquet file written by
+        :func:`~habanero.WorksContainer.to_parquet`. Only the arrow table
+        is read: see :func:`~habanero.WorksContainer.from_arrow`
+
+        :param path: Path to the file
+        :param memory_map: Map the file into memory instead of reading it.
+            Default: True
+        """
+        return cls.from_arrow(read_parquet(path, memory_map=memory_map))
+
+    def to_arrow(self):
+        """
+        A `pyarrow.Table`, with a column for each key, named as in Crossref
+        responses. Dates such as `issued` or `indexed` are structs of their
+        `date-parts`, e.g., `[2020, 1, 31]`, `date-time` as a UTC timestamp,
+        `timestamp` and `version`; `author`, `editor` and other contributors
+        are lists of structs of `given`, `family`, `name`, `ORCID`,
+        `sequence`, `suffix`, `authenticated-orcid`, affiliations (`name`,
+        `place` and `id`) and roles (`role` and `vocabulary`); other nested
+        fields, e.g., `license`, are JSON text. Columns with fields not listed here are JSON text too, so that
+        works are read back as they were.
+
+        :rtype: pyarrow.Table
+        """
+        if self._table is not None:
+            return self._table
+        return to_table(self._column_items())
+
+    def dates(self, name):
+        """
+        A date column, e.g., `issued`, `published`, `created` or `indexed`,
+        as NumPy `datetime64[D]` dates, with an array of the precision of
+        each date: `"year"`, `"month"` or `"day"`, or `""` for works
+        without the date, which are `NaT`. Missing months and days are
+        taken as the first. Needs numpy
+
+        :param name: Name of the column, or the key, e.g., `"issued"`
+
+        :rtype: tuple of two numpy.ndarray
+        """
+        name = name.lower().replace("-", "_")
+        if name not in self._keys:
+            raise ValueError("no column %r" % name)
+        key = self._keys[name]
+        if name not in self.__dict__ and self._table is not None:
+            # arrow keeps the date parts; no need to make dicts
+            return parse_date_parts(table_date_parts(self._table, key))
+        values = getattr(self, name)
+        if column_kind(key, values) != "date":
+            raise ValueError("%r is not a date column" % name)
+        return parse_dates(values)
+
+    def to_pandas(self):
+        """
+        A `pandas.DataFrame`, with a column for each key, named as in Crossref
+        responses. Dates such as `issued` are `datetime64`, from their first
+        date parts, with missing months and days as 1; counts are `int64`
+        (`Int64` with missing values); `type`, `publisher`, `member`,
+        `prefix` and other repeated strings are categoricals; lists and
+        nested fields are kept as Python objects.
+
+        To convert the pages of a cursor query without making a
+        WorksContainer, see :func:`habanero.frames.to_pandas`
+
+        :rtype: pandas.DataFrame
+        """
+        return pandas_frame(dict(self._column_items()))
+
+    def to_polars(self):
+        """
+        A `polars.DataFrame`, typed as in
+        :func:`~habanero.WorksContainer.to_pandas`, except that lists of
+        strings are lists, contributors lists of structs, and other nested
+        fields JSON text
+
+        :rtype: polars.DataFrame
+        """
+        return polars_frame(dict(self._column_items()))
+
+    def _column_items(self):
+        # (key, values) for each column, reusing columns made already
+        for name, key in self._keys.items():
+            values = self.__dict__.get(name)
+            if values is None:
+                if self._table is not None:
+                    values = table_column(self._table, key)
+                else:
+                    values = [w.get(key) for w in self.works]
+            yield key, values
+
+    def to_parquet(self, path, **kwargs) -> None:
+        """
+        Write the works to a Parquet file, see
+        :func:`~habanero.WorksContainer.to_arrow`
+
+        :param path: Path to the file
+        :param kwargs: passed on to `pyarrow.parquet.write_table`, e.g.,
+            `compression`
+        """
+        write_parquet(self.to_arrow(), path, **kwargs)
+
     def works_handler(self, x: list | dict) -> list:
         message_type = (
             next(w["message-type"] for w in x)
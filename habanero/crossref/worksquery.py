@@ -1,9 +1,23 @@
 import copy
+import itertools
+import math
 from collections.abc import Iterable, Iterator
 from typing import Any
 
+from ..request import OFFSET_MAX
+from ..sink import NDJSONSink, write_items
 from .crossref import Crossref
 
+STRATEGIES = ("auto", "single", "cursor", "offset", "sharded")
+
+# rough costs, for comparing plans: seconds of latency per request, seconds
+# per record, and bytes per record, in full or per selected field
+REQUEST_SECONDS = 0.5
+RECORD_SECONDS = 0.001
+RECORD_BYTES = 4000
+FIELD_BYTES = 150
+ROWS_MAX = 1000
+
 
 class WorksQuery(Iterable[dict[str, Any]]):
     """
@@ -17,7 +31,7 @@ class WorksQuery(Iterable[dict[str, Any]]):
 
     All builder methods (:meth:`query`, :meth:`filter`, :meth:`sort`,
     :meth:`order`, :meth:`select`, :meth:`facet`, :meth:`limit`,
-    :meth:`cursor`) return a new :class:`WorksQuery` instance — the original
+    :meth:`cursor`, :meth:`parallel`, :meth:`strategy`) return a new :class:`WorksQuery` instance — the original
     is never mutated.
 
     :rtype: :class:`WorksQuery`
@@ -54,6 +68,20 @@ class WorksQuery(Iterable[dict[str, Any]]):
       # or execute manually
       q.execute()
 
+      # let habanero pick how to fetch 50000 records, and say why
+      q = WorksQuery(cr).filter(from_index_date="2024-01-01", until_index_date="2024-06-30")
+      q = q.cursor(cursor_max=50000).strategy("auto")
+      q.explain()   # {'strategy': 'sharded', 'requests': 50, ...}
+      for item in q:
+          print(item["DOI"])
+
+      # write a deep paging harvest to a file as it arrives
+      WorksQuery(cr).query("octopus").limit(1000).cursor(cursor_max=100000).stream_to(
+          "octopus.ndjson.gz", compress="gzip")
+
+      # fetch all records of a mid-sized query, 4 pages at a time
+      WorksQuery(cr).query("octopus").limit(1000).parallel(offset_max=10000).execute()
+
       # instances are immutable, so each call returns a new instance
       # so you can chain calls without modifying the original instance
       # compare the two modifications of the `base` query
@@ -68,8 +96,15 @@ class WorksQuery(Iterable[dict[str, Any]]):
         self._endpoint = "works"
         self._ids = None
         self._result = None
+        self._strategy = None
+        self._max_workers = 8
+        # parallel() settings, kept apart from those of strategy()
+        self._offset_max = None
+        self._offset_workers = 4
 
     def __iter__(self) -> Iterator[dict[str, Any]]:
+        if self._strategy is not None:
+            return self._run(self.explain())
         data = self.execute()
         return iter(data["message"]["items"])
 
@@ -147,6 +182,175 @@ class WorksQuery(Iterable[dict[str, Any]]):
     def cursor(self, value: str = "*", cursor_max: float = 5000) -> "WorksQuery":
         return self._clone(cursor=value, cursor_max=cursor_max)
 
+    def parallel(self, offset_max: int = 10000, max_workers: int = 4) -> "WorksQuery":
+        """
+        Fetch up to `offset_max` records with offset paging, `max_workers`
+        pages at a time, see the `offset_max` parameter of
+        :meth:`~habanero.Crossref.works`. Only for the works endpoint.
+        """
+        clone = self._clone()
+        clone._offset_max = offset_max
+        clone._offset_workers = max_workers
+        return clone
+
+    def strategy(self, name: str = "auto", max_workers: int = 8) -> "WorksQuery":
+        """
+        Fetch with a harvest strategy: `"single"` (one request), `"cursor"`
+        (deep paging), `"offset"` (parallel offset paging, fewer than 10000
+        records, works endpoint only), `"sharded"` (parallel date range
+        shards, needs a `from_x_date` and `until_x_date` filter pair, works
+        endpoint only; items come in no order, so only for all the records
+        of a query without `sort` or `order`), or `"auto"` for the cheapest
+        one, see :meth:`explain`.
+        The number of records wanted is `limit`, or `cursor_max` with
+        :meth:`cursor`.
+
+        :param name: Strategy name. Default: "auto"
+        :param max_workers: Number of requests made at a time by the offset
+            and sharded strategies. Default: 8
+        """
+        if name not in STRATEGIES:
+            raise ValueError("strategy must be one of %s" % ", ".join(STRATEGIES))
+        clone = self._clone()
+        clone._strategy = name
+        clone._max_workers = max_workers
+        return clone
+
+    def explain(self) -> dict[str, Any]:
+        """
+        The plan for fetching this query: uses :meth:`count` (one request),
+        and the requested `limit` or `cursor_max`, to estimate the number of
+        requests, bytes and wall time of each strategy, and picks the
+        cheapest one, or the one set with :meth:`strategy`.
+
+        :return: A dict with the `strategy`, the number of `records` wanted,
+            `rows` per request, and estimated `requests`, `bytes` and
+            `seconds`, with `alternatives`: the estimates for the other
+            strategies that can be used
+        """
+        plans = self._plans(self.count())
+        name = self._strategy or "auto"
+        if name == "auto":
+            name = min(plans, key=lambda z: (plans[z]["seconds"], plans[z]["requests"]))
+        if name not in plans:
+            raise ValueError("strategy %r can't be used for this query" % name)
+        return {
+            **plans[name],
+            "alternatives": {k: v for k, v in plans.items() if k != name},
+        }
+
+    def _wanted(self, count):
+        if "cursor" in self._params:
+            return min(count, int(self._params.get("cursor_max") or count))
+        return min(count, int(self._params.get("limit") or 20))
+
+    def _date_range(self):
+        """(date filter, from, until) of a from_x_date/until_x_date filter pair"""
+        filts = self._params.get("filter", {})
+        for k, v in filts.items():
+            if k.startswith("from_") and k.endswith("_date"):
+                name = k[len("from_") : -len("_date")]
+                until = filts.get("until_%s_date" % name)
+                if until:
+                    return name, str(v), str(until)
+        return None
+
+    def _plans(self, count):
+        wanted = self._wanted(count)
+        rows = min(int(self._params.get("limit") or ROWS_MAX), ROWS_MAX)
+        select = self._params.get("select")
+        per_record = FIELD_BYTES * len(select) if select else RECORD_BYTES
+        workers = max(1, self._max_workers)
+        pages = max(1, math.ceil(wanted / rows))
+
+        def seconds(rounds, n):
+            return rounds * (REQUEST_SECONDS + RECORD_SECONDS * n)
+
+        def plan(name, requests, rounds):
+            return {
+                "strategy": name,
+                "records": wanted,
+                "rows": rows,
+                "requests": requests,
+                "bytes": wanted * per_record,
+                "seconds": round(seconds(rounds, min(rows, wanted)), 2),
+            }
+
+        plans = {}
+        if wanted <= ROWS_MAX:
+            plans["single"] = plan("single", 1, 1)
+            plans["single"]["rows"] = wanted
+            plans["single"]["seconds"] = round(seconds(1, wanted), 2)
+        plans["cursor"] = plan("cursor", pages, pages)
+        works = self._endpoint == "works"
+        if works and wanted <= OFFSET_MAX:
+            plans["offset"] = plan(
+                "offset", pages, 1 + math.ceil((pages - 1) / workers)
+            )
+        date_range = self._date_range()
+        # shards yield items in no order: the first `wanted` of them aren't
+        # the first `wanted` of the query, and aren't sorted
+        unordered = not ({"sort", "order"} & set(self._params)) and wanted >= count
+        if works and date_range is not None and unordered:
+            # on published dates, a request for the published facet first
+            # plans balanced shards
+            facet = int(date_range[0] == "pub")
+            plans["sharded"] = plan(
+                "sharded", pages + facet, facet + math.ceil(pages / workers)
+            )
+        return plans
+
+    def _run(self, plan) -> Iterator[dict[str, Any]]:
+        """Yield the items of this query fetched following `plan`"""
+        params = self._method_params()
+        params.pop("cursor", None)
+        params.pop("cursor_max", None)
+        params.pop("offset_max", None)
+        params.pop("max_workers", None)
+        params["limit"] = plan["rows"]
+        wanted = plan["records"]
+        name = plan["strategy"]
+        if name == "single":
+            res = self._call_method(cursor=None, offset_max=None, limit=wanted)
+            return iter(res["message"]["items"])
+        if name == "offset":
+            params.pop("facet", None)
+            res = self._cr.works(
+                **params, offset_max=wanted, max_workers=self._max_workers
+            )
+            return iter(res["message"]["items"])
+        if name == "sharded":
+            date_filter, start, until = self._date_range()
+            filters = dict(params.pop("filters", {}))
+            filters.pop("from_%s_date" % date_filter)
+            filters.pop("until_%s_date" % date_filter)
+            params.pop("facet", None)
+            items = self._cr.iter_works_sharded(
+                start,
+                until,
+                shards=self._max_workers,
+                date_filter=date_filter,
+                filters=filters,
+                balance=date_filter == "pub",
+                **params,
+            )
+            return itertools.islice(items, wanted)
+        params.pop("facet", None)
+        if self._endpoint == "works" or (
+            self._endpoint in ("members", "journals") and self._ids
+        ):
+            method = {
+                "works": self._cr.iter_works,
+                "members": self._cr.iter_members_works,
+                "journals": self._cr.iter_journal_works,
+            }[self._endpoint]
+            args = () if self._endpoint == "works" else (self._ids,)
+            return method(*args, cursor_max=wanted, **params)
+        pages = self._call_method(cursor="*", cursor_max=wanted)
+        if isinstance(pages, dict):
+            pages = [pages]
+        return (z for page in pages for z in page["message"]["items"])
+
     @property
     def url(self) -> str:
         from urllib.parse import urlencode
@@ -167,8 +371,22 @@ class WorksQuery(Iterable[dict[str, Any]]):
         }
         return f"{base}{path}?{urlencode(flat)}"
 
+    def _method_params(self) -> dict[str, Any]:
+        """Params named as the :class:`~habanero.Crossref` method arguments"""
+        params = dict(self._params)
+        if "filter" in params:
+            params["filters"] = params.pop("filter")
+        if self._offset_max is not None:
+            params["offset_max"] = self._offset_max
+            params["max_workers"] = self._offset_workers
+        return params
+
     def count(self) -> int:
-        params = {k: v for k, v in self._params.items() if k != "limit"}
+        params = {
+            k: v
+            for k, v in self._method_params().items()
+            if k not in ("limit", "offset_max", "max_workers", "cursor", "cursor_max")
+        }
         if self._endpoint == "works":
             result = self._cr.works(**params, limit=0)
         else:
@@ -178,9 +396,11 @@ class WorksQuery(Iterable[dict[str, Any]]):
         return result["message"]["total-results"]
 
     def _call_method(self, **extra_params) -> dict[str, Any] | list[dict[str, Any]]:
-        params = {**self._params, **extra_params}
+        params = {**self._method_params(), **extra_params}
         if self._endpoint == "works":
             return self._cr.works(**params)
+        if params.get("offset_max"):
+            raise ValueError("parallel() is only supported on the works endpoint")
         method = getattr(self._cr, self._endpoint)
         return method(ids=self._ids, works=True, **params)
 
@@ -190,3 +410,31 @@ class WorksQuery(Iterable[dict[str, Any]]):
             assert isinstance(result, dict)
             self._result = result
         return self._result
+
+    def stream_to(
+        self, path: str | NDJSONSink, compress: str | None = None, **kwargs
+    ) -> int:
+        """
+        Write the items of this query to a newline delimited JSON file as
+        they arrive, one page in memory at a time, giving back the number
+        of items written
+
+        :param path: Path to the file, or an :class:`~habanero.NDJSONSink`
+        :param compress: One of `None`, `"gzip"` or `"zstd"`. Default: None
+        :param kwargs: passed on to :class:`~habanero.NDJSONSink`, e.g.,
+            `batch_size` and `fsync_interval`
+        """
+        if not isinstance(path, NDJSONSink):
+            path = NDJSONSink(path, compress=compress, **kwargs)
+        if self._strategy is not None:
+            items = self._run(self.explain())
+        elif "cursor" in self._params:
+            plan = {
+                "strategy": "cursor",
+                "rows": self._params.get("limit"),
+                "records": self._params.get("cursor_max", 5000),
+            }
+            items = self._run(plan)
+        else:
+            items = iter(self)
+        return write_items(path, items)
@@ -0,0 +1,52 @@
+import json
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    _has_orjson = False
+else:
+    _has_orjson = True
+
+try:
+    import msgspec  # type: ignore
+except ImportError:
+    _has_msgspec = False
+else:
+    _has_msgspec = True
+    _msgspec_decoder = msgspec.json.Decoder()
+
+DECODERS = ("auto", "orjson", "msgspec", "json")
+
+
+def json_decoder(x=None):
+    """
+    A function decoding JSON from bytes or str
+
+    :param x: A function, or the name of a decoder: `"orjson"`, `"msgspec"`,
+        `"json"` (the standard library), or `"auto"`, the first of these
+        installed. Default: "auto"
+    """
+    if callable(x):
+        return x
+    name = x or "auto"
+    if name not in DECODERS:
+        raise ValueError("decoder must be one of %s" % ", ".join(DECODERS))
+    if name == "auto":
+        name = "orjson" if _has_orjson else "msgspec" if _has_msgspec else "json"
+    if name == "orjson":
+        if not _has_orjson:
+            raise ImportError("decoder 'orjson' needs the orjson package")
+        return orjson.loads
+    if name == "msgspec":
+        if not _has_msgspec:
+            raise ImportError("decoder 'msgspec' needs the msgspec package")
+        return msgspec_loads
+    return json.loads
+
+
+def msgspec_loads(x):
+    # raise ValueError on bad JSON, as json.loads and orjson.loads do
+    try:
+        return _msgspec_decoder.decode(x)
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e)) from e
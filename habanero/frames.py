@@ -0,0 +1,220 @@
+try:
+    import numpy as np  # type: ignore
+except ImportError:
+    _has_numpy = False
+else:
+    _has_numpy = True
+
+try:
+    import pandas as pd  # type: ignore
+except ImportError:
+    _has_pandas = False
+else:
+    _has_pandas = True
+
+try:
+    import polars as pl  # type: ignore
+except ImportError:
+    _has_polars = False
+else:
+    _has_polars = True
+
+from .arrow import column_kind, encode, first_date_parts
+
+# string columns with few distinct values, kept as categoricals
+CATEGORIES = ("type", "subtype", "publisher", "member", "prefix", "language", "source")
+
+# precision of a date, by number of date parts
+PRECISIONS = ("", "year", "month", "day")
+_ZEROS = (0, 0, 0)
+
+
+def page_items(data):
+    """
+    Yield the items of `data`: a response, a list of responses such as the
+    pages of a cursor query, or a list of items
+    """
+    if isinstance(data, dict):
+        data = [data]
+    for x in data:
+        if "message-type" not in x:
+            yield x
+        elif x["message-type"] == "work-list":
+            yield from x["message"]["items"]
+        elif x["message-type"] == "work":
+            yield x["message"]
+        else:
+            raise TypeError(
+                "can only handle Crossref message-type 'work' & 'work-list', got: '%s'"
+                % x["message-type"]
+            )
+
+
+def item_columns(items) -> dict:
+    """
+    A list of values for each key found in any of `items`, in one pass
+    over them, with `None` where an item doesn't have a key
+    """
+    columns: dict = {}
+    n = 0
+    for item in items:
+        for key, value in item.items():
+            col = columns.get(key)
+            if col is None:
+                col = columns[key] = [None] * n
+            elif len(col) < n:
+                col.extend([None] * (n - len(col)))
+            col.append(value)
+        n += 1
+    for col in columns.values():
+        if len(col) < n:
+            col.extend([None] * (n - len(col)))
+    return columns
+
+
+def date_parts(values):
+    """
+    Years, months and days of Crossref dates, missing months and days
+    being 1, and all three `None` for missing dates
+    """
+    years, months, days = [], [], []
+    for x in values:
+        parts = first_date_parts(x)
+        if parts is None:
+            years.append(None)
+            months.append(None)
+            days.append(None)
+            continue
+        years.append(parts[0])
+        months.append(parts[1] if len(parts) > 1 and parts[1] else 1)
+        days.append(parts[2] if len(parts) > 2 and parts[2] else 1)
+    return years, months, days
+
+
+def flat_date_parts(parts) -> list:
+    """
+    Year, month and day of each list of date parts in `parts`, one after
+    the other, with 0 for missing parts
+    """
+    flat: list = []
+    for x in parts:
+        x = (x or ())[:3]
+        flat.extend([z or 0 for z in x])
+        flat.extend(_ZEROS[len(x) :])
+    return flat
+
+
+def parse_date_parts(parts):
+    """
+    NumPy `datetime64[D]` dates, and the precision of each, from lists of
+    date parts such as `[2020, 1]`; see :func:`parse_dates`
+    """
+    if not _has_numpy:
+        raise ImportError("numpy is required; install it with: pip install numpy")
+    ymd = np.array(flat_date_parts(parts), dtype=np.int64).reshape(-1, 3)
+    y, m, d = ymd[:, 0], ymd[:, 1], ymd[:, 2]
+    has_year = y > 0
+    has_month = has_year & (m > 0)
+    has_day = has_month & (d > 0)
+    codes = has_year.astype(np.int8) + has_month + has_day
+    dates = (y - 1970).astype("datetime64[Y]").astype("datetime64[M]")
+    dates = dates + np.where(has_month, m - 1, 0)
+    dates = dates.astype("datetime64[D]") + np.where(has_day, d - 1, 0)
+    dates[~has_year] = np.datetime64("NaT", "D")
+    return dates, np.array(PRECISIONS)[codes]
+
+
+def parse_dates(values):
+    """
+    NumPy `datetime64[D]` dates from Crossref dates such as
+    `{"date-parts": [[2020, 1]]}`, and an array of the precision of each:
+    `"year"`, `"month"` or `"day"`, or `""` for missing dates, which are
+    `NaT`. Missing months and days are taken as the first
+
+    Usage::
+
+        from habanero.frames import parse_dates
+        dates, precision = parse_dates([{"date-parts": [[2020, 1]]}, None])
+    """
+    return parse_date_parts(first_date_parts(x) for x in values)
+
+
+def pandas_frame(columns):
+    """A `pandas.DataFrame` with typed dtypes from a dict of columns"""
+    if not _has_pandas:
+        raise ImportError("pandas is required; install it with: pip install pandas")
+    series = {}
+    for key, values in columns.items():
+        kind = column_kind(key, values)
+        if kind == "date":
+            series[key] = pd.Series(parse_dates(values)[0])
+        elif kind == "int":
+            dtype = "Int64" if None in values else "int64"
+            series[key] = pd.Series(values, dtype=dtype)
+        elif kind == "float":
+            series[key] = pd.Series(values, dtype="float64")
+        elif kind == "bool":
+            series[key] = pd.Series(values, dtype="boolean")
+        elif kind == "string" and key in CATEGORIES:
+            series[key] = pd.Series(values, dtype="category")
+        else:
+            series[key] = pd.Series(values, dtype="object")
+    return pd.DataFrame(series)
+
+
+def polars_frame(columns):
+    """A `polars.DataFrame` with typed dtypes from a dict of columns"""
+    if not _has_polars:
+        raise ImportError("polars is required; install it with: pip install polars")
+    series = []
+    for key, values in columns.items():
+        kind = column_kind(key, values)
+        if kind == "date":
+            y, m, d = date_parts(values)
+            parts = pl.DataFrame(
+                {"year": y, "month": m, "day": d},
+                schema={"year": pl.Int32, "month": pl.Int8, "day": pl.Int8},
+            )
+            series.append(
+                parts.select(pl.datetime("year", "month", "day").alias(key)).to_series()
+            )
+        elif kind == "int":
+            series.append(pl.Series(key, values, dtype=pl.Int64))
+        elif kind == "float":
+            series.append(pl.Series(key, values, dtype=pl.Float64))
+        elif kind == "bool":
+            series.append(pl.Series(key, values, dtype=pl.Boolean))
+        elif kind == "string":
+            dtype = pl.Categorical if key in CATEGORIES else pl.Utf8
+            series.append(pl.Series(key, values, dtype=dtype))
+        elif kind == "strings":
+            series.append(pl.Series(key, values, dtype=pl.List(pl.Utf8)))
+        elif kind == "contributors":
+            series.append(pl.Series(key, encode(values, kind), strict=False))
+        else:
+            # nested fields of varying shape, as JSON text
+            series.append(pl.Series(key, encode(values, "json"), dtype=pl.Utf8))
+    return pl.DataFrame(series)
+
+
+def to_pandas(data):
+    """
+    A `pandas.DataFrame` of the works in `data`, a response or a list of
+    responses such as the pages of a cursor query, one row per work
+
+    Usage::
+
+        from habanero import Crossref
+        from habanero.frames import to_pandas
+        cr = Crossref()
+        df = to_pandas(cr.works(query = "ecology", cursor = "*", cursor_max = 500))
+    """
+    return pandas_frame(item_columns(page_items(data)))
+
+
+def to_polars(data):
+    """
+    A `polars.DataFrame` of the works in `data`, see
+    :func:`~habanero.frames.to_pandas`
+    """
+    return polars_frame(item_columns(page_items(data)))
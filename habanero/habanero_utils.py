@@ -42,34 +42,37 @@ def check_kwargs(keys, kwargs):
 
 def check_json(x):
     ctype = x.headers["Content-Type"]
-    matched = re.match("application/json", ctype)
-    if matched.__class__.__name__ == "NoneType":
+    if not ctype.startswith("application/json"):
         scode = x.status_code
         if str(x.text) == "Not implemented.":
             scode = 400
         raise RequestError(scode, str(x.text))
 
 
-def is_json(x):
+def parse_json_err(x, decode=json.loads):
+    """
+    The error message in the body of a failed response, decoding the body
+    once; `None` if the body isn't JSON
+    """
     try:
-        json.loads(x.content)
+        body = decode(x.content)
     except ValueError:  # JSONDecodeError is a subclass of ValueError
-        return False
-    return True
+        return None
+    return json_err_message(body)
 
 
-def parse_json_err(x):
-    msg = x.json()["message"]
+def json_err_message(body):
+    """The error message in a decoded error body"""
+    try:
+        msg = body["message"]
+    except (TypeError, KeyError):
+        return "failed to parse error message"
     if isinstance(msg, str):
         return msg
-    else:
-        failed_parse_msg = "failed to parse error message"
-        try:
-            msg = msg[0]["message"]
-        except TypeError:
-            msg = failed_parse_msg
-
-        return msg
+    try:
+        return msg[0]["message"]
+    except (TypeError, KeyError, IndexError):
+        return "failed to parse error message"
 
 
 def make_ua(mailto=None, ua_string=None):
@@ -97,6 +100,24 @@ def rename_query_filters(x):
     return {mapping[k]: v for k, v in x.items()}
 
 
+DOI_PREFIXES = (
+    "https://doi.org/",
+    "http://doi.org/",
+    "https://dx.doi.org/",
+    "http://dx.doi.org/",
+    "doi:",
+)
+
+
+def normalize_doi(x):
+    """Normalize a DOI for matching: trimmed, lower case, no resolver prefix"""
+    x = str(x).strip().lower()
+    for prefix in DOI_PREFIXES:
+        if x.startswith(prefix):
+            return x[len(prefix) :]
+    return x
+
+
 def ifelsestr(x):
     z = str(x) if x is not None else x
     return z
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import suppress
+from pathlib import Path
+
+import httpx2
+
+from .exceptions import RequestError
+from .request_class import Request
+
+
+class Checkpoint(object):
+    """
+    Habanero: checkpoint class
+
+    The state of a harvest, saved to a JSON file after each page so that an
+    interrupted harvest can carry on where it stopped. The file is written
+    to a temporary file first and then renamed, so it's never left half
+    written.
+
+    :param path: Path to the JSON file, created if it doesn't exist
+
+    Usage::
+
+        from habanero import Checkpoint
+        ckpt = Checkpoint("ecology.json")
+        ckpt.load()
+    """
+
+    def __init__(self, path) -> None:
+        self.path = Path(path)
+
+    def __repr__(self) -> str:
+        return "<%s: %s>" % (type(self).__name__, self.path)
+
+    def load(self) -> dict | None:
+        """The saved state, or `None` if there's none yet"""
+        try:
+            with self.path.open() as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, state: dict) -> None:
+        """Save `state`, replacing the saved state in one step"""
+        fd, tmp = tempfile.mkstemp(
+            dir=self.path.resolve().parent, prefix=".habanero-", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(state, f)
+                f.flush()
+                os.fsync(f.fileno())
+            Path(tmp).replace(self.path)
+        except BaseException:
+            Path(tmp).unlink()
+            raise
+
+    def clear(self) -> None:
+        """Delete the saved state, to start the harvest again"""
+        with suppress(FileNotFoundError):
+            self.path.unlink()
+
+
+def fingerprint(path, query, filters, select, kwargs):
+    """A hash of the query a harvest is for"""
+    x = json.dumps([path, query, filters, select, kwargs], sort_keys=True, default=str)
+    return hashlib.sha256(x.encode()).hexdigest()
+
+
+def harvest(cr, path, checkpoint, query, filters, select, limit, kwargs):
+    """
+    Yield items of a deep paging query sorted by `indexed` date, saving
+    progress to `checkpoint` after the items of each page are consumed
+    """
+    if not isinstance(checkpoint, Checkpoint):
+        checkpoint = Checkpoint(checkpoint)
+    if isinstance(select, str):
+        select = select.split(",")
+    if select is not None and "indexed" not in select:
+        # needed to restart from the last indexed date
+        select = [*select, "indexed"]
+    fp = fingerprint(path, query, filters, select, kwargs)
+    state = checkpoint.load()
+    if state is None:
+        state = {
+            "fingerprint": fp,
+            "cursor": "*",
+            "count": 0,
+            "last_indexed": None,
+            "from_index_date": None,
+            "done": False,
+        }
+        checkpoint.save(state)
+    elif state["fingerprint"] != fp:
+        raise ValueError(
+            "checkpoint %s is for a different query; clear it to start again"
+            % checkpoint.path
+        )
+
+    while not state["done"]:
+        filts = dict(filters or {})
+        if state["from_index_date"]:
+            filts["from_index_date"] = state["from_index_date"]
+        req = Request(
+            cr.mailto,
+            cr.ua_string,
+            cr.timeout,
+            cr.base_url,
+            path,
+            query,
+            filts,
+            None,
+            limit,
+            None,
+            "indexed",
+            "asc",
+            None,
+            select,
+            state["cursor"],
+            None,
+            None,
+            False,
+            session=cr.session,
+            **kwargs,
+        )
+        try:
+            js = req._req(payload=req._payload(), should_warn=False)
+        except (RequestError, httpx2.HTTPStatusError):
+            since = state["last_indexed"] and state["last_indexed"][:10]
+            if state["cursor"] == "*" or since is None:
+                # no page consumed since the last (re)start: the error isn't
+                # a stale cursor
+                raise
+            # cursors expire after a few minutes unused: start a new cursor
+            # from the day of the last item seen
+            state["cursor"] = "*"
+            state["from_index_date"] = since
+            checkpoint.save(state)
+            continue
+
+        items = js["message"]["items"]
+        yield from items
+
+        state["count"] += len(items)
+        for item in reversed(items):
+            indexed = (item.get("indexed") or {}).get("date-time")
+            if indexed:
+                state["last_indexed"] = indexed
+                break
+        cursor = js["message"].get("next-cursor")
+        if not items or cursor is None:
+            state["done"] = True
+        else:
+            state["cursor"] = cursor
+        checkpoint.save(state)
@@ -0,0 +1,94 @@
+import asyncio
+import queue
+import threading
+
+_DONE = object()
+
+
+def read_ahead(iterable, size):
+    """
+    Iterate over `iterable` in a background thread, up to `size` values ahead
+    of the consumer, so that fetching the next value overlaps with
+    processing the current one. Errors are raised in the consumer, in order.
+    """
+    if size < 1:
+        raise ValueError("size must be at least 1")
+    values = queue.Queue()
+    slots = threading.Semaphore(size)
+    stop = threading.Event()
+
+    def acquire():
+        while not stop.is_set():
+            if slots.acquire(timeout=0.1):
+                return True
+        return False
+
+    def worker():
+        it = iter(iterable)
+        try:
+            while acquire():
+                try:
+                    x = next(it)
+                except StopIteration:
+                    values.put((True, _DONE))
+                    return
+                values.put((True, x))
+        except BaseException as e:
+            values.put((False, e))
+        finally:
+            close = getattr(it, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=worker, name="habanero-prefetch", daemon=True)
+    thread.start()
+    try:
+        while True:
+            ok, x = values.get()
+            if not ok:
+                raise x
+            if x is _DONE:
+                return
+            slots.release()
+            yield x
+    finally:
+        stop.set()
+
+
+async def async_read_ahead(aiterable, size):
+    """The asyncio counterpart of `read_ahead`, fetching in a background task"""
+    if size < 1:
+        raise ValueError("size must be at least 1")
+    values = asyncio.Queue()
+    slots = asyncio.Semaphore(size)
+
+    async def worker():
+        it = aiterable.__aiter__()
+        try:
+            while True:
+                await slots.acquire()
+                try:
+                    x = await it.__anext__()
+                except StopAsyncIteration:
+                    values.put_nowait((True, _DONE))
+                    return
+                values.put_nowait((True, x))
+        except Exception as e:
+            values.put_nowait((False, e))
+        finally:
+            aclose = getattr(it, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    task = asyncio.ensure_future(worker())
+    try:
+        while True:
+            ok, x = await values.get()
+            if not ok:
+                raise x
+            if x is _DONE:
+                return
+            slots.release()
+            yield x
+    finally:
+        task.cancel()
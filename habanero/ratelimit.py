@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+INTERVAL_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class RateLimiter(object):
+    """
+    Habanero: rate limiter class
+
+    A token bucket shared by all threads (and coroutines) sending requests
+    through a :class:`~habanero.Session`. The allowed rate is read from the
+    `X-Rate-Limit-Limit` and `X-Rate-Limit-Interval` headers Crossref sends
+    with every response, so requests go out as fast as Crossref allows, and
+    no faster. Until a response says what the limit is, requests aren't
+    throttled, unless `limit` is given.
+
+    :param limit: Number of requests allowed per `interval` to start with.
+        Default: None (no limit until one is read from a response)
+    :param interval: Number of seconds in an interval. Default: 1.0
+
+    Usage::
+
+        from habanero import Crossref
+        cr = Crossref(rate_limit = True)
+        cr.works(ids = dois, max_workers = 16)
+        cr.session.rate_limiter
+    """
+
+    def __init__(self, limit: int | None = None, interval: float = 1.0) -> None:
+        self.limit = limit
+        self.interval = interval
+        self._tokens = float(limit or 0)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return "<%s: limit: %s, interval: %ss>" % (
+            type(self).__name__,
+            self.limit,
+            self.interval,
+        )
+
+    @property
+    def rate(self) -> float | None:
+        """Requests allowed per second, or None if not known"""
+        if not self.limit:
+            return None
+        return self.limit / self.interval
+
+    def _reserve(self) -> float:
+        # take a token, giving back how many seconds to wait before using it.
+        # the bucket may go below zero, so that threads line up for tokens
+        # in the order they asked for them
+        with self._lock:
+            rate = self.rate
+            if rate is None:
+                return 0.0
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.limit), self._tokens + (now - self._updated) * rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / rate
+
+    def acquire(self) -> None:
+        """Wait until a request may be sent"""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self) -> None:
+        """Wait until a request may be sent, without blocking the event loop"""
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def update(self, headers) -> None:
+        """Update the limit from `X-Rate-Limit-*` response headers, if present"""
+        limit = parse_limit(headers.get("x-rate-limit-limit"))
+        interval = parse_interval(headers.get("x-rate-limit-interval"))
+        if limit is None:
+            return
+        interval = interval or self.interval
+        if limit == self.limit and interval == self.interval:
+            return
+        with self._lock:
+            if self.limit is None:
+                self._tokens = float(limit)
+                self._updated = time.monotonic()
+            self.limit = limit
+            self.interval = interval
+            self._tokens = min(self._tokens, float(limit))
+
+
+def parse_limit(x):
+    try:
+        limit = int(x)
+    except (TypeError, ValueError):
+        return None
+    return limit if limit > 0 else None
+
+
+def parse_interval(x):
+    if not x:
+        return None
+    x = x.strip().lower()
+    for unit in sorted(INTERVAL_UNITS, key=len, reverse=True):
+        if x.endswith(unit):
+            x, scale = x[: -len(unit)], INTERVAL_UNITS[unit]
+            break
+    else:
+        scale = 1.0
+    try:
+        interval = float(x) * scale
+    except ValueError:
+        return None
+    return interval if interval > 0 else None
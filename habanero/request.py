@@ -1,23 +1,17 @@
+import json
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 import httpx2
 
 from .exceptions import RequestError
-from .facets import validate_facets
-from .field_queries import validate_field_queries
-from .filterhandler import filter_handler
 from .habanero_utils import (
     check_json,
-    filter_dict,
-    ifelsestr,
-    is_json,
     make_ua,
+    normalize_doi,
     parse_json_err,
-    rename_query_filters,
 )
-from .request_class import Request
-from .select import validate_select
-from .sort import validate_sort
+from .request_class import Request, make_payload
 
 
 def request(
@@ -39,89 +33,55 @@ def request(
     agency=False,
     progress_bar=False,
     should_warn=False,
+    max_workers=None,
     **kwargs,
 ):
     """HTTP request helper."""
-    warning_thrown = False
     url = cr.base_url + path
 
     if cursor_max and not isinstance(cursor_max, int):
         raise ValueError("cursor_max must be of class int")
 
-    filt = filter_handler(filters)
-    if isinstance(select, list):
-        select = ",".join(select)
-
-    validate_facets(facet)
-    validate_sort(sort)
-    validate_select(select)
-    fq_keys = [
-        k.replace("query_", "query.", 1).replace("_", "-") for k in filter_dict(kwargs)
-    ]
-    validate_field_queries(fq_keys if fq_keys else None)
-
-    payload = {
-        "query": query,
-        "filter": filt,
-        "offset": offset,
-        "rows": limit,
-        "sample": sample,
-        "sort": sort,
-        "order": order,
-        "facet": facet,
-        "select": select,
-        "cursor": cursor,
-    }
-    # convert limit/offset to str before removing None
-    # b/c 0 (zero) is falsey, so that param gets dropped
-    payload["offset"] = ifelsestr(payload["offset"])
-    payload["rows"] = ifelsestr(payload["rows"])
-    # remove params with value None
-    payload = {k: v for k, v in payload.items() if v}
-    # add field queries
-    payload.update(filter_dict(kwargs))
-    # rename field queries
-    payload = rename_query_filters(payload)
+    payload = make_payload(
+        query,
+        filters,
+        offset,
+        limit,
+        sample,
+        sort,
+        order,
+        facet,
+        select,
+        cursor,
+        kwargs,
+    )
 
     if ids is None:
         url = url.strip("/")
         try:
-            r = httpx2.get(
+            r = cr.session.get(
                 url,
                 params=payload,
                 headers=make_ua(cr.mailto, cr.ua_string),
                 timeout=cr.timeout,
             )
-            r.raise_for_status()
-        except httpx2.HTTPStatusError as e:
-            if is_json(r):
-                raise RequestError(r.status_code, parse_json_err(r)) from e
-            else:
-                r.raise_for_status()
         except httpx2.HTTPError as e:
             raise RuntimeError(f"HTTP Exception for {e.request.url} - {e}") from e
-            # raise RuntimeError(e)
-        else:
-            if not r:
-                raise RuntimeError("An unknown problem occurred with an HTTP request")
-
-            check_json(r)
-            coll = r.json()
+        coll = parse_response(r, cr.session.decoder)
     else:
         if isinstance(ids, str):
             ids = ids.split()
         if isinstance(ids, int):
             ids = [ids]
 
-        coll = []
-        for i in range(len(ids)):
+        def fetch(ident):
             if works:
                 res = Request(
                     cr.mailto,
                     cr.ua_string,
                     cr.timeout,
                     url,
-                    str(ids[i]) + "/works",
+                    str(ident) + "/works",
                     query,
                     filters,
                     offset,
@@ -135,35 +95,224 @@ def request(
                     cursor_max,
                     None,
                     progress_bar,
+                    session=cr.session,
                     **kwargs,
                 ).do_request(should_warn=should_warn)
-                coll.append(res)
-            else:
-                endpt = url + str(ids[i]) + "/agency" if agency else url + str(ids[i])
-                endpt = endpt.strip("/")
-                r = httpx2.get(
-                    endpt,
-                    params=payload,
-                    headers=make_ua(cr.mailto, cr.ua_string),
-                    timeout=cr.timeout,
-                )
-                if r.status_code > 201 and should_warn:
-                    warning_thrown = True
-                    mssg = "%s on %s: %s" % (r.status_code, ids[i], r.reason_phrase)
-                    warnings.warn(mssg, stacklevel=2)
-                else:
-                    r.raise_for_status()
-
-                if warning_thrown:
-                    coll.append(None)
-                else:
-                    check_json(r)
-                    js = r.json()
-                    coll.append(js)
-
-                warning_thrown = False
+                return res, None
+            r = cr.session.get(
+                id_url(url, ident, agency),
+                params=payload,
+                headers=make_ua(cr.mailto, cr.ua_string),
+                timeout=cr.timeout,
+            )
+            return parse_id_response(r, ident, should_warn, cr.session.decoder)
+
+        if max_workers and len(ids) > 1:
+            # fetch in parallel, failures are collected and warned about
+            # below so that warnings come from this thread, in order
+            pool = ThreadPoolExecutor(max_workers=max_workers)
+            try:
+                results = list(pool.map(fetch, ids))
+            finally:
+                pool.shutdown(cancel_futures=True)
+        else:
+            results = map(fetch, ids)
+
+        coll = []
+        for res, mssg in results:
+            if mssg is not None:
+                warnings.warn(mssg, stacklevel=2)
+            coll.append(res)
 
         if len(coll) == 1:
             coll = coll[0]
 
     return coll
+
+
+def id_url(url, ident, agency):
+    endpt = url + str(ident) + "/agency" if agency else url + str(ident)
+    return endpt.strip("/")
+
+
+def parse_response(r, decode=json.loads):
+    if not r.is_success:
+        # classify the error from its body, decoded once
+        msg = parse_json_err(r, decode)
+        if msg is None:
+            r.raise_for_status()
+        raise RequestError(r.status_code, msg)
+    if not r:
+        raise RuntimeError("An unknown problem occurred with an HTTP request")
+
+    check_json(r)
+    return decode(r.content)
+
+
+def parse_id_response(r, ident, should_warn, decode=json.loads):
+    """Parse a response for one id, giving back (result, warning message)"""
+    if r.status_code > 201 and should_warn:
+        mssg = "%s on %s: %s" % (r.status_code, ident, r.reason_phrase)
+        return None, mssg
+    r.raise_for_status()
+    check_json(r)
+    return decode(r.content), None
+
+
+BATCH_SIZE_MAX = 1000
+
+
+def batch_request(
+    cr, ids, batch_size, select=None, should_warn=False, max_workers=None
+):
+    """Look up DOIs in batches, with the doi filter of the works route"""
+    ids, tasks, select = batch_tasks(ids, batch_size, select)
+
+    def fetch(task):
+        kind, x = task
+        if kind == "single":
+            # commas can't be sent in a doi filter, so look these up alone
+            r = cr.session.get(
+                id_url(cr.base_url + "/works/", x, False),
+                headers=make_ua(cr.mailto, cr.ua_string),
+                timeout=cr.timeout,
+            )
+            return parse_id_response(r, x, True, cr.session.decoder)[0]
+        return request(
+            cr, "/works/", None, filters={"doi": x}, limit=len(x), select=select
+        )
+
+    if max_workers and len(tasks) > 1:
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            envelopes = list(pool.map(fetch, tasks))
+        finally:
+            pool.shutdown(cancel_futures=True)
+    else:
+        envelopes = [fetch(z) for z in tasks]
+
+    return assemble_batches(ids, envelopes, should_warn)
+
+
+def batch_tasks(ids, batch_size, select):
+    if not isinstance(batch_size, int) or not 0 < batch_size <= BATCH_SIZE_MAX:
+        raise ValueError("batch_size must be an int from 1 to %s" % BATCH_SIZE_MAX)
+    if isinstance(ids, str):
+        ids = ids.split()
+    # the DOI is needed to match results back up with ids
+    if isinstance(select, str):
+        select = select.split(",")
+    if select is not None and "DOI" not in select:
+        select = [*select, "DOI"]
+
+    dois = list(dict.fromkeys(normalize_doi(z) for z in ids))
+    tasks = [("single", z) for z in dois if "," in z]
+    dois = [z for z in dois if "," not in z]
+    tasks += [
+        ("batch", dois[i : i + batch_size]) for i in range(0, len(dois), batch_size)
+    ]
+    return ids, tasks, select
+
+
+def assemble_batches(ids, envelopes, should_warn):
+    found = {}
+    for env in envelopes:
+        if env is None:
+            continue
+        if env["message-type"] == "work":
+            found[normalize_doi(env["message"]["DOI"])] = env
+            continue
+        for item in env["message"]["items"]:
+            found[normalize_doi(item["DOI"])] = {
+                "status": env.get("status"),
+                "message-type": "work",
+                "message-version": env.get("message-version"),
+                "message": item,
+            }
+
+    coll = []
+    for z in ids:
+        res = found.get(normalize_doi(z))
+        if res is None and should_warn:
+            warnings.warn("404 on %s: Not Found" % z, stacklevel=3)
+        coll.append(res)
+
+    if len(coll) == 1:
+        coll = coll[0]
+    return coll
+
+
+OFFSET_MAX = 10000
+
+
+def offset_request(
+    cr,
+    path,
+    query,
+    filters,
+    offset,
+    limit,
+    sort,
+    order,
+    facet,
+    select,
+    offset_max,
+    max_workers,
+    kwargs,
+):
+    """
+    Fetch up to `offset_max` records with offset paging: the first page, then
+    the rest in parallel, merged into the first page's response
+    """
+    rows, start = offset_rows(offset, limit, offset_max)
+
+    def fetch(off, facet=None):
+        return request(
+            cr,
+            path,
+            None,
+            query,
+            filters,
+            off or None,
+            rows,
+            None,
+            sort,
+            order,
+            facet,
+            select,
+            **kwargs,
+        )
+
+    first = fetch(start, facet)
+    offsets = offset_pages(first, start, rows, offset_max)
+    if offsets:
+        pool = ThreadPoolExecutor(max_workers=max_workers or 4)
+        try:
+            pages = list(pool.map(fetch, offsets))
+        finally:
+            pool.shutdown(cancel_futures=True)
+    else:
+        pages = []
+    return merge_pages(first, pages, offset_max)
+
+
+def offset_rows(offset, limit, offset_max):
+    if not isinstance(offset_max, int) or offset_max < 1:
+        raise ValueError("offset_max must be a positive int")
+    return int(limit or 20), int(offset or 0)
+
+
+def offset_pages(first, start, rows, offset_max):
+    """Offsets of the pages after `first`, the first page of results"""
+    total = first["message"]["total-results"]
+    # offsets past OFFSET_MAX aren't allowed
+    stop = min(total, start + offset_max, OFFSET_MAX + 1)
+    return range(start + rows, stop, rows)
+
+
+def merge_pages(first, pages, offset_max):
+    items = first["message"]["items"]
+    for page in pages:
+        items.extend(page["message"]["items"])
+    del items[offset_max:]
+    return first
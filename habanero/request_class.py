@@ -1,5 +1,6 @@
 import math
 import warnings
+from functools import partial
 
 import httpx2
 from tqdm import tqdm
@@ -14,10 +15,15 @@ from .habanero_utils import (
     filter_dict,
     ifelsestr,
     make_ua,
+    parse_json_err,
     rename_query_filters,
 )
+from .prefetch import read_ahead
 from .select import validate_select
+from .session import default_session
 from .sort import validate_sort
+from .stream import ItemSplitter
+from .work import decode_work, decode_work_page
 
 
 class Request(object):
@@ -47,6 +53,7 @@ class Request(object):
         cursor_max=5000,
         agency=False,
         progress_bar=False,
+        session=None,
         **kwargs,
     ):
         self.mailto = mailto
@@ -67,52 +74,34 @@ class Request(object):
         self.cursor_max = cursor_max
         self.agency = agency
         self.progress_bar = progress_bar
+        self.session = session or default_session()
         self.kwargs = kwargs
+        self.envelope = None
 
     def _url(self):
         tmpurl = self.url + self.path
         return tmpurl.strip("/")
 
-    def do_request(self, should_warn=False):
-        filt = filter_handler(self.filters)
-        if isinstance(self.select, list):
-            self.select = ",".join(self.select)
-
-        validate_facets(self.facet)
-        validate_sort(self.sort)
-        validate_select(self.select)
-        fq_keys = [
-            k.replace("query_", "query.", 1).replace("_", "-")
-            for k in filter_dict(self.kwargs)
-        ]
-        validate_field_queries(fq_keys if fq_keys else None)
-
+    def _payload(self):
+        payload = make_payload(
+            self.query,
+            self.filters,
+            self.offset,
+            self.limit,
+            self.sample,
+            self.sort,
+            self.order,
+            self.facet,
+            self.select,
+            self.cursor,
+            self.kwargs,
+        )
         if not isinstance(self.cursor_max, (type(None), int)):
             raise ValueError("cursor_max must be of class int")
+        return payload
 
-        payload = {
-            "query": self.query,
-            "filter": filt,
-            "offset": self.offset,
-            "rows": self.limit,
-            "sample": self.sample,
-            "sort": self.sort,
-            "order": self.order,
-            "facet": self.facet,
-            "select": self.select,
-            "cursor": self.cursor,
-        }
-        # convert limit/offset to str before removing None
-        # b/c 0 (zero) is falsey, so that param gets dropped
-        payload["offset"] = ifelsestr(payload["offset"])
-        payload["rows"] = ifelsestr(payload["rows"])
-        # remove params with value None
-        payload = {k: v for k, v in payload.items() if v}
-        # add field queries
-        payload.update(filter_dict(self.kwargs))
-        # rename field queries
-        payload = rename_query_filters(payload)
-
+    def do_request(self, should_warn=False):
+        payload = self._payload()
         js = self._req(payload=payload, should_warn=should_warn)
         if js is None:
             return js
@@ -122,61 +111,200 @@ class Request(object):
         return res
 
     def _redo_req(self, js, payload, cu, max_avail, should_warn):
-        if cu is not None and self.cursor_max > len(js["message"]["items"]):
-            res = [js]
-            total = len(js["message"]["items"])
-
-            # progress bar setup
-            if self.progress_bar:
-                actual_max = (
-                    self.cursor_max if self.cursor_max is not None else max_avail
-                )
-                if max_avail < actual_max:
-                    actual_max = max_avail
-                runs = math.ceil(actual_max / (self.limit or 20))
-                pbar = tqdm(total=runs - 1)
-
-            while cu is not None and self.cursor_max > total and total < max_avail:
+        cursor_max = math.inf if self.cursor_max is None else self.cursor_max
+        if cu is not None and cursor_max > len(js["message"]["items"]):
+            return [js, *self._cursor_pages(js, payload, cu, max_avail, should_warn)]
+        else:
+            return js
+
+    def iter_pages(self, should_warn=False, decode=None):
+        """
+        Yield result envelopes one page at a time, as they arrive, following
+        `next-cursor` when deep paging. Only the page being yielded is kept
+        in memory.
+        """
+        payload = self._payload()
+        js = self._req(payload=payload, should_warn=should_warn, decode=decode)
+        if js is None:
+            return
+        yield js
+        cu = js["message"].get("next-cursor")
+        max_avail = js["message"]["total-results"]
+        yield from self._cursor_pages(js, payload, cu, max_avail, should_warn, decode)
+
+    def iter_items(self, should_warn=False, prefetch=0, typed=False, stream=False):
+        """
+        Yield items one at a time, from pages fetched as needed, or with
+        `prefetch`, from up to that many pages fetched ahead in a background
+        thread. With `typed`, items are :class:`~habanero.Work` records.
+        With `stream`, each item is yielded as soon as it's read from the
+        response body, and `envelope` is the page without its items once
+        the page has been read.
+        """
+        if stream:
+            if prefetch:
+                raise ValueError("prefetch can not be used with stream")
+            decode = self.session.decoder
+            if typed:
+                decode = partial(decode_work, decode=self.session.decoder)
+            yield from self._stream_items(should_warn, decode)
+            return
+        decode = None
+        if typed:
+            decode = partial(decode_work_page, decode=self.session.decoder)
+        pages = self.iter_pages(should_warn=should_warn, decode=decode)
+        if prefetch:
+            pages = read_ahead(pages, prefetch)
+        for page in pages:
+            yield from page["message"]["items"]
+
+    def _cursor_pages(self, js, payload, cu, max_avail, should_warn, decode=None):
+        # pages after the first one, `js`, up to cursor_max records
+        total = len(js["message"]["items"])
+        cursor_max = math.inf if self.cursor_max is None else self.cursor_max
+        if cu is None or cursor_max <= total:
+            return
+        pbar = self._progress_bar(max_avail) if self.progress_bar else None
+        try:
+            while cu is not None and cursor_max > total and total < max_avail:
                 payload["cursor"] = cu
-                out = self._req(payload=payload, should_warn=should_warn)
+                out = self._req(payload=payload, should_warn=should_warn, decode=decode)
+                if out is None:
+                    return
                 cu = out["message"].get("next-cursor")
-                res.append(out)
-                total = sum([len(z["message"]["items"]) for z in res])
-                if self.progress_bar:
+                total += len(out["message"]["items"])
+                if pbar is not None:
                     pbar.update(1)
-            if self.progress_bar:
+                yield out
+        finally:
+            if pbar is not None:
                 pbar.close()
-            return res
-        else:
-            return js
 
-    def _req(self, payload, should_warn):
+    def _stream_items(self, should_warn, decode):
+        # items of each page as they're parsed from the response body,
+        # following next-cursor as _cursor_pages does
+        payload = self._payload()
+        cursor_max = math.inf if self.cursor_max is None else self.cursor_max
+        total, pbar = 0, None
         try:
-            r = httpx2.get(
+            while True:
+                splitter, n, failed = ItemSplitter(), 0, None
+                try:
+                    with self.session.stream(
+                        self._url(),
+                        params=payload,
+                        headers=make_ua(self.mailto, self.ua_string),
+                        timeout=self.timeout,
+                    ) as r:
+                        if not r.is_success:
+                            r.read()
+                            failed = r
+                        else:
+                            check_json(r)
+                            for chunk in r.iter_bytes():
+                                for raw in splitter.feed(chunk):
+                                    n += 1
+                                    yield decode(raw)
+                except ConnectTimeoutError as e:
+                    raise httpx2.ConnectTimeout(str(e)) from e
+                except httpx2.HTTPError as e:
+                    raise RuntimeError(e) from e
+                if failed is not None:
+                    # outside the try above, so that failed requests raise
+                    # as they do without streaming
+                    self._parse(failed, should_warn)
+                    return
+                self.envelope = self.session.decoder(splitter.close())
+                total += n
+                cu = self.envelope["message"].get("next-cursor")
+                max_avail = self.envelope["message"]["total-results"]
+                if pbar is not None:
+                    pbar.update(1)
+                if cu is None or not n or cursor_max <= total or total >= max_avail:
+                    return
+                if pbar is None and self.progress_bar:
+                    pbar = self._progress_bar(max_avail)
+                payload["cursor"] = cu
+        finally:
+            if pbar is not None:
+                pbar.close()
+
+    def _progress_bar(self, max_avail):
+        actual_max = self.cursor_max if self.cursor_max is not None else max_avail
+        if max_avail < actual_max:
+            actual_max = max_avail
+        runs = math.ceil(actual_max / (self.limit or 20))
+        return tqdm(total=runs - 1)
+
+    def _req(self, payload, should_warn, decode=None):
+        try:
+            r = self.session.get(
                 self._url(),
                 params=payload,
                 headers=make_ua(self.mailto, self.ua_string),
                 timeout=self.timeout,
             )
-            r.raise_for_status()
-        except httpx2.HTTPStatusError:
-            try:
-                f = r.json()
-                raise RequestError(r.status_code, f["message"][0]["message"])
-            except (ValueError, KeyError, IndexError):
-                if should_warn:
-                    mssg = "%s: %s" % (r.status_code, r.reason_phrase)
-                    warnings.warn(mssg, stacklevel=2)
-                    return None
-                else:
-                    r.raise_for_status()
         except ConnectTimeoutError as e:
             raise httpx2.ConnectTimeout(str(e)) from e
         except httpx2.HTTPError as e:
             raise RuntimeError(e) from e
-        else:
-            if not r:
-                raise RuntimeError("An unknown problem occurred with an HTTP request")
+        return self._parse(r, should_warn, decode)
+
+    def _parse(self, r, should_warn, decode=None):
+        if not r.is_success:
+            # classify the error from its body, decoded once
+            msg = parse_json_err(r, self.session.decoder)
+            if msg is not None:
+                raise RequestError(r.status_code, msg)
+            if should_warn:
+                mssg = "%s: %s" % (r.status_code, r.reason_phrase)
+                warnings.warn(mssg, stacklevel=3)
+                return None
+            r.raise_for_status()
+        if not r:
+            raise RuntimeError("An unknown problem occurred with an HTTP request")
+
+        check_json(r)
+        if decode is not None:
+            return decode(r.content)
+        return self.session.decoder(r.content)
+
+
+def make_payload(
+    query, filters, offset, limit, sample, sort, order, facet, select, cursor, kwargs
+):
+    """Validate query parameters and build the query string payload"""
+    filt = filter_handler(filters)
+    if isinstance(select, list):
+        select = ",".join(select)
+
+    validate_facets(facet)
+    validate_sort(sort)
+    validate_select(select)
+    fq_keys = [
+        k.replace("query_", "query.", 1).replace("_", "-") for k in filter_dict(kwargs)
+    ]
+    validate_field_queries(fq_keys if fq_keys else None)
 
-            check_json(r)
-            return r.json()
+    payload = {
+        "query": query,
+        "filter": filt,
+        "offset": offset,
+        "rows": limit,
+        "sample": sample,
+        "sort": sort,
+        "order": order,
+        "facet": facet,
+        "select": select,
+        "cursor": cursor,
+    }
+    # convert limit/offset to str before removing None
+    # b/c 0 (zero) is falsey, so that param gets dropped
+    payload["offset"] = ifelsestr(payload["offset"])
+    payload["rows"] = ifelsestr(payload["rows"])
+    # remove params with value None
+    payload = {k: v for k, v in payload.items() if v}
+    # add field queries
+    payload.update(filter_dict(kwargs))
+    # rename field queries
+    return rename_query_filters(payload)
@@ -0,0 +1,112 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx2
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+RETRY_ERRORS = (
+    httpx2.ConnectError,
+    httpx2.ReadError,
+    httpx2.TimeoutException,
+    httpx2.RemoteProtocolError,
+)
+
+
+class Retry(object):
+    """
+    Habanero: retry class
+
+    A retry policy for requests sent through a :class:`~habanero.Session`.
+    Failed requests are sent again after an exponential backoff with jitter,
+    or after the wait asked for in a `Retry-After` header, so that a long
+    cursor harvest survives a 429 or 503 along the way instead of throwing
+    away all pages fetched so far.
+
+    :param max_attempts: Max number of times a request is sent, including the
+        first. Default: 5
+    :param backoff_base: Seconds to wait before the first retry; the wait doubles
+        with each retry. Default: 0.5
+    :param backoff_max: Max number of seconds to wait between attempts, when
+        not given by `Retry-After`. Default: 60
+    :param jitter: If `True`, wait a random time between zero and the backoff
+        ("full jitter"), so that many threads don't retry in lockstep.
+        Default: True
+    :param status_codes: HTTP status codes to retry. Default: 429, 500, 502,
+        503, 504
+    :param errors: Exception classes to retry, e.g., connect and read errors.
+        Default: `httpx2.ConnectError`, `httpx2.ReadError`,
+        `httpx2.TimeoutException`, `httpx2.RemoteProtocolError`
+    :param respect_retry_after: If `True`, wait as long as a `Retry-After`
+        header says to. Default: True
+
+    Usage::
+
+        from habanero import Crossref, Retry
+        cr = Crossref(retry = Retry(max_attempts = 8, backoff_base = 1))
+        res = cr.works(query = "ecology", cursor = "*", cursor_max = 100000)
+        cr.session.stats
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 60.0,
+        jitter: bool = True,
+        status_codes: tuple = RETRY_STATUS_CODES,
+        errors: tuple = RETRY_ERRORS,
+        respect_retry_after: bool = True,
+    ) -> None:
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.status_codes = tuple(status_codes)
+        self.errors = tuple(errors)
+        self.respect_retry_after = respect_retry_after
+
+    def __repr__(self) -> str:
+        return "<%s: max attempts: %s, backoff: %ss-%ss, status codes: %s>" % (
+            type(self).__name__,
+            self.max_attempts,
+            self.backoff_base,
+            self.backoff_max,
+            ",".join(str(z) for z in self.status_codes),
+        )
+
+    def retry_response(self, r: httpx2.Response, attempt: int) -> bool:
+        """Should a request be sent again after this response?"""
+        return attempt < self.max_attempts and r.status_code in self.status_codes
+
+    def retry_error(self, e: Exception, attempt: int) -> bool:
+        """Should a request be sent again after this error?"""
+        return attempt < self.max_attempts and isinstance(e, self.errors)
+
+    def backoff(self, attempt: int, r: httpx2.Response | None = None) -> float:
+        """Number of seconds to wait before sending attempt `attempt + 1`"""
+        if r is not None and self.respect_retry_after:
+            wait = retry_after(r.headers.get("retry-after"))
+            if wait is not None:
+                return wait
+        wait = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        if self.jitter:
+            wait = random.uniform(0, wait)
+        return wait
+
+
+def retry_after(x):
+    """Seconds to wait from a `Retry-After` header, in seconds or a HTTP date"""
+    if not x:
+        return None
+    try:
+        return max(0.0, float(x))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(x)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
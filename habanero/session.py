@@ -0,0 +1,547 @@
+import asyncio
+import atexit
+import threading
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+
+import httpx2
+
+from .cache import (
+    Cache,
+    cache_key,
+    cacheable,
+    conditional_headers,
+    entry_response,
+    make_entry,
+    revalidated_entry,
+)
+from .decoder import json_decoder
+from .ratelimit import RateLimiter
+from .retry import Retry
+
+
+class Session(object):
+    """
+    Habanero: session class
+
+    Owns a long-lived, thread-safe pool of HTTP connections that is reused
+    by every request made through it, so that repeated requests to the same
+    host don't pay for a new TCP and TLS handshake each time.
+
+    :param max_connections: Max number of connections in the pool. Default: 100
+    :param max_keepalive_connections: Max number of idle connections kept
+        alive in the pool. Default: 20
+    :param keepalive_expiry: Number of seconds an idle connection is kept
+        alive. Default: 5.0
+    :param max_connections_per_host: Max number of concurrent requests to any
+        single host. Default: None (only `max_connections` applies)
+    :param transport: An `httpx2` transport to use instead of the default one
+    :param rate_limiter: A :class:`~habanero.RateLimiter` to throttle all requests
+        sent through this session with. Default: None (no throttling)
+    :param retry: A :class:`~habanero.Retry` policy for failed requests.
+        Default: None (no retries)
+    :param cache: A :class:`~habanero.Cache` to keep successful responses in.
+        Default: None (no caching)
+    :param decoder: JSON decoder for responses: a function decoding bytes, or
+        one of `"orjson"`, `"msgspec"`, `"json"` (the standard library), or
+        `"auto"`, the first of these installed. Default: None ("auto")
+    :param verify: Verify TLS certificates: `True`, `False`, a path to a CA
+        bundle, or an `ssl.SSLContext`. Default: True
+    :param cert: A client certificate to send, see `httpx2.Client`.
+        Default: None
+    :param proxy: A proxy URL to send requests through. Default: None
+    :param trust_env: Read proxy and certificate settings from environment
+        variables. Default: True
+
+    Usage::
+
+        from habanero import Crossref, Session, cn
+        with Session(max_connections=20) as s:
+            cr = Crossref(session=s)
+            cr.works(ids = '10.1371/journal.pone.0033693')
+            cn.content_negotiation(ids = '10.1126/science.169.3946.635', session=s)
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        max_connections_per_host: int | None = None,
+        transport: httpx2.BaseTransport | None = None,
+        rate_limiter: RateLimiter | None = None,
+        retry: Retry | None = None,
+        cache: Cache | None = None,
+        decoder=None,
+        verify=True,
+        cert=None,
+        proxy=None,
+        trust_env: bool = True,
+    ) -> None:
+        self.limits = httpx2.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self.transport = transport
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.cache = cache
+        self.decoder = json_decoder(decoder)
+        self.client_options = {
+            "verify": verify,
+            "cert": cert,
+            "proxy": proxy,
+            "trust_env": trust_env,
+        }
+        self._stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._client: httpx2.Client | None = None
+        self._lock = threading.Lock()
+        self._host_slots: dict[str, threading.BoundedSemaphore] = {}
+
+    def __repr__(self) -> str:
+        return "<%s: max connections: %s, keep-alive: %s, per host: %s>" % (
+            type(self).__name__,
+            self.limits.max_connections,
+            self.limits.max_keepalive_connections,
+            self.max_connections_per_host,
+        )
+
+    def __enter__(self) -> "Session":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def client(self) -> httpx2.Client:
+        """The underlying `httpx2.Client`, created on first use"""
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx2.Client(
+                        limits=self.limits,
+                        transport=self.transport,
+                        **self.client_options,
+                    )
+        return self._client
+
+    @property
+    def closed(self) -> bool:
+        return self._client is None
+
+    @property
+    def stats(self) -> dict:
+        """
+        Counts of what this session has done, e.g., `requests` sent and
+        `retries` made, and with a cache, `cache_hits`, `cache_revalidated`
+        (expired responses answered with `304 Not Modified`), `cache_misses`
+        and `cache_bytes_saved` (bytes of response bodies not downloaded)
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, key, n=1) -> None:
+        with self._stats_lock:
+            self._stats[key] += n
+
+    def close(self) -> None:
+        """Close all connections in the pool"""
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    def _host_slot(self, url) -> threading.BoundedSemaphore | None:
+        if self.max_connections_per_host is None:
+            return None
+        host = httpx2.URL(url).host
+        with self._lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_connections_per_host)
+                self._host_slots[host] = slot
+        return slot
+
+    def get(self, url, **kwargs) -> httpx2.Response:
+        """
+        Send a GET request through the connection pool
+
+        :param url: the URL to request
+        :param kwargs: passed on to `httpx2.Client.get`
+        :rtype: httpx2.Response
+        """
+        if self.cache is None or not cacheable(kwargs.get("params")):
+            return self._get(url, **kwargs)
+        key = cache_key(url, kwargs.get("params"), kwargs.get("headers"))
+        entry = self.cache.get(key)
+        if entry is not None and entry["expires"] > time.time():
+            self._count("cache_hits")
+            self._count("cache_bytes_saved", len(entry["content"]))
+            return entry_response(entry, url)
+        validators = conditional_headers(entry)
+        if validators:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), **validators}
+        r = self._get(url, **kwargs)
+        if r.status_code == 304 and entry is not None:
+            self._count("cache_revalidated")
+            self._count("cache_bytes_saved", len(entry["content"]))
+            entry = revalidated_entry(entry, r, self.cache.ttl_for(url))
+            self.cache.set(key, entry)
+            return entry_response(entry, url)
+        self._count("cache_misses")
+        if r.status_code == 200:
+            self.cache.set(key, make_entry(r, self.cache.ttl_for(url)))
+        return r
+
+    @contextmanager
+    def stream(self, url, **kwargs) -> Iterator[httpx2.Response]:
+        """
+        Send a GET request through the connection pool, giving back the
+        response before its body is read, to read it in chunks with
+        `iter_bytes`. The response is closed on leaving the `with` block.
+        Responses are not cached.
+
+        :param url: the URL to request
+        :param kwargs: passed on to `httpx2.Client.build_request`
+
+        Usage::
+
+            from habanero import Session
+            with Session() as s:
+                with s.stream("https://api.crossref.org/works") as r:
+                    for chunk in r.iter_bytes():
+                        print(len(chunk))
+        """
+        r = self._get(url, stream=True, **kwargs)
+        try:
+            yield r
+        finally:
+            r.close()
+
+    def _get(self, url, stream=False, **kwargs) -> httpx2.Response:
+        attempt = 1
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            self._count("requests")
+            try:
+                r = self._send(url, stream, **kwargs)
+            except Exception as e:
+                if self.retry is None or not self.retry.retry_error(e, attempt):
+                    raise
+                wait = self.retry.backoff(attempt)
+            else:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.update(r.headers)
+                if self.retry is None or not self.retry.retry_response(r, attempt):
+                    return r
+                wait = self.retry.backoff(attempt, r)
+                r.close()
+            self._count("retries")
+            time.sleep(wait)
+            attempt += 1
+
+    def _send(self, url, stream=False, **kwargs) -> httpx2.Response:
+        slot = self._host_slot(url)
+        if slot is None:
+            return self._client_get(url, stream, kwargs)
+        with slot:
+            return self._client_get(url, stream, kwargs)
+
+    def _client_get(self, url, stream, kwargs) -> httpx2.Response:
+        if not stream:
+            return self.client.get(url, **kwargs)
+        send = {k: kwargs.pop(k) for k in ("auth", "follow_redirects") if k in kwargs}
+        request = self.client.build_request("GET", url, **kwargs)
+        return self.client.send(request, stream=True, **send)
+
+
+class AsyncSession(object):
+    """
+    Habanero: async session class
+
+    The asyncio counterpart of :class:`~habanero.Session`, wrapping an
+    `httpx2.AsyncClient`. Requests beyond `max_connections` wait for a free
+    connection instead of failing with a pool timeout, so thousands of
+    requests can be in flight on one event loop.
+
+    :param max_connections: Max number of connections in the pool. Default: 100
+    :param max_keepalive_connections: Max number of idle connections kept
+        alive in the pool. Default: 20
+    :param keepalive_expiry: Number of seconds an idle connection is kept
+        alive. Default: 5.0
+    :param max_connections_per_host: Max number of concurrent requests to any
+        single host. Default: None (only `max_connections` applies)
+    :param transport: An `httpx2` async transport to use instead of the
+        default one
+    :param rate_limiter: A :class:`~habanero.RateLimiter` to throttle all requests
+        sent through this session with. Default: None (no throttling)
+    :param retry: A :class:`~habanero.Retry` policy for failed requests.
+        Default: None (no retries)
+    :param cache: A :class:`~habanero.Cache` to keep successful responses in.
+        Default: None (no caching)
+    :param decoder: JSON decoder for responses: a function decoding bytes, or
+        one of `"orjson"`, `"msgspec"`, `"json"` (the standard library), or
+        `"auto"`, the first of these installed. Default: None ("auto")
+    :param verify: Verify TLS certificates: `True`, `False`, a path to a CA
+        bundle, or an `ssl.SSLContext`. Default: True
+    :param cert: A client certificate to send, see `httpx2.Client`.
+        Default: None
+    :param proxy: A proxy URL to send requests through. Default: None
+    :param trust_env: Read proxy and certificate settings from environment
+        variables. Default: True
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        max_connections_per_host: int | None = None,
+        transport: httpx2.AsyncBaseTransport | None = None,
+        rate_limiter: RateLimiter | None = None,
+        retry: Retry | None = None,
+        cache: Cache | None = None,
+        decoder=None,
+        verify=True,
+        cert=None,
+        proxy=None,
+        trust_env: bool = True,
+    ) -> None:
+        self.limits = httpx2.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self.transport = transport
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.cache = cache
+        self.decoder = json_decoder(decoder)
+        self.client_options = {
+            "verify": verify,
+            "cert": cert,
+            "proxy": proxy,
+            "trust_env": trust_env,
+        }
+        self._stats: Counter = Counter()
+        self._stats_lock = threading.Lock()
+        self._client: httpx2.AsyncClient | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._host_slots: dict[str, asyncio.Semaphore] = {}
+
+    def __repr__(self) -> str:
+        return "<%s: max connections: %s, keep-alive: %s, per host: %s>" % (
+            type(self).__name__,
+            self.limits.max_connections,
+            self.limits.max_keepalive_connections,
+            self.max_connections_per_host,
+        )
+
+    async def __aenter__(self) -> "AsyncSession":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    @property
+    def client(self) -> httpx2.AsyncClient:
+        """The underlying `httpx2.AsyncClient`, created on first use"""
+        if self._client is None:
+            self._client = httpx2.AsyncClient(
+                limits=self.limits, transport=self.transport, **self.client_options
+            )
+            self._slots = asyncio.Semaphore(self.limits.max_connections or 100)
+        return self._client
+
+    @property
+    def closed(self) -> bool:
+        return self._client is None
+
+    @property
+    def stats(self) -> dict:
+        """
+        Counts of what this session has done, e.g., `requests` sent and
+        `retries` made, and with a cache, `cache_hits`, `cache_revalidated`
+        (expired responses answered with `304 Not Modified`), `cache_misses`
+        and `cache_bytes_saved` (bytes of response bodies not downloaded)
+        """
+        with self._stats_lock:
+            return dict(self._stats)
+
+    def _count(self, key, n=1) -> None:
+        with self._stats_lock:
+            self._stats[key] += n
+
+    async def aclose(self) -> None:
+        """Close all connections in the pool"""
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    def _host_slot(self, url) -> asyncio.Semaphore | None:
+        if self.max_connections_per_host is None:
+            return None
+        host = httpx2.URL(url).host
+        slot = self._host_slots.get(host)
+        if slot is None:
+            slot = asyncio.Semaphore(self.max_connections_per_host)
+            self._host_slots[host] = slot
+        return slot
+
+    async def get(self, url, **kwargs) -> httpx2.Response:
+        """
+        Send a GET request through the connection pool
+
+        :param url: the URL to request
+        :param kwargs: passed on to `httpx2.AsyncClient.get`
+        :rtype: httpx2.Response
+        """
+        if self.cache is None or not cacheable(kwargs.get("params")):
+            return await self._get(url, **kwargs)
+        key = cache_key(url, kwargs.get("params"), kwargs.get("headers"))
+        entry = self.cache.get(key)
+        if entry is not None and entry["expires"] > time.time():
+            self._count("cache_hits")
+            self._count("cache_bytes_saved", len(entry["content"]))
+            return entry_response(entry, url)
+        validators = conditional_headers(entry)
+        if validators:
+            kwargs["headers"] = {**(kwargs.get("headers") or {}), **validators}
+        r = await self._get(url, **kwargs)
+        if r.status_code == 304 and entry is not None:
+            self._count("cache_revalidated")
+            self._count("cache_bytes_saved", len(entry["content"]))
+            entry = revalidated_entry(entry, r, self.cache.ttl_for(url))
+            self.cache.set(key, entry)
+            return entry_response(entry, url)
+        self._count("cache_misses")
+        if r.status_code == 200:
+            self.cache.set(key, make_entry(r, self.cache.ttl_for(url)))
+        return r
+
+    @asynccontextmanager
+    async def stream(self, url, **kwargs) -> AsyncIterator[httpx2.Response]:
+        """
+        Send a GET request, giving back the response before its body is
+        read, see :func:`~habanero.Session.stream`; read the body with
+        `aiter_bytes`
+        """
+        r = await self._get(url, stream=True, **kwargs)
+        try:
+            yield r
+        finally:
+            await r.aclose()
+
+    async def _get(self, url, stream=False, **kwargs) -> httpx2.Response:
+        attempt = 1
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async()
+            self._count("requests")
+            try:
+                r = await self._send(url, stream, **kwargs)
+            except Exception as e:
+                if self.retry is None or not self.retry.retry_error(e, attempt):
+                    raise
+                wait = self.retry.backoff(attempt)
+            else:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.update(r.headers)
+                if self.retry is None or not self.retry.retry_response(r, attempt):
+                    return r
+                wait = self.retry.backoff(attempt, r)
+                await r.aclose()
+            self._count("retries")
+            await asyncio.sleep(wait)
+            attempt += 1
+
+    async def _send(self, url, stream=False, **kwargs) -> httpx2.Response:
+        client = self.client
+        host_slot = self._host_slot(url)
+        async with self._slots:
+            if host_slot is None:
+                return await self._client_get(client, url, stream, kwargs)
+            async with host_slot:
+                return await self._client_get(client, url, stream, kwargs)
+
+    async def _client_get(self, client, url, stream, kwargs) -> httpx2.Response:
+        if not stream:
+            return await client.get(url, **kwargs)
+        send = {k: kwargs.pop(k) for k in ("auth", "follow_redirects") if k in kwargs}
+        request = client.build_request("GET", url, **kwargs)
+        return await client.send(request, stream=True, **send)
+
+
+# options of the client rather than of a request, which `get` doesn't take
+CLIENT_OPTIONS = ("verify", "cert", "proxy", "trust_env")
+
+_default_session: Session | None = None
+_default_lock = threading.Lock()
+
+
+def default_session() -> Session:
+    """
+    Get the module wide session used when no session is given, e.g., by
+    :func:`~habanero.cn.content_negotiation` and
+    :func:`~habanero.counts.citation_count`
+    """
+    global _default_session
+    if _default_session is None:
+        with _default_lock:
+            if _default_session is None:
+                _default_session = Session()
+                atexit.register(_default_session.close)
+    return _default_session
+
+
+def pop_client_options(kwargs: dict) -> dict:
+    """Remove the client options in `kwargs` and return them"""
+    return {k: kwargs.pop(k) for k in CLIENT_OPTIONS if k in kwargs}
+
+
+def session_settings(session) -> dict:
+    """The settings of `session` that a session made from it keeps"""
+    if session is None:
+        return {}
+    return {
+        "rate_limiter": session.rate_limiter,
+        "retry": session.retry,
+        "cache": session.cache,
+        "decoder": session.decoder,
+    }
+
+
+def check_session_settings(session, **settings) -> None:
+    """
+    Raise ValueError when `session` is given along with `settings` for the
+    session that would otherwise be made, as they'd be ignored
+    """
+    given = [k for k, v in settings.items() if v is not None and v is not False]
+    if session is not None and given:
+        raise ValueError(
+            "%s can't be used with session; set them on the session instead"
+            % ", ".join(given)
+        )
+
+
+@contextmanager
+def session_for(session: Session | None, kwargs: dict) -> Iterator[Session]:
+    """
+    The session to send a request with: `session`, or the module wide one.
+    Client options in `kwargs` (`verify`, `cert`, `proxy`, `trust_env`) are
+    removed from it, and if any are given a session with those options, and
+    the other settings of `session`, is used for this call instead
+    """
+    options = pop_client_options(kwargs)
+    if not options:
+        yield session or default_session()
+        return
+    with Session(**session_settings(session), **options) as s:
+        yield s
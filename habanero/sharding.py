@@ -0,0 +1,220 @@
+import datetime
+import itertools
+import math
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .request import request
+from .request_class import Request
+
+
+def as_date(x):
+    if isinstance(x, datetime.datetime):
+        return x.date()
+    if isinstance(x, datetime.date):
+        return x
+    return datetime.date.fromisoformat(str(x))
+
+
+def date_windows(start, end, shards):
+    """
+    Split the days from `start` to `end`, both inclusive, into up to `shards`
+    disjoint windows of about the same number of days, as
+    `(from, until)` ISO date pairs
+    """
+    start, end = as_date(start), as_date(end)
+    if end < start:
+        raise ValueError("end must not be before start")
+    if shards < 1:
+        raise ValueError("shards must be at least 1")
+    days = (end - start).days + 1
+    shards = min(shards, days)
+    bounds = [
+        start + datetime.timedelta(days=days * i // shards) for i in range(shards + 1)
+    ]
+    return [
+        (a.isoformat(), (b - datetime.timedelta(days=1)).isoformat())
+        for a, b in itertools.pairwise(bounds)
+    ]
+
+
+def window_filters(filters, date_filter, window):
+    """`filters` restricted to `window`, with the `date_filter` date filters"""
+    filts = dict(filters or {})
+    filts["from_%s_date" % date_filter] = window[0]
+    filts["until_%s_date" % date_filter] = window[1]
+    return filts
+
+
+def plan_windows(start, end, year_counts, shards):
+    """
+    Split the days from `start` to `end` into up to `shards` windows of about
+    the same number of records, as `((from, until), estimate)` pairs, from
+    record counts per year. Records are assumed spread evenly over the days
+    of a year.
+    """
+    start, end = as_date(start), as_date(end)
+    if end < start:
+        raise ValueError("end must not be before start")
+    if shards < 1:
+        raise ValueError("shards must be at least 1")
+    # (first day, number of days, records per day) for each year in range
+    segments = []
+    for year in range(start.year, end.year + 1):
+        a = max(start, datetime.date(year, 1, 1))
+        b = min(end, datetime.date(year, 12, 31))
+        days = (b - a).days + 1
+        segments.append((a, days, float(year_counts.get(str(year), 0)) / days))
+    total = sum(days * per_day for _, days, per_day in segments)
+
+    def estimate(a, b):
+        n = 0.0
+        for first, days, per_day in segments:
+            last = first + datetime.timedelta(days=days - 1)
+            overlap = (min(b, last) - max(a, first)).days + 1
+            n += max(0, overlap) * per_day
+        return n
+
+    cuts = set()
+    target = total / shards
+    k, cum = 1, 0.0
+    for first, days, per_day in segments:
+        for i in range(days):
+            cum += per_day
+            while k < shards and target and cum >= k * target:
+                cuts.add(first + datetime.timedelta(days=i + 1))
+                k += 1
+    one_day = datetime.timedelta(days=1)
+    bounds = [*sorted({start, *(z for z in cuts if z <= end)}), end + one_day]
+    return [
+        ((a.isoformat(), (b - one_day).isoformat()), estimate(a, b - one_day))
+        for a, b in itertools.pairwise(bounds)
+    ]
+
+
+def plan_shards(cr, path, start, end, shards, query, filters, kwargs):
+    """
+    Plan shards of about the same size on published dates, from one request
+    for the `published` facet: record counts per year
+    """
+    window = (as_date(start).isoformat(), as_date(end).isoformat())
+    res = request(
+        cr,
+        path,
+        None,
+        query,
+        window_filters(filters, "pub", window),
+        None,
+        0,
+        None,
+        None,
+        None,
+        "published:*",
+        None,
+        None,
+        None,
+        None,
+        **kwargs,
+    )
+    counts = res["message"]["facets"]["published"]["values"]
+    return plan_windows(start, end, counts, shards)
+
+
+def sharded_items(
+    cr,
+    path,
+    windows,
+    date_filter,
+    query,
+    filters,
+    limit,
+    select,
+    queue_size,
+    resplit,
+    kwargs,
+):
+    """
+    Yield items from many deep paging queries, one per `(window, estimate)`
+    in `windows`, run concurrently in threads. Items come in the order pages
+    arrive. A window with an estimate, found to have more than `resplit`
+    times as many records, is split into smaller windows.
+    """
+    if not windows:
+        return
+    messages = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(x):
+        while not stop.is_set():
+            try:
+                messages.put(x, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def worker(window, estimate):
+        try:
+            req = Request(
+                cr.mailto,
+                cr.ua_string,
+                cr.timeout,
+                cr.base_url,
+                path,
+                query,
+                window_filters(filters, date_filter, window),
+                None,
+                limit,
+                None,
+                None,
+                None,
+                None,
+                select,
+                "*",
+                None,
+                None,
+                False,
+                session=cr.session,
+                **kwargs,
+            )
+            pages = req.iter_pages()
+            for page in pages:
+                found = page["message"]["total-results"]
+                if estimate is not None and window[0] != window[1]:
+                    if found > resplit * max(estimate, 1):
+                        parts = date_windows(
+                            window[0], window[1], math.ceil(found / max(estimate, 1))
+                        )
+                        pages.close()
+                        put(("split", [(z, found / len(parts)) for z in parts]))
+                        return
+                    estimate = None
+                if not put(("items", page["message"]["items"])):
+                    return
+            put(("done", None))
+        except BaseException as e:
+            put(("error", e))
+
+    pool = ThreadPoolExecutor(
+        max_workers=len(windows), thread_name_prefix="habanero-shard"
+    )
+    try:
+        for window, estimate in windows:
+            pool.submit(worker, window, estimate)
+        running = len(windows)
+        while running:
+            kind, x = messages.get()
+            if kind == "error":
+                raise x
+            if kind == "items":
+                yield from x
+                continue
+            running -= 1
+            if kind == "split":
+                for window, estimate in x:
+                    pool.submit(worker, window, estimate)
+                running += len(x)
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,198 @@
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    _has_orjson = False
+else:
+    _has_orjson = True
+
+try:
+    import zstandard  # type: ignore
+except ImportError:
+    _has_zstandard = False
+else:
+    _has_zstandard = True
+
+from .work import Work
+
+COMPRESSIONS = (None, "gzip", "zstd")
+
+
+def dumps(x) -> bytes:
+    """One item as a line of JSON"""
+    if isinstance(x, Work):
+        return x.raw
+    if _has_orjson:
+        return orjson.dumps(x)
+    return json.dumps(x, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class NDJSONSink(object):
+    """
+    Habanero: NDJSON sink class
+
+    Writes items to a newline delimited JSON file, one item per line, as
+    they come, so that a harvest of any size only holds a page in memory.
+    Lines are written in batches, and the file is synced to disk every
+    `fsync_interval` seconds and when closed.
+
+    :param path: Path to the file
+    :param compress: Compression, one of `None`, `"gzip"` or `"zstd"` (needs
+        the zstandard package). Default: None
+    :param batch_size: Number of lines kept before writing them all at once.
+        Default: 1000
+    :param fsync_interval: Seconds between syncs of the file to disk, or
+        `None` to only sync on closing. Default: 10
+    :param append: Add to the end of the file instead of replacing it; with
+        compression, a new compressed frame is added. Default: False
+
+    Usage::
+
+        from habanero import Crossref, NDJSONSink
+        cr = Crossref()
+        cr.works(query = "ecology", cursor = "*", cursor_max = 100000,
+            sink = NDJSONSink("ecology.ndjson.gz", compress = "gzip"))
+
+        with NDJSONSink("ecology.ndjson") as sink:
+            for item in cr.iter_works(query = "ecology"):
+                sink.write(item)
+    """
+
+    def __init__(
+        self,
+        path,
+        compress: str | None = None,
+        batch_size: int = 1000,
+        fsync_interval: float | None = 10,
+        append: bool = False,
+    ) -> None:
+        if compress not in COMPRESSIONS:
+            raise ValueError(
+                "compress must be one of %s" % ", ".join(map(str, COMPRESSIONS))
+            )
+        if compress == "zstd" and not _has_zstandard:
+            raise ImportError("compress='zstd' needs the zstandard package")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.path = Path(path)
+        self.compress = compress
+        self.batch_size = batch_size
+        self.fsync_interval = fsync_interval
+        self.append = append
+        self.count = 0
+        self._lines: list[bytes] = []
+        self._file = None
+        self._stream = None
+        self._synced = 0.0
+
+    def __repr__(self) -> str:
+        return "<%s: %s, compress: %s, items: %s>" % (
+            type(self).__name__,
+            self.path,
+            self.compress,
+            self.count,
+        )
+
+    def __enter__(self) -> "NDJSONSink":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._file is None
+
+    def _open(self) -> None:
+        # unbuffered: each batch is one write
+        self._file = self.path.open("ab" if self.append else "wb", buffering=0)
+        if self.compress == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._file, mode="wb")
+        elif self.compress == "zstd":
+            self._stream = zstandard.ZstdCompressor().stream_writer(
+                self._file, closefd=False
+            )
+        else:
+            self._stream = self._file
+        # later writes add to what's been written so far
+        self.append = True
+        self._synced = time.monotonic()
+
+    def write(self, item) -> None:
+        """Write one item, a dict or a :class:`~habanero.Work`"""
+        self._lines.append(dumps(item) + b"\n")
+        self.count += 1
+        if len(self._lines) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, items) -> int:
+        """Write all `items`, giving back how many were written"""
+        n = 0
+        for item in items:
+            self.write(item)
+            n += 1
+        return n
+
+    def flush(self, fsync: bool = False) -> None:
+        """
+        Write the lines kept so far; sync the file to disk if `fsync`, or
+        if `fsync_interval` seconds have passed since the last sync
+        """
+        if self._file is None:
+            self._open()
+        if self._lines:
+            self._stream.write(b"".join(self._lines))
+            self._lines = []
+        due = self.fsync_interval is not None and (
+            time.monotonic() - self._synced >= self.fsync_interval
+        )
+        if fsync or due:
+            self._sync()
+
+    def _sync(self) -> None:
+        if self._stream is not self._file:
+            self._stream.flush()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._synced = time.monotonic()
+
+    def close(self) -> None:
+        """Write the lines kept, sync the file to disk and close it"""
+        if self._file is None and self.append and not self._lines:
+            # closed already, or nothing to add
+            return
+        self.flush()
+        if self._stream is not self._file:
+            self._stream.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = self._stream = None
+
+
+def write_items(sink, items) -> int:
+    """
+    Write `items` to `sink`, an :class:`NDJSONSink` or a path, and close it;
+    the number of items written
+    """
+    if not isinstance(sink, NDJSONSink):
+        sink = NDJSONSink(sink)
+    with sink:
+        return sink.write_many(items)
+
+
+async def async_write_items(sink, items) -> int:
+    """Write the items of an async iterator to `sink`, see `write_items`"""
+    if not isinstance(sink, NDJSONSink):
+        sink = NDJSONSink(sink)
+    n = 0
+    with sink:
+        async for item in items:
+            sink.write(item)
+            n += 1
+    return n
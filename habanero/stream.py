@@ -0,0 +1,173 @@
+import codecs
+import json
+import re
+
+# characters that change the state of the scanner, outside and inside strings
+_OUTSIDE = re.compile(r'[\[\]{}":]')
+_INSIDE = re.compile(r'["\\]')
+
+# the C scanner of the json module, to find where each item ends
+_scan = json.JSONDecoder().raw_decode
+
+
+class ItemSplitter(object):
+    """
+    Habanero: item splitter class
+
+    Splits a JSON document fed to it in chunks, e.g., the body of a response
+    as it's read, into the JSON bytes of each object in one array, by
+    default `message.items`, as soon as each object is complete. All the
+    rest of the document, the envelope, is kept with that array empty.
+
+    The envelope is scanned in Python, but each object of the array is
+    parsed in one go by the C scanner of the `json` module, so splitting a
+    page costs about as much CPU as decoding it once with `json.loads`
+    (then each item is decoded again by the caller): see
+    `benchmarks/stream.py`. Other values in the array are left out.
+
+    :param path: Keys of the nested objects leading to the array.
+        Default: ("message", "items")
+
+    Usage::
+
+        import json
+        from habanero.stream import ItemSplitter
+        splitter = ItemSplitter()
+        for chunk in chunks:
+            for item in splitter.feed(chunk):
+                print(json.loads(item)["DOI"])
+        envelope = json.loads(splitter.close())
+    """
+
+    def __init__(self, path=("message", "items")) -> None:
+        self.path = list(path)
+        self._decoder = codecs.getincrementaldecoder("utf-8")("surrogateescape")
+        self._buf = ""
+        self._pos = 0
+        # open containers, and the key of the current member of each
+        self._stack: list[str] = []
+        self._keys: list[str | None] = []
+        self._in_string = False
+        self._str_start: int | None = None
+        self._last_string: str | None = None
+        self._in_items = False
+        # start of an object of the array not yet complete, and where the
+        # buffer ended when it was last tried
+        self._item_start: int | None = None
+        self._tried = 0
+        # start of what's not yet copied to the envelope
+        self._keep: int | None = 0
+        self._envelope: list[str] = []
+
+    def feed(self, chunk: bytes) -> list:
+        """The JSON bytes of each object of the array completed by `chunk`"""
+        self._buf += self._decoder.decode(chunk)
+        buf = self._buf
+        items = []
+        pos, end = self._pos, len(buf)
+        depth = len(self.path)
+        while pos < end:
+            if self._in_string:
+                m = _INSIDE.search(buf, pos)
+                if m is None:
+                    pos = end
+                    break
+                i = m.start()
+                if buf[i] == "\\":
+                    if i + 1 == end:
+                        # the escaped character is in the next chunk
+                        pos = i
+                        break
+                    pos = i + 2
+                    continue
+                self._in_string = False
+                if len(self._stack) <= depth and self._str_start is not None:
+                    self._last_string = buf[self._str_start + 1 : i]
+                pos = i + 1
+                continue
+            m = _OUTSIDE.search(buf, pos)
+            if m is None:
+                pos = end
+                break
+            i = m.start()
+            c = buf[i]
+            pos = i + 1
+            if c == '"':
+                self._in_string = True
+                self._str_start = i
+            elif c == ":":
+                if self._keys:
+                    self._keys[-1] = self._last_string
+            elif c in "{[":
+                if self._in_items and len(self._stack) == depth + 1 and c == "{":
+                    # an object can only end with a "}", so don't try again
+                    # until one has been read
+                    if i == self._item_start and buf.find("}", self._tried) < 0:
+                        pos = i
+                        break
+                    try:
+                        _, stop = _scan(buf, i)
+                    except ValueError:
+                        # not all read yet
+                        self._item_start, self._tried, pos = i, end, i
+                        break
+                    items.append(buf[i:stop].encode("utf-8", "surrogateescape"))
+                    self._item_start = None
+                    pos = stop
+                    continue
+                if not self._in_items and c == "[" and self._at_array():
+                    self._in_items = True
+                    self._envelope.append(buf[self._keep : i + 1])
+                    self._keep = None
+                self._stack.append(c)
+                self._keys.append(None)
+            else:
+                self._stack.pop()
+                self._keys.pop()
+                if self._in_items and len(self._stack) == depth:
+                    self._in_items = False
+                    self._keep = i
+        self._pos = pos
+        self._trim()
+        return items
+
+    def close(self) -> bytes:
+        """
+        The JSON bytes of the envelope, the document without the objects of
+        the array, once all of it has been fed
+        """
+        self._buf += self._decoder.decode(b"", final=True)
+        if self._stack or self._in_string or self._item_start is not None:
+            raise ValueError("incomplete JSON document")
+        if self._keep is not None:
+            self._envelope.append(self._buf[self._keep :])
+        return "".join(self._envelope).encode("utf-8", "surrogateescape")
+
+    def _at_array(self) -> bool:
+        return (
+            len(self._stack) == len(self.path)
+            and all(z == "{" for z in self._stack)
+            and self._keys == self.path
+        )
+
+    def _trim(self) -> None:
+        # drop text already scanned and not part of an unfinished item or
+        # key, copying envelope text out first
+        if self._item_start is not None:
+            cut = self._item_start
+        elif self._in_string and self._str_start is not None:
+            cut = self._str_start
+        else:
+            cut = self._pos
+        if self._keep is not None:
+            self._envelope.append(self._buf[self._keep : cut])
+            self._keep = 0
+        self._buf = self._buf[cut:]
+        self._pos -= cut
+        if self._item_start is not None:
+            self._item_start -= cut
+            self._tried -= cut
+        if self._str_start is not None:
+            self._str_start -= cut
+            if self._str_start < 0:
+                self._str_start = None
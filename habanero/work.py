@@ -0,0 +1,218 @@
+import json
+from typing import ClassVar
+
+try:
+    import msgspec  # type: ignore
+except ImportError:
+    _has_msgspec = False
+else:
+    _has_msgspec = True
+
+# JSON keys that aren't the attribute name with dashes for underscores
+KEYS = {"doi": "DOI", "url": "URL", "issn": "ISSN", "orcid": "ORCID"}
+
+
+def json_key(name):
+    """The JSON key of a record attribute"""
+    return KEYS.get(name, name.replace("_", "-"))
+
+
+if _has_msgspec:
+
+    class Date(msgspec.Struct, rename=json_key, gc=False):
+        """A Crossref date, e.g., `issued`: `[[year, month, day]]`"""
+
+        date_parts: list[list[int | None]] = msgspec.field(default_factory=list)
+
+    class Author(msgspec.Struct, rename=json_key, gc=False):
+        """A contributor to a work"""
+
+        given: str | None = None
+        family: str | None = None
+        name: str | None = None
+        orcid: str | None = None
+        sequence: str | None = None
+
+    class Work(msgspec.Struct, rename=json_key, gc=False):
+        """
+        Habanero: work record class
+
+        A work with the fields most often used, decoded straight from the
+        bytes of a response. The other fields aren't decoded: `raw` keeps
+        the bytes of the whole item, and `to_dict` decodes them when needed.
+        """
+
+        doi: str | None = None
+        title: list[str] = msgspec.field(default_factory=list)
+        author: list[Author] = msgspec.field(default_factory=list)
+        issued: Date | None = None
+        published: Date | None = None
+        container_title: list[str] = msgspec.field(default_factory=list)
+        type: str | None = None
+        publisher: str | None = None
+        member: str | None = None
+        prefix: str | None = None
+        issn: list[str] = msgspec.field(default_factory=list)
+        volume: str | None = None
+        issue: str | None = None
+        page: str | None = None
+        subject: list[str] = msgspec.field(default_factory=list)
+        language: str | None = None
+        url: str | None = None
+        references_count: int | None = None
+        is_referenced_by_count: int | None = None
+        raw: bytes = b""
+
+        @classmethod
+        def from_dict(cls, x, raw=None):
+            w = msgspec.convert(x, cls)
+            w.raw = raw or json.dumps(x, separators=(",", ":")).encode()
+            return w
+
+        def to_dict(self) -> dict:
+            """The whole item, with all fields, as a dict"""
+            return json.loads(self.raw)
+
+    class _WorkMessage(msgspec.Struct, rename=json_key):
+        items: list[msgspec.Raw] = msgspec.field(default_factory=list)
+        total_results: int = 0
+        next_cursor: str | None = None
+
+    class _WorkPage(msgspec.Struct, rename=json_key):
+        message: _WorkMessage
+        status: str | None = None
+        message_type: str | None = None
+
+    _work_decoder = msgspec.json.Decoder(Work)
+    _page_decoder = msgspec.json.Decoder(_WorkPage)
+
+else:
+
+    class _Record(object):
+        __slots__ = ()
+        # attribute: default, in order
+        _defaults: ClassVar[dict] = {}
+
+        def __init__(self, **kwargs) -> None:
+            for name, default in self._defaults.items():
+                value = kwargs.pop(name, default)
+                setattr(self, name, list(value) if isinstance(value, list) else value)
+            if kwargs:
+                raise TypeError("unexpected field %s" % ", ".join(kwargs))
+
+        def __repr__(self) -> str:
+            fields = ", ".join(
+                "%s=%r" % (z, getattr(self, z)) for z in self._defaults if z != "raw"
+            )
+            return "%s(%s)" % (type(self).__name__, fields)
+
+        def __eq__(self, other) -> bool:
+            if type(other) is not type(self):
+                return NotImplemented
+            return all(getattr(self, z) == getattr(other, z) for z in self._defaults)
+
+        @classmethod
+        def from_dict(cls, x):
+            kwargs = {}
+            for name in cls._defaults:
+                key = json_key(name)
+                if key in x:
+                    kwargs[name] = x[key]
+            return cls(**kwargs)
+
+    class Date(_Record):
+        """A Crossref date, e.g., `issued`: `[[year, month, day]]`"""
+
+        _defaults: ClassVar[dict] = {"date_parts": []}
+        __slots__ = tuple(_defaults)
+
+    class Author(_Record):
+        """A contributor to a work"""
+
+        _defaults: ClassVar[dict] = dict.fromkeys(
+            ["given", "family", "name", "orcid", "sequence"]
+        )
+        __slots__ = tuple(_defaults)
+
+    class Work(_Record):
+        """
+        Habanero: work record class
+
+        A work with the fields most often used. The other fields aren't kept
+        as Python objects: `raw` keeps the whole item as JSON bytes, and
+        `to_dict` decodes them when needed. Install msgspec to decode works
+        straight from the bytes of a response, which is much faster.
+        """
+
+        _defaults: ClassVar[dict] = {
+            "doi": None,
+            "title": [],
+            "author": [],
+            "issued": None,
+            "published": None,
+            "container_title": [],
+            "type": None,
+            "publisher": None,
+            "member": None,
+            "prefix": None,
+            "issn": [],
+            "volume": None,
+            "issue": None,
+            "page": None,
+            "subject": [],
+            "language": None,
+            "url": None,
+            "references_count": None,
+            "is_referenced_by_count": None,
+            "raw": b"",
+        }
+        __slots__ = tuple(_defaults)
+
+        @classmethod
+        def from_dict(cls, x, raw=None):
+            w = super().from_dict(x)
+            w.author = [Author.from_dict(z) for z in w.author]
+            if w.issued is not None:
+                w.issued = Date.from_dict(w.issued)
+            if w.published is not None:
+                w.published = Date.from_dict(w.published)
+            w.raw = raw or json.dumps(x, separators=(",", ":")).encode()
+            return w
+
+        def to_dict(self) -> dict:
+            """The whole item, with all fields, as a dict"""
+            return json.loads(self.raw)
+
+
+def decode_work(raw, decode=json.loads):
+    """Decode the JSON bytes of one item to a :class:`Work`"""
+    if not _has_msgspec:
+        return Work.from_dict(decode(raw), bytes(raw))
+    w = _work_decoder.decode(raw)
+    w.raw = bytes(raw)
+    return w
+
+
+def decode_work_page(content, decode=json.loads):
+    """
+    Decode the bytes of a page of works to an envelope whose items are
+    :class:`Work` records. With msgspec, items are decoded straight from the
+    bytes, and the message only has `items`, `total-results` and
+    `next-cursor`
+    """
+    if not _has_msgspec:
+        js = decode(content)
+        message = js["message"]
+        message["items"] = [Work.from_dict(z) for z in message["items"]]
+        return js
+    page = _page_decoder.decode(content)
+    items = [decode_work(z) for z in page.message.items]
+    return {
+        "status": page.status,
+        "message-type": page.message_type,
+        "message": {
+            "items": items,
+            "total-results": page.message.total_results,
+            "next-cursor": page.message.next_cursor,
+        },
+    }
@@ -0,0 +1,33 @@
+"""Helpers shared by the tests that answer requests with mock transports"""
+
+import httpx2
+
+from habanero import AsyncCrossref, AsyncSession, Crossref, Session
+
+
+def mock_crossref(handler, **kwargs):
+    """
+    A Crossref whose requests are answered by `handler`; `kwargs` are
+    passed on to its Session, e.g., `cache` or `retry`
+    """
+    return Crossref(session=Session(transport=httpx2.MockTransport(handler), **kwargs))
+
+
+def mock_async_crossref(handler, **kwargs):
+    """An AsyncCrossref whose requests are answered by the async `handler`"""
+    transport = httpx2.MockTransport(handler)
+    return AsyncCrossref(session=AsyncSession(transport=transport, **kwargs))
+
+
+def work_list(items, total=None, cursor=None):
+    """
+    The body of a work-list response with `items`, `total` results (default:
+    the number of items) and, if given, `cursor` as the next cursor
+    """
+    message = {
+        "total-results": len(items) if total is None else total,
+        "items": items,
+    }
+    if cursor is not None:
+        message["next-cursor"] = cursor
+    return {"status": "ok", "message-type": "work-list", "message": message}
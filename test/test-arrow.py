@@ -0,0 +1,160 @@
+from pathlib import Path
+
+import pytest
+
+from habanero import Crossref, WorksContainer
+from habanero.arrow import column_kind, decode, encode
+
+from .helpers import work_list
+
+ITEMS = [
+    {
+        "DOI": "10.1/a",
+        "title": ["A"],
+        "author": [
+            {
+                "given": "Ada",
+                "family": "Lovelace",
+                "suffix": "Jr.",
+                "ORCID": "https://orcid.org/0000-0000-0000-0000",
+                "authenticated-orcid": False,
+                "sequence": "first",
+                "affiliation": [
+                    {
+                        "name": "Somewhere",
+                        "place": ["London"],
+                        "id": [
+                            {
+                                "id": "https://ror.org/00000000",
+                                "id-type": "ROR",
+                                "asserted-by": "publisher",
+                            }
+                        ],
+                    }
+                ],
+            }
+        ],
+        "issued": {"date-parts": [[2020, 1, 31]]},
+        "indexed": {
+            "date-parts": [[2024, 1, 6]],
+            "date-time": "2024-01-06T04:43:15Z",
+            "timestamp": 1704516195000,
+            "version": "3.4.5",
+        },
+        "references-count": 3,
+        "license": [{"URL": "http://creativecommons.org/licenses/by/4.0/"}],
+    },
+    {
+        "DOI": "10.1/b",
+        "issued": {"date-parts": [[2019]]},
+        "indexed": {
+            "date-parts": [[2024, 2, 1]],
+            "date-time": "2024-02-01T00:00:00Z",
+            "timestamp": 1706745600000,
+        },
+        "author": [{"name": "A Consortium", "sequence": "first", "affiliation": []}],
+        "references-count": 0,
+        "score": 1.5,
+    },
+]
+
+
+def column(key):
+    return [z.get(key) for z in ITEMS]
+
+
+def test_column_kinds():
+    """arrow: how each kind of column is stored"""
+    assert column_kind("DOI", column("DOI")) == "string"
+    assert column_kind("title", column("title")) == "strings"
+    assert column_kind("author", column("author")) == "contributors"
+    assert column_kind("issued", column("issued")) == "date"
+    assert column_kind("references-count", column("references-count")) == "int"
+    assert column_kind("score", column("score")) == "float"
+    assert column_kind("indexed", column("indexed")) == "date"
+    assert column_kind("license", column("license")) == "json"
+    # fields the arrow types don't have are kept as JSON text
+    assert column_kind("issued", [{"date-parts": [[2020]], "other": 1}]) == "json"
+    assert column_kind("issued", [{"date-parts": [[2020], [2021]]}]) == "json"
+    assert column_kind("author", [[{"given": "A", "other": 1}]]) == "json"
+    role = [{"role": "author", "vocabulary": "crossref"}]
+    assert column_kind("author", [[{"given": "A", "role": role}]]) == "contributors"
+    assert column_kind("empty", [None, None]) == "string"
+
+
+def test_encode_decode():
+    """arrow: encoded columns decode back to Crossref values"""
+    issued = encode(column("issued"), "date")
+    assert [z["date-parts"] for z in issued] == [[2020, 1, 31], [2019]]
+    for key, kind in [
+        ("issued", "date"),
+        ("indexed", "date"),
+        ("author", "contributors"),
+        ("license", "json"),
+    ]:
+        assert decode(encode(column(key), kind), kind) == column(key)
+
+
+def test_arrow_round_trip(tmp_path):
+    """WorksContainer: to_parquet and from_parquet keep the works"""
+    pytest.importorskip("pyarrow")
+    x = WorksContainer(work_list(ITEMS))
+    table = x.to_arrow()
+    assert table.num_rows == 2
+    assert (
+        table.schema.field("issued").type["date-parts"].type.value_type.bit_width == 32
+    )
+    assert (
+        str(table.schema.field("indexed").type["date-time"].type)
+        == "timestamp[s, tz=UTC]"
+    )
+    path = tmp_path / "works.parquet"
+    x.to_parquet(path)
+    y = WorksContainer.from_parquet(path)
+    assert len(y) == 2
+    assert y.doi == ["10.1/a", "10.1/b"]
+    assert y.references_count == [3, 0]
+    assert y.issued == column("issued")
+    assert y.indexed == column("indexed")
+    assert y.author == column("author")
+    assert y["10.1/B"] == ITEMS[1]
+    assert "works" not in vars(y)
+    assert y.works == ITEMS
+    assert y.to_arrow() is y._table
+
+
+# works from a recorded cursor query of test-workscontainer
+API_WORKS = str(
+    Path(__file__).parent
+    / "cassettes"
+    / "test-workscontainer"
+    / "test_workscontainer_with_cursor.yaml"
+)
+
+
+@pytest.mark.vcr(API_WORKS)
+def test_arrow_round_trip_api_works(tmp_path):
+    """WorksContainer: works from the API keep contributors as structs"""
+    pa = pytest.importorskip("pyarrow")
+    res = Crossref().members(ids=98, works=True, limit=5, cursor="*", cursor_max=20)
+    x = WorksContainer(res)
+    table = x.to_arrow()
+    author = table.schema.field("author")
+    assert author.metadata[b"habanero"] == b"contributors"
+    assert pa.types.is_struct(author.type.value_type)
+    assert "role" in author.type.value_type.names
+    path = tmp_path / "works.parquet"
+    x.to_parquet(path)
+    y = WorksContainer.from_parquet(path)
+    assert y.author == x.author
+    assert y.works == x.works
+
+
+def test_arrow_needs_pyarrow():
+    """WorksContainer: to_arrow without pyarrow raises ImportError"""
+    from habanero import arrow
+
+    if arrow._has_pyarrow:
+        pytest.skip("pyarrow is installed")
+    with pytest.raises(ImportError):
+        WorksContainer(work_list(ITEMS)).to_arrow()
@@ -0,0 +1,123 @@
+import asyncio
+
+import httpx2
+import pytest
+
+from habanero import (
+    AsyncCrossref,
+    AsyncSession,
+    MemoryCache,
+    Retry,
+    async_content_negotiation,
+)
+
+from .helpers import mock_async_crossref, work_list
+
+
+def work(doi):
+    return {"status": "ok", "message-type": "work", "message": {"DOI": doi}}
+
+
+def numbered(n):
+    return [{"DOI": "10.1/%s" % i} for i in range(n)]
+
+
+async def handler(request):
+    path = request.url.path
+    if path == "/works":
+        if request.url.params.get("cursor"):
+            return httpx2.Response(
+                200, json=work_list(numbered(20), total=50, cursor="abc")
+            )
+        return httpx2.Response(200, json=work_list(numbered(20), total=50))
+    doi = path.replace("/works/", "", 1)
+    if doi == "10.1/missing":
+        return httpx2.Response(404, text="Resource not found.")
+    if path.startswith("/10."):
+        return httpx2.Response(200, text="citation for %s" % path[1:])
+    return httpx2.Response(200, json=work(doi))
+
+
+def test_async_works():
+    """AsyncCrossref: works query"""
+
+    async def main():
+        async with mock_async_crossref(handler) as cr:
+            return await cr.works(query="ecology", limit=20)
+
+    res = asyncio.run(main())
+    assert isinstance(res, dict)
+    assert len(res["message"]["items"]) == 20
+
+
+def test_async_works_ids_keep_order():
+    """AsyncCrossref: many ids, results in input order"""
+    dois = ["10.1/%s" % i for i in range(30)]
+
+    async def main():
+        async with mock_async_crossref(handler) as cr:
+            return await cr.works(ids=dois)
+
+    res = asyncio.run(main())
+    assert [z["message"]["DOI"] for z in res] == dois
+
+
+def test_async_works_ids_warn():
+    """AsyncCrossref: warn=True gives None for failed ids"""
+
+    async def main():
+        async with mock_async_crossref(handler) as cr:
+            return await cr.works(ids=["10.1/a", "10.1/missing"], warn=True)
+
+    with pytest.warns(UserWarning):
+        res = asyncio.run(main())
+    assert res[0]["message"]["DOI"] == "10.1/a"
+    assert res[1] is None
+
+
+def test_async_works_cursor():
+    """AsyncCrossref: deep paging with cursor"""
+
+    async def main():
+        async with mock_async_crossref(handler) as cr:
+            return await cr.works(query="widget", cursor="*", cursor_max=50)
+
+    res = asyncio.run(main())
+    assert isinstance(res, list)
+    assert sum(len(z["message"]["items"]) for z in res) == 60
+
+
+def test_async_works_cursor_max_none():
+    """AsyncCrossref: deep paging with no cursor_max stops at total-results"""
+
+    async def main():
+        async with mock_async_crossref(handler) as cr:
+            return await cr.works(query="widget", cursor="*", cursor_max=None)
+
+    res = asyncio.run(main())
+    assert isinstance(res, list)
+    assert sum(len(z["message"]["items"]) for z in res) == 60
+
+
+def test_async_session_settings_with_session():
+    """AsyncCrossref: settings of the session given with a session raise"""
+
+    async def main():
+        async with AsyncSession(transport=httpx2.MockTransport(handler)) as s:
+            with pytest.raises(ValueError, match="retry, cache"):
+                AsyncCrossref(session=s, retry=Retry(), cache=MemoryCache())
+
+    asyncio.run(main())
+
+
+def test_async_content_negotiation():
+    """async_content_negotiation: many DOIs"""
+
+    async def main():
+        async with AsyncSession(transport=httpx2.MockTransport(handler)) as s:
+            return await async_content_negotiation(
+                ids=["10.1/a", "10.1/b"], citation_format="text", session=s
+            )
+
+    res = asyncio.run(main())
+    assert res == ["citation for 10.1/a", "citation for 10.1/b"]
@@ -0,0 +1,82 @@
+import asyncio
+
+import httpx2
+import pytest
+
+from .helpers import mock_async_crossref, mock_crossref, work_list
+
+requests_seen = []
+
+
+def handler(request):
+    requests_seen.append(request)
+    filt = request.url.params.get("filter")
+    if filt is None:
+        doi = request.url.path.replace("/works/", "", 1)
+        work = {"status": "ok", "message-type": "work", "message": {"DOI": doi}}
+        return httpx2.Response(200, json=work)
+    dois = [z.split(":", 1)[1] for z in filt.split(",")]
+    # Crossref gives back DOIs in upper/lower case as deposited
+    items = [{"DOI": z.upper(), "title": [z]} for z in dois if "missing" not in z]
+    return httpx2.Response(200, json=work_list(items))
+
+
+async def async_handler(request):
+    return handler(request)
+
+
+cr = mock_crossref(handler)
+dois = ["10.1/%s" % i for i in range(250)]
+
+
+def test_batch_size_fewer_requests():
+    """batch_size: one request per batch, results in order"""
+    requests_seen.clear()
+    res = cr.works(ids=dois, batch_size=100)
+    assert len(requests_seen) == 3
+    assert [z["message"]["title"][0] for z in res] == dois
+    assert all(z["message-type"] == "work" for z in res)
+
+
+def test_batch_size_missing_dois_are_none():
+    """batch_size: DOIs not found come back as None"""
+    res = cr.works(
+        ids=["10.1/a", "10.1/missing", "https://doi.org/10.1/B"], batch_size=10
+    )
+    assert res[0]["message"]["DOI"] == "10.1/A"
+    assert res[1] is None
+    assert res[2]["message"]["DOI"] == "10.1/B"
+    with pytest.warns(UserWarning, match="10.1/missing"):
+        cr.works(ids=["10.1/a", "10.1/missing"], batch_size=10, warn=True)
+
+
+def test_batch_size_select_adds_doi():
+    """batch_size: DOI is always selected"""
+    requests_seen.clear()
+    cr.works(ids=dois[:3], batch_size=10, select=["title"])
+    assert requests_seen[0].url.params["select"] == "title,DOI"
+
+
+def test_batch_size_comma_dois_looked_up_alone():
+    """batch_size: DOIs with commas can't go in a filter"""
+    requests_seen.clear()
+    res = cr.works(ids=["10.1/a", "10.1/b,c"], batch_size=10, max_workers=2)
+    assert len(requests_seen) == 2
+    assert res[1]["message"]["DOI"] == "10.1/b,c"
+
+
+def test_batch_size_fails_well():
+    """batch_size: must be 1 to 1000"""
+    with pytest.raises(ValueError):
+        cr.works(ids=dois, batch_size=5000)
+
+
+def test_batch_size_async():
+    """batch_size: AsyncCrossref"""
+
+    async def main():
+        async with mock_async_crossref(async_handler) as acr:
+            return await acr.works(ids=dois, batch_size=100, max_workers=2)
+
+    res = asyncio.run(main())
+    assert [z["message"]["title"][0] for z in res] == dois
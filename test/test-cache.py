@@ -0,0 +1,171 @@
+import gzip
+import json
+
+import httpx2
+import pytest
+
+from habanero import Cache, MemoryCache, Session, SQLiteCache
+from habanero.cache import cache_key
+
+from .helpers import mock_crossref
+
+requests_seen = []
+
+
+def handler(request):
+    requests_seen.append(request)
+    if request.url.path.endswith("missing"):
+        return httpx2.Response(404, text="Resource not found.")
+    body = {"status": "ok", "message-type": "work", "message": {"DOI": "10.1/a"}}
+    return httpx2.Response(
+        200,
+        content=gzip.compress(json.dumps(body).encode()),
+        headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+    )
+
+
+def test_cache_memory_hit():
+    """MemoryCache: second request comes from the cache"""
+    requests_seen.clear()
+    cr = mock_crossref(handler, cache=MemoryCache())
+    first = cr.works(ids="10.1/a")
+    second = cr.works(ids="10.1/a")
+    assert first == second
+    assert len(requests_seen) == 1
+    assert cr.session.stats["cache_hits"] == 1
+    assert cr.session.stats["cache_misses"] == 1
+
+
+def test_cache_errors_not_cached():
+    """MemoryCache: failed requests aren't cached"""
+    requests_seen.clear()
+    cr = mock_crossref(handler, cache=MemoryCache())
+    with pytest.warns(UserWarning):
+        cr.works(ids=["10.1/missing", "10.1/missing"], warn=True)
+    assert len(requests_seen) == 2
+
+
+def test_cache_sample_cursor_not_cached():
+    """MemoryCache: random samples and cursor pages aren't cached"""
+    requests_seen.clear()
+    cr = mock_crossref(handler, cache=MemoryCache())
+    url = "https://api.crossref.org/works"
+    for params in ({"sample": 3}, {"sample": 3}, {"cursor": "*"}, {"cursor": "*"}):
+        cr.session.get(url, params=params)
+    assert len(requests_seen) == 4
+    assert len(cr.session.cache) == 0
+
+
+def test_cache_memory_lru():
+    """MemoryCache: least recently used responses are dropped"""
+    cr = mock_crossref(handler, cache=MemoryCache(maxsize=2))
+    cr.works(ids=["10.1/a", "10.1/b", "10.1/c"])
+    assert len(cr.session.cache) == 2
+
+
+def test_cache_abstract():
+    """Cache: subclasses must implement get, set, delete and clear"""
+
+    class Partial(Cache):
+        def get(self, key):
+            return self.ttl_for(key)
+
+    with pytest.raises(TypeError):
+        Partial()
+    with pytest.raises(TypeError):
+        Cache()
+
+
+def test_cache_route_ttls():
+    """Cache: per route ttls, longest prefix wins"""
+    cache = MemoryCache(ttl=60, route_ttls={"/works": 10, "/works/10.1": 5})
+    assert cache.ttl_for("https://api.crossref.org/works?query=x") == 10
+    assert cache.ttl_for("https://api.crossref.org/works/10.1/a") == 5
+    assert cache.ttl_for("https://api.crossref.org/members") == 60
+    assert MemoryCache().ttl_for("https://api.crossref.org/types") == 7 * 86400
+
+
+def test_cache_expired():
+    """Cache: expired responses are fetched again"""
+    requests_seen.clear()
+    cr = mock_crossref(handler, cache=MemoryCache(ttl=0))
+    cr.works(ids="10.1/a")
+    cr.works(ids="10.1/a")
+    assert len(requests_seen) == 2
+
+
+def test_cache_key_canonical():
+    """Cache: keys don't depend on parameter or filter order"""
+    url = "https://api.crossref.org/works"
+    a = cache_key(url, {"rows": "5", "filter": "has-funder:true,type:book"})
+    b = cache_key(url, {"filter": "type:book,has-funder:true", "rows": "5"})
+    assert a == b
+    assert a != cache_key(url, {"rows": "6"})
+    assert cache_key(url, headers={"Accept": "text/x-bibliography"}) != cache_key(url)
+
+
+def test_cache_sqlite_shared(tmp_path):
+    """SQLiteCache: responses are shared through the file"""
+    requests_seen.clear()
+    path = tmp_path / "cache.sqlite"
+    first = mock_crossref(handler, cache=SQLiteCache(path)).works(ids="10.1/a")
+    second = mock_crossref(handler, cache=SQLiteCache(path)).works(ids="10.1/a")
+    assert first == second
+    assert len(requests_seen) == 1
+
+
+def validating(etag):
+    """a handler answering 304 when the client already has `etag`"""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        if request.headers.get("If-None-Match") == etag:
+            return httpx2.Response(304, headers={"ETag": etag})
+        work = {"status": "ok", "message-type": "work", "message": {"DOI": "10.1/a"}}
+        return httpx2.Response(
+            200, json=work, headers={"ETag": etag, "Last-Modified": "Mon, 1 Jan 2024"}
+        )
+
+    return handler, seen
+
+
+def test_cache_revalidated():
+    """Cache: expired responses with an ETag are revalidated"""
+    handler, seen = validating('"v1"')
+    cr = mock_crossref(handler, cache=MemoryCache(ttl=0))
+    session = cr.session
+    first = cr.works(ids="10.1/a")
+    second = cr.works(ids="10.1/a")
+    assert first == second
+    assert len(seen) == 2
+    assert seen[1].headers["If-None-Match"] == '"v1"'
+    assert seen[1].headers["If-Modified-Since"] == "Mon, 1 Jan 2024"
+    stats = session.stats
+    assert stats["cache_misses"] == 1
+    assert stats["cache_revalidated"] == 1
+    assert stats["cache_bytes_saved"] > 0
+    assert "cache_hits" not in stats
+
+
+def test_cache_revalidated_changed():
+    """Cache: a changed response replaces the cached one"""
+    handler, seen = validating('"v2"')
+    cache = MemoryCache(ttl=0)
+    session = Session(transport=httpx2.MockTransport(handler), cache=cache)
+    url = "https://api.crossref.org/works/10.1/a"
+    cache.set(
+        cache_key(url),
+        {
+            "url": url,
+            "status": 200,
+            "headers": [("etag", '"v1"')],
+            "content": b"{}",
+            "expires": 0,
+        },
+    )
+    r = session.get(url)
+    assert r.status_code == 200
+    assert seen[0].headers["If-None-Match"] == '"v1"'
+    assert session.stats["cache_misses"] == 1
+    assert dict(cache.get(cache_key(url))["headers"])["etag"] == '"v2"'
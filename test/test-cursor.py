@@ -1,7 +1,10 @@
+import httpx2
 import pytest
 
 from habanero import Crossref, exceptions
 
+from .helpers import mock_crossref, work_list
+
 cr = Crossref()
 
 
@@ -40,3 +43,19 @@ def test_cursor_fails_cursor_value():
 def test_cursor_fails_cursor_max():
     with pytest.raises(ValueError):
         cr.works(query="widget", cursor="*", cursor_max="thing")  # ty: ignore[invalid-argument-type]
+
+
+def test_cursor_max_none():
+    """cursor works - cursor_max=None fetches every page"""
+
+    def handler(request):
+        start = int(request.url.params["cursor"].replace("*", "0"))
+        items = [{"DOI": "10.1/%s" % i} for i in range(start, start + 20)]
+        return httpx2.Response(
+            200, json=work_list(items, total=50, cursor=str(start + 20))
+        )
+
+    cr = mock_crossref(handler)
+    res = cr.works(query="widget", cursor="*", cursor_max=None, limit=20)
+    assert len(res) == 3
+    assert sum(len(z["message"]["items"]) for z in res) >= 50
@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+import httpx2
+import pytest
+
+from habanero import Crossref, RequestError
+from habanero.decoder import json_decoder
+from habanero.habanero_utils import check_json, json_err_message
+
+from .helpers import mock_async_crossref, mock_crossref
+
+
+def work_response(request):
+    if request.url.path == "/works":
+        message = {"total-results": 1, "items": [{"DOI": "10.1/a"}]}
+        return httpx2.Response(
+            200,
+            json={"status": "ok", "message-type": "work-list", "message": message},
+        )
+    return httpx2.Response(
+        200,
+        json={"status": "ok", "message-type": "work", "message": {"DOI": "10.1/a"}},
+    )
+
+
+def error_response(_request):
+    return httpx2.Response(
+        400,
+        json={
+            "status": "failed",
+            "message-type": "validation-failure",
+            "message": [{"message": "bad filter"}],
+        },
+    )
+
+
+def counting_decoder(calls):
+    def decode(x):
+        calls.append(x)
+        return json.loads(x)
+
+    return decode
+
+
+def test_decoder_names():
+    """decoder: 'json' is the standard library, unknown names fail"""
+    assert json_decoder("json") is json.loads
+    assert callable(json_decoder())
+    assert callable(json_decoder("auto"))
+    with pytest.raises(ValueError):
+        json_decoder("simdjson")
+
+
+def test_decoder_orjson():
+    """decoder: 'orjson' uses orjson.loads"""
+    orjson = pytest.importorskip("orjson")
+    assert json_decoder("orjson") is orjson.loads
+
+
+def test_decoder_msgspec():
+    """decoder: 'msgspec' decodes, raising ValueError on bad JSON"""
+    pytest.importorskip("msgspec")
+    decode = json_decoder("msgspec")
+    assert decode(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    with pytest.raises(ValueError):
+        decode(b"{")
+
+
+def test_decoder_custom_function():
+    """decoder: a function passed in decodes every response"""
+    calls = []
+    cr = mock_crossref(work_response, decoder=counting_decoder(calls))
+    res = cr.works(ids="10.1/a")
+    assert res["message"]["DOI"] == "10.1/a"
+    cr.works(query="ecology", cursor="*", cursor_max=1)
+    assert len(calls) == 2
+    assert all(isinstance(z, bytes) for z in calls)
+
+
+def test_decoder_errors():
+    """decoder: error messages are decoded with the session decoder"""
+    calls = []
+    cr = mock_crossref(error_response, decoder=counting_decoder(calls))
+    with pytest.raises(RequestError, match="bad filter"):
+        cr.works(query="ecology")
+    assert len(calls) == 1
+
+
+def test_decoder_error_not_json():
+    """decoder: a non JSON error body raises HTTPStatusError"""
+    cr = mock_crossref(
+        lambda _request: httpx2.Response(503, text="Service Unavailable")
+    )
+    with pytest.raises(httpx2.HTTPStatusError):
+        cr.works(query="ecology")
+
+
+def test_check_json_content_type():
+    """check_json: JSON content types with parameters pass, others fail"""
+    request = httpx2.Request("GET", "https://api.crossref.org/works")
+    ok = httpx2.Response(
+        200, headers={"Content-Type": "application/json;charset=UTF-8"}, request=request
+    )
+    check_json(ok)
+    html = httpx2.Response(200, text="<html></html>", request=request)
+    with pytest.raises(RequestError):
+        check_json(html)
+
+
+def test_json_err_message():
+    """json_err_message: string and list messages, and bodies without one"""
+    assert json_err_message({"message": "Invalid filter"}) == "Invalid filter"
+    assert json_err_message({"message": [{"message": "Not found"}]}) == "Not found"
+    assert json_err_message({"status": "failed"}) == "failed to parse error message"
+    assert json_err_message([]) == "failed to parse error message"
+
+
+def test_string_error_message():
+    """decoder: a string error message raises RequestError on every path"""
+
+    def not_found(_request):
+        return httpx2.Response(404, json={"status": "failed", "message": "Not found"})
+
+    cr = mock_crossref(not_found)
+    with pytest.raises(RequestError, match="Not found"):
+        cr.licenses()
+    with pytest.raises(RequestError, match="Not found"):
+        cr.works(query="ecology")
+
+
+def test_decoder_crossref_param():
+    """decoder: Crossref passes decoder to the session it creates"""
+    cr = Crossref(decoder="json")
+    assert cr.session.decoder is json.loads
+    cr.close()
+
+
+def test_decoder_async():
+    """decoder: AsyncSession decodes with its decoder"""
+    calls = []
+
+    async def run():
+        decoder = counting_decoder(calls)
+        async with mock_async_crossref(work_response, decoder=decoder) as cr:
+            return await cr.works(ids=["10.1/a", "10.1/b"])
+
+    res = asyncio.run(run())
+    assert [z["message"]["DOI"] for z in res] == ["10.1/a", "10.1/a"]
+    assert len(calls) == 2
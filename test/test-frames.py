@@ -0,0 +1,169 @@
+import pytest
+
+from habanero import WorksContainer
+from habanero.frames import (
+    date_parts,
+    flat_date_parts,
+    item_columns,
+    page_items,
+    to_pandas,
+    to_polars,
+)
+
+from .helpers import work_list
+
+ITEMS = [
+    {
+        "DOI": "10.1/a",
+        "type": "journal-article",
+        "publisher": "Pub A",
+        "issued": {"date-parts": [[2020, 1, 31]]},
+        "references-count": 3,
+    },
+    {
+        "DOI": "10.1/b",
+        "type": "journal-article",
+        "issued": {"date-parts": [[2019]]},
+        "references-count": 0,
+        "score": 1.5,
+    },
+    {
+        "DOI": "10.1/c",
+        "type": "book",
+        "publisher": "Pub A",
+        "issued": {"date-parts": [[None]]},
+    },
+]
+
+
+# two pages of a cursor query
+PAGES = [work_list(ITEMS[:2]), work_list(ITEMS[2:])]
+
+
+def test_page_items():
+    """frames: items of a response, of cursor pages, or of a list of items"""
+    assert list(page_items(work_list(ITEMS))) == ITEMS
+    assert list(page_items(PAGES)) == ITEMS
+    assert list(page_items(ITEMS)) == ITEMS
+    work = {"status": "ok", "message-type": "work", "message": ITEMS[0]}
+    assert list(page_items([work])) == ITEMS[:1]
+    with pytest.raises(TypeError):
+        list(page_items({"message-type": "member", "message": {}}))
+
+
+def test_item_columns():
+    """frames: a column per key of any item, None where it's missing"""
+    cols = item_columns(page_items(PAGES))
+    assert list(cols) == [
+        "DOI",
+        "type",
+        "publisher",
+        "issued",
+        "references-count",
+        "score",
+    ]
+    assert all(len(z) == 3 for z in cols.values())
+    assert cols["publisher"] == ["Pub A", None, "Pub A"]
+    assert cols["score"] == [None, 1.5, None]
+    assert cols["references-count"] == [3, 0, None]
+
+
+def test_date_parts():
+    """frames: missing months and days are 1, missing dates None"""
+    y, m, d = date_parts([z["issued"] for z in ITEMS] + [None])
+    assert y == [2020, 2019, None, None]
+    assert m == [1, 1, None, None]
+    assert d == [31, 1, None, None]
+
+
+def test_to_pandas():
+    """frames: to_pandas from cursor pages, with typed columns"""
+    pd = pytest.importorskip("pandas")
+    df = to_pandas(PAGES)
+    assert len(df) == 3
+    assert list(df["DOI"]) == ["10.1/a", "10.1/b", "10.1/c"]
+    assert df["issued"].dtype.kind == "M"
+    assert df["issued"][0] == pd.Timestamp(2020, 1, 31)
+    assert df["issued"][1] == pd.Timestamp(2019, 1, 1)
+    assert pd.isna(df["issued"][2])
+    assert str(df["references-count"].dtype) == "Int64"
+    assert str(df["type"].dtype) == "category"
+    assert str(df["publisher"].dtype) == "category"
+    assert str(df["score"].dtype) == "float64"
+    x = WorksContainer(PAGES)
+    assert str(x.to_pandas()["type"].dtype) == "category"
+    assert str(WorksContainer(PAGES[:1]).to_pandas()["references-count"].dtype) == (
+        "int64"
+    )
+
+
+def test_to_polars():
+    """frames: to_polars from cursor pages, with typed columns"""
+    pl = pytest.importorskip("polars")
+    df = to_polars(PAGES)
+    assert df.height == 3
+    assert df["issued"].dtype == pl.Datetime
+    assert df["issued"].null_count() == 1
+    assert df["references-count"].dtype == pl.Int64
+    assert df["type"].dtype == pl.Categorical
+    assert WorksContainer(PAGES).to_polars()["DOI"].to_list() == [
+        "10.1/a",
+        "10.1/b",
+        "10.1/c",
+    ]
+
+
+def test_frames_need_pandas_or_polars():
+    """frames: without pandas or polars, to_pandas and to_polars raise"""
+    from habanero import frames
+
+    if frames._has_pandas and frames._has_polars:
+        pytest.skip("pandas and polars are installed")
+    if not frames._has_pandas:
+        with pytest.raises(ImportError):
+            WorksContainer(PAGES).to_pandas()
+    if not frames._has_polars:
+        with pytest.raises(ImportError):
+            to_polars(PAGES)
+
+
+def test_flat_date_parts():
+    """frames: date parts as years, months and days, 0 where missing"""
+    parts = [[2020, 1, 31], [2019], [2018, 5], None, [None], [2017, 2, 3, 4]]
+    assert flat_date_parts(parts) == [
+        *(2020, 1, 31),
+        *(2019, 0, 0),
+        *(2018, 5, 0),
+        *(0, 0, 0),
+        *(0, 0, 0),
+        *(2017, 2, 3),
+    ]
+
+
+def test_dates():
+    """WorksContainer: dates as datetime64, with their precision"""
+    np = pytest.importorskip("numpy")
+    items = [*ITEMS, {"DOI": "10.1/d", "issued": {"date-parts": [[2018, 5]]}}]
+    dates, precision = WorksContainer(work_list(items)).dates("issued")
+    assert dates.dtype == np.dtype("datetime64[D]")
+    assert list(dates[[0, 1, 3]]) == [
+        np.datetime64("2020-01-31"),
+        np.datetime64("2019-01-01"),
+        np.datetime64("2018-05-01"),
+    ]
+    assert np.isnat(dates[2])
+    assert list(precision) == ["day", "year", "", "month"]
+    with pytest.raises(ValueError):
+        WorksContainer(PAGES).dates("publisher")
+    with pytest.raises(ValueError):
+        WorksContainer(PAGES).dates("deposited")
+
+
+def test_dates_need_numpy():
+    """WorksContainer: dates without numpy raises ImportError"""
+    from habanero import frames
+
+    if frames._has_numpy:
+        pytest.skip("numpy is installed")
+    with pytest.raises(ImportError):
+        WorksContainer(PAGES).dates("issued")
@@ -0,0 +1,114 @@
+import itertools
+import json
+
+import httpx2
+import pytest
+
+from habanero import Checkpoint
+
+from .helpers import mock_crossref
+
+TOTAL = 95
+ROWS = 20
+WORKS = [
+    {
+        "DOI": "10.1/%s" % i,
+        "indexed": {"date-time": "2024-01-%02dT00:00:00Z" % (i // 10 + 1)},
+    }
+    for i in range(TOTAL)
+]
+
+
+def handler(request, stale):
+    """cursor paging sorted by indexed date, with cursors in `stale` expired once"""
+    params = request.url.params
+    assert params["sort"] == "indexed"
+    assert params["order"] == "asc"
+    cursor = params["cursor"]
+    if cursor in stale:
+        stale.remove(cursor)
+        error = {"status": "failed", "message": [{"message": "cursor expired"}]}
+        return httpx2.Response(400, json=error)
+    works = WORKS
+    filt = params.get("filter")
+    if filt:
+        since = filt.replace("from-index-date:", "")
+        works = [z for z in WORKS if z["indexed"]["date-time"][:10] >= since]
+    start = 0 if cursor == "*" else int(cursor)
+    rows = int(params.get("rows", ROWS))
+    message = {
+        "total-results": len(works),
+        "items": works[start : start + rows],
+        "next-cursor": str(start + rows),
+    }
+    return httpx2.Response(
+        200, json={"status": "ok", "message-type": "work-list", "message": message}
+    )
+
+
+def crossref(stale=()):
+    stale = list(stale)
+    return mock_crossref(lambda request: handler(request, stale))
+
+
+def test_harvest_works(tmp_path):
+    """harvest_works: yields every item and marks the checkpoint done"""
+    path = tmp_path / "ckpt.json"
+    items = list(crossref().harvest_works(path, limit=ROWS))
+    assert [z["DOI"] for z in items] == [z["DOI"] for z in WORKS]
+    state = json.loads(path.read_text())
+    assert state["done"]
+    assert state["count"] == TOTAL
+    assert list(crossref().harvest_works(path, limit=ROWS)) == []
+
+
+def test_harvest_works_resumes(tmp_path):
+    """harvest_works: carries on from the last page consumed"""
+    ckpt = Checkpoint(tmp_path / "ckpt.json")
+    it = crossref().harvest_works(ckpt, limit=ROWS)
+    list(itertools.islice(it, 25))
+    it.close()
+    assert ckpt.load()["count"] == ROWS
+    rest = list(crossref().harvest_works(ckpt, limit=ROWS))
+    assert [z["DOI"] for z in rest] == [z["DOI"] for z in WORKS[ROWS:]]
+
+
+def test_harvest_works_stale_cursor(tmp_path):
+    """harvest_works: restarts from the last indexed date when a cursor expires"""
+    ckpt = Checkpoint(tmp_path / "ckpt.json")
+    it = crossref().harvest_works(ckpt, limit=ROWS)
+    list(itertools.islice(it, ROWS + 1))
+    it.close()
+    items = list(crossref(stale=("20",)).harvest_works(ckpt, limit=ROWS))
+    # restarted from 2024-01-02, the day of the last item seen
+    assert items[0]["DOI"] == "10.1/10"
+    dois = {z["DOI"] for z in items}
+    assert dois >= {z["DOI"] for z in WORKS[ROWS:]}
+    assert ckpt.load()["from_index_date"] == "2024-01-02"
+    assert ckpt.load()["done"]
+
+
+def test_harvest_works_stale_cursor_twice(tmp_path):
+    """harvest_works: restarts again when a cursor expires twice in one day"""
+    ckpt = Checkpoint(tmp_path / "ckpt.json")
+    it = crossref().harvest_works(ckpt, limit=5)
+    list(itertools.islice(it, 6))
+    it.close()
+    it = crossref(stale=("5",)).harvest_works(ckpt, limit=5)
+    list(itertools.islice(it, 6))
+    it.close()
+    assert ckpt.load()["from_index_date"] == "2024-01-01"
+    assert ckpt.load()["cursor"] == "5"
+    items = list(crossref(stale=("5",)).harvest_works(ckpt, limit=5))
+    assert {z["DOI"] for z in items} == {z["DOI"] for z in WORKS}
+    assert ckpt.load()["done"]
+
+
+def test_harvest_works_other_query(tmp_path):
+    """harvest_works: a checkpoint can't be used for another query"""
+    ckpt = Checkpoint(tmp_path / "ckpt.json")
+    next(crossref().harvest_works(ckpt, query="ecology", limit=ROWS))
+    with pytest.raises(ValueError):
+        next(crossref().harvest_works(ckpt, query="octopus", limit=ROWS))
+    ckpt.clear()
+    assert next(crossref().harvest_works(ckpt, query="octopus", limit=ROWS))
@@ -0,0 +1,130 @@
+import asyncio
+import itertools
+import time
+
+import httpx2
+import pytest
+
+from .helpers import mock_async_crossref, mock_crossref
+
+TOTAL = 95
+ROWS = 20
+
+
+def handler(request):
+    """cursor paging over TOTAL works, ROWS per page"""
+    cursor = request.url.params.get("cursor")
+    start = 0 if cursor == "*" else int(cursor)
+    items = [
+        {"DOI": "10.1/%s" % i, "path": request.url.path}
+        for i in range(start, min(start + ROWS, TOTAL))
+    ]
+    message = {
+        "total-results": TOTAL,
+        "items": items,
+        "next-cursor": str(start + ROWS),
+    }
+    return httpx2.Response(
+        200, json={"status": "ok", "message-type": "work-list", "message": message}
+    )
+
+
+async def async_handler(request):
+    return handler(request)
+
+
+def test_iter_works():
+    """iter_works: yields every item, in order"""
+    items = list(mock_crossref(handler).iter_works(cursor_max=1000))
+    assert [z["DOI"] for z in items] == ["10.1/%s" % i for i in range(TOTAL)]
+
+
+def test_iter_works_lazy():
+    """iter_works: pages are only requested as items are consumed"""
+    cr = mock_crossref(handler)
+    it = cr.iter_works()
+    assert cr.session.stats.get("requests", 0) == 0
+    list(itertools.islice(it, ROWS + 1))
+    assert cr.session.stats["requests"] == 2
+
+
+def test_iter_works_cursor_max():
+    """iter_works: cursor_max works as in works()"""
+    cr = mock_crossref(handler)
+    items = list(cr.iter_works(cursor_max=30))
+    pages = cr.works(cursor="*", cursor_max=30)
+    assert len(items) == sum(len(z["message"]["items"]) for z in pages) == 40
+
+
+def test_iter_members_and_journal_works():
+    """iter_members_works and iter_journal_works: use the works routes"""
+    cr = mock_crossref(handler)
+    assert next(cr.iter_members_works(98))["path"] == "/members/98/works"
+    assert next(cr.iter_journal_works("2167-8359"))["path"] == (
+        "/journals/2167-8359/works"
+    )
+
+
+def test_iter_works_async():
+    """AsyncCrossref.iter_works: yields every item, in order"""
+
+    async def main():
+        async with mock_async_crossref(async_handler) as cr:
+            return [z["DOI"] async for z in cr.iter_works(cursor_max=1000)]
+
+    items = asyncio.run(main())
+    assert len(items) == TOTAL
+
+
+def test_iter_works_validates():
+    """iter_works: bad parameters raise when iterating"""
+    with pytest.raises(ValueError):
+        next(mock_crossref(handler).iter_works(cursor_max="lots"))
+
+
+def wait_for(check, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not check() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return check()
+
+
+def test_iter_works_prefetch():
+    """iter_works: prefetch fetches up to that many pages ahead"""
+    cr = mock_crossref(handler)
+    it = cr.iter_works(cursor_max=1000, prefetch=2)
+    first = next(it)
+    assert first["DOI"] == "10.1/0"
+    # the first page is being processed, two more may be fetched
+    assert wait_for(lambda: cr.session.stats["requests"] == 3)
+    time.sleep(0.05)
+    assert cr.session.stats["requests"] == 3
+    rest = list(it)
+    assert [z["DOI"] for z in [first, *rest]] == ["10.1/%s" % i for i in range(TOTAL)]
+
+
+def test_iter_works_prefetch_errors():
+    """iter_works: errors while prefetching are raised in the consumer"""
+
+    def failing(request):
+        if request.url.params.get("cursor") == "40":
+            return httpx2.Response(500)
+        return handler(request)
+
+    cr = mock_crossref(failing)
+    it = cr.iter_works(cursor_max=1000, prefetch=3)
+    items = list(itertools.islice(it, 40))
+    assert len(items) == 40
+    with pytest.raises(httpx2.HTTPStatusError):
+        next(it)
+
+
+def test_iter_works_prefetch_async():
+    """AsyncCrossref.iter_works: prefetch yields every item, in order"""
+
+    async def main():
+        async with mock_async_crossref(async_handler) as cr:
+            items = cr.iter_works(cursor_max=1000, prefetch=2)
+            return [z["DOI"] async for z in items]
+
+    assert asyncio.run(main()) == ["10.1/%s" % i for i in range(TOTAL)]
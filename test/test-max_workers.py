@@ -0,0 +1,58 @@
+import threading
+import time
+
+import httpx2
+import pytest
+
+from .helpers import mock_crossref
+
+seen_threads = set()
+
+
+def handler(request):
+    seen_threads.add(threading.get_ident())
+    time.sleep(0.01)
+    path = request.url.path
+    if path.endswith("missing"):
+        return httpx2.Response(404, text="Resource not found.")
+    if path.endswith("/agency"):
+        agency = {"DOI": path, "agency": {"id": "crossref", "label": "Crossref"}}
+        return httpx2.Response(200, json={"status": "ok", "message": agency})
+    return httpx2.Response(
+        200,
+        json={"status": "ok", "message-type": "work", "message": {"DOI": path[7:]}},
+    )
+
+
+cr = mock_crossref(handler)
+dois = ["10.1/%s" % i for i in range(40)]
+
+
+def test_max_workers_keeps_order():
+    """max_workers: results come back in the order of ids"""
+    seen_threads.clear()
+    res = cr.works(ids=dois, max_workers=8)
+    assert [z["message"]["DOI"] for z in res] == dois
+    assert len(seen_threads) > 1
+
+
+def test_max_workers_warn():
+    """max_workers: warn=True gives None for each failed id"""
+    ids = ["10.1/a", "10.1/missing", "10.1/b"]
+    with pytest.warns(UserWarning, match="404 on 10.1/missing"):
+        res = cr.works(ids=ids, warn=True, max_workers=3)
+    assert res[0]["message"]["DOI"] == "10.1/a"
+    assert res[1] is None
+    assert res[2]["message"]["DOI"] == "10.1/b"
+
+
+def test_max_workers_raises():
+    """max_workers: without warn, a failed id raises"""
+    with pytest.raises(httpx2.HTTPStatusError):
+        cr.works(ids=["10.1/a", "10.1/missing"], max_workers=2)
+
+
+def test_max_workers_registration_agency():
+    """max_workers: registration_agency"""
+    res = cr.registration_agency(ids=dois[:5], max_workers=5)
+    assert res == ["Crossref"] * 5
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import httpx2
+import pytest
+
+from habanero import Crossref, WorksQuery
+
+from .helpers import mock_async_crossref, mock_crossref
+
+
+def make_handler(total, delay=0):
+    seen = []
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def handler(request):
+        params = request.url.params
+        seen.append(params)
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(delay)
+        with lock:
+            active["now"] -= 1
+        offset = int(params.get("offset", 0))
+        rows = int(params.get("rows", 20))
+        items = [
+            {"DOI": "10.1/%s" % i} for i in range(offset, min(offset + rows, total))
+        ]
+        message = {"total-results": total, "items-per-page": rows, "items": items}
+        return httpx2.Response(
+            200, json={"status": "ok", "message-type": "work-list", "message": message}
+        )
+
+    return handler, seen, active
+
+
+def test_offset_max():
+    """works: offset_max fetches pages in parallel, merged in order"""
+    handler, seen, active = make_handler(95, delay=0.02)
+    res = mock_crossref(handler).works(
+        query="x", limit=10, offset_max=1000, max_workers=4
+    )
+    assert [z["DOI"] for z in res["message"]["items"]] == [
+        "10.1/%s" % i for i in range(95)
+    ]
+    assert len(seen) == 10
+    assert active["peak"] > 1
+    assert all(z["query"] == "x" for z in seen)
+
+
+def test_offset_max_trims():
+    """works: offset_max is the max number of records"""
+    handler, seen, _ = make_handler(95)
+    res = mock_crossref(handler).works(limit=20, offset_max=30)
+    assert len(res["message"]["items"]) == 30
+    assert len(seen) == 2
+
+
+def test_offset_max_capped():
+    """works: offsets stop at 10000"""
+    handler, seen, _ = make_handler(50000)
+    res = mock_crossref(handler).works(limit=1000, offset_max=50000, max_workers=8)
+    assert max(int(z.get("offset", 0)) for z in seen) == 10000
+    assert len(res["message"]["items"]) == 11000
+
+
+def test_offset_max_with_cursor():
+    """works: offset_max can't be used with cursor"""
+    with pytest.raises(ValueError):
+        Crossref().works(cursor="*", offset_max=100)
+
+
+def test_worksquery_parallel():
+    """WorksQuery: parallel() uses offset paging"""
+    handler, seen, _ = make_handler(45)
+    q = WorksQuery(mock_crossref(handler)).query("x").limit(20).parallel(max_workers=2)
+    assert q.url == "https://api.crossref.org/works?query=x&limit=20"
+    assert len(list(q)) == 45
+    assert len(seen) == 3
+    assert q.count() == 45
+    with pytest.raises(ValueError):
+        q.members(98).execute()
+
+
+def test_worksquery_parallel_and_strategy():
+    """WorksQuery: parallel() and strategy() keep their own max_workers"""
+    q = WorksQuery(Crossref())
+    for x in (
+        q.parallel(max_workers=2).strategy(max_workers=6),
+        q.strategy(max_workers=6).parallel(max_workers=2),
+    ):
+        assert x._method_params()["max_workers"] == 2
+        assert x._max_workers == 6
+    assert "max_workers" not in q.strategy(max_workers=6)._method_params()
+
+
+def test_offset_max_async():
+    """AsyncCrossref.works: offset_max fetches pages concurrently"""
+    handler, seen, _ = make_handler(95)
+
+    async def async_handler(request):
+        return handler(request)
+
+    async def main():
+        async with mock_async_crossref(async_handler) as cr:
+            return await cr.works(limit=10, offset_max=1000)
+
+    res = asyncio.run(main())
+    assert [z["DOI"] for z in res["message"]["items"]] == [
+        "10.1/%s" % i for i in range(95)
+    ]
+    assert len(seen) == 10
@@ -0,0 +1,59 @@
+import time
+
+import httpx2
+
+from habanero import Crossref, RateLimiter
+from habanero.ratelimit import parse_interval
+
+from .helpers import mock_crossref
+
+rate_headers = {"X-Rate-Limit-Limit": "10", "X-Rate-Limit-Interval": "1s"}
+
+
+def handler(_request):
+    work = {"status": "ok", "message-type": "work", "message": {"DOI": "10.1/a"}}
+    return httpx2.Response(200, json=work, headers=rate_headers)
+
+
+def test_ratelimit_parse_interval():
+    """RateLimiter: parses interval headers"""
+    assert parse_interval("1s") == 1.0
+    assert parse_interval("2") == 2.0
+    assert parse_interval("500ms") == 0.5
+    assert parse_interval("1m") == 60.0
+    assert parse_interval("nope") is None
+    assert parse_interval(None) is None
+
+
+def test_ratelimit_no_limit_until_known():
+    """RateLimiter: no throttling until a limit is known"""
+    limiter = RateLimiter()
+    start = time.monotonic()
+    for _ in range(100):
+        limiter.acquire()
+    assert time.monotonic() - start < 0.1
+
+
+def test_ratelimit_throttles():
+    """RateLimiter: throttles to the limit after a burst"""
+    limiter = RateLimiter(limit=20, interval=1.0)
+    start = time.monotonic()
+    for _ in range(25):
+        limiter.acquire()
+    elapsed = time.monotonic() - start
+    assert 0.2 <= elapsed < 0.5
+
+
+def test_ratelimit_updated_from_responses():
+    """RateLimiter: Crossref reads limits from response headers"""
+    cr = mock_crossref(handler, rate_limiter=RateLimiter())
+    cr.works(ids="10.1/a")
+    assert cr.session.rate_limiter.limit == 10
+    assert cr.session.rate_limiter.interval == 1.0
+    assert cr.session.rate_limiter.rate == 10
+
+
+def test_ratelimit_crossref_param():
+    """RateLimiter: rate_limit param on Crossref"""
+    assert Crossref().session.rate_limiter is None
+    assert isinstance(Crossref(rate_limit=True).session.rate_limiter, RateLimiter)
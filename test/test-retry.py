@@ -0,0 +1,83 @@
+import httpx2
+import pytest
+
+from habanero import Retry
+from habanero.retry import retry_after
+
+from .helpers import mock_crossref
+
+no_wait = Retry(max_attempts=4, backoff_base=0, jitter=False)
+
+
+def flaky(failures):
+    """a handler failing with each of `failures` in turn, then succeeding"""
+    failures = list(failures)
+
+    def handler(request):
+        if failures:
+            failure = failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return httpx2.Response(failure, headers={"Retry-After": "0"})
+        work = {"status": "ok", "message-type": "work", "message": {"DOI": "10.1/a"}}
+        return httpx2.Response(200, json=work, request=request)
+
+    return handler
+
+
+def test_retry_status_codes():
+    """Retry: retries 429 and 503, and counts retries"""
+    cr = mock_crossref(flaky([429, 503]), retry=no_wait)
+    res = cr.works(ids="10.1/a")
+    assert res["message"]["DOI"] == "10.1/a"
+    assert cr.session.stats == {"requests": 3, "retries": 2}
+
+
+def test_retry_errors():
+    """Retry: retries connect errors"""
+    cr = mock_crossref(
+        flaky([httpx2.ConnectError("nope"), httpx2.ReadTimeout("slow")]), retry=no_wait
+    )
+    res = cr.works(ids="10.1/a")
+    assert res["message"]["DOI"] == "10.1/a"
+    assert cr.session.stats["retries"] == 2
+
+
+def test_retry_gives_up():
+    """Retry: gives up after max_attempts"""
+    cr = mock_crossref(flaky([503] * 10), retry=no_wait)
+    with pytest.raises(httpx2.HTTPStatusError):
+        cr.works(ids="10.1/a")
+    assert cr.session.stats == {"requests": 4, "retries": 3}
+
+
+def test_retry_not_retried():
+    """Retry: other status codes aren't retried"""
+    cr = mock_crossref(flaky([404]), retry=no_wait)
+    with pytest.raises(httpx2.HTTPStatusError):
+        cr.works(ids="10.1/a")
+    assert cr.session.stats == {"requests": 1}
+
+
+def test_retry_none():
+    """Retry: no retries by default"""
+    cr = mock_crossref(flaky([503]))
+    with pytest.raises(httpx2.HTTPStatusError):
+        cr.works(ids="10.1/a")
+
+
+def test_retry_backoff():
+    """Retry: backoff grows, is capped, and honors Retry-After"""
+    retry = Retry(backoff_base=1, backoff_max=5, jitter=False)
+    assert [retry.backoff(z) for z in range(1, 6)] == [1, 2, 4, 5, 5]
+    r = httpx2.Response(429, headers={"Retry-After": "7"})
+    assert retry.backoff(1, r) == 7
+    jittered = Retry(backoff_base=1, jitter=True)
+    assert 0 <= jittered.backoff(3) <= 4
+
+
+def test_retry_after_http_date():
+    """Retry: Retry-After as a HTTP date"""
+    assert retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+    assert retry_after("nope") is None
+    assert retry_after("2.5") == 2.5
@@ -0,0 +1,122 @@
+import threading
+import time
+
+import httpx2
+import pytest
+
+from habanero import Crossref, MemoryCache, Retry, Session
+from habanero.session import session_for
+
+from .helpers import mock_crossref
+
+
+def work_response(_request):
+    return httpx2.Response(
+        200,
+        json={"status": "ok", "message-type": "work", "message": {"DOI": "10.1/a"}},
+    )
+
+
+def test_session_reuses_one_client():
+    """Session: one client is reused across requests"""
+    cr = mock_crossref(work_response)
+    cr.works(ids="10.1/a")
+    client = cr.session.client
+    cr.works(ids=["10.1/a", "10.1/b"])
+    assert cr.session.client is client
+
+
+def test_session_context_manager_closes():
+    """Session: Crossref context manager closes its pool"""
+    with Crossref() as cr:
+        assert isinstance(cr.session.client, httpx2.Client)
+        assert not cr.session.closed
+    assert cr.session.closed
+
+
+def test_session_shared_is_left_open():
+    """Session: a session passed in is not closed by Crossref"""
+    s = Session(transport=httpx2.MockTransport(work_response))
+    with Crossref(session=s) as cr:
+        cr.works(ids="10.1/a")
+    assert not s.closed
+    s.close()
+    assert s.closed
+
+
+def test_session_settings_with_session():
+    """Session: settings of the session given with a session raise ValueError"""
+    s = Session(transport=httpx2.MockTransport(work_response))
+    for name, value in [
+        ("rate_limit", True),
+        ("retry", Retry()),
+        ("cache", MemoryCache()),
+        ("decoder", "json"),
+    ]:
+        with pytest.raises(ValueError, match=name):
+            Crossref(session=s, **{name: value})
+    cr = Crossref(session=s, rate_limit=False)
+    assert cr.session is s
+    s.close()
+
+
+def test_session_pool_settings():
+    """Session: pool settings passed through Crossref"""
+    cr = Crossref(max_connections=7, max_keepalive_connections=3, keepalive_expiry=1)
+    assert cr.session.limits.max_connections == 7
+    assert cr.session.limits.max_keepalive_connections == 3
+    assert cr.session.limits.keepalive_expiry == 1
+
+
+def test_session_max_connections_per_host():
+    """Session: max_connections_per_host caps concurrent requests to a host"""
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow_response(request):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return work_response(request)
+
+    s = Session(
+        max_connections_per_host=2, transport=httpx2.MockTransport(slow_response)
+    )
+    threads = [
+        threading.Thread(target=s.get, args=("https://api.crossref.org/works",))
+        for _ in range(6)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert 1 <= peak <= 2
+
+
+def test_session_client_options():
+    """Session: client options are used to make the client"""
+    s = Session(verify=False, trust_env=False)
+    assert s.client_options["verify"] is False
+    assert not s.client.trust_env
+    s.close()
+
+
+def test_session_for_client_options():
+    """session_for: client options in kwargs make a session for the call"""
+    shared = Session(cache=MemoryCache())
+    kwargs = {"timeout": 10}
+    with session_for(shared, kwargs) as s:
+        assert s is shared
+    kwargs = {"verify": False, "timeout": 10}
+    with session_for(shared, kwargs) as s:
+        assert s is not shared
+        assert s.client_options["verify"] is False
+        assert s.cache is shared.cache
+    assert s.closed
+    assert kwargs == {"timeout": 10}
+    shared.close()
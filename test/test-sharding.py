@@ -0,0 +1,194 @@
+import datetime
+import threading
+import time
+
+import httpx2
+import pytest
+
+from habanero.sharding import date_windows, plan_windows
+
+from .helpers import mock_crossref
+
+START = datetime.date(2024, 1, 1)
+WORKS = [
+    {"DOI": "10.1/%s" % i, "day": (START + datetime.timedelta(days=i // 4)).isoformat()}
+    for i in range(120)
+]
+ROWS = 7
+
+
+def make_handler(delay=0, fail_on=None):
+    active = {"now": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def handler(request):
+        params = request.url.params
+        filts = dict(z.split(":", 1) for z in params["filter"].split(","))
+        if filts["from-index-date"] == fail_on:
+            return httpx2.Response(500)
+        with lock:
+            active["now"] += 1
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(delay)
+        with lock:
+            active["now"] -= 1
+        works = [
+            z
+            for z in WORKS
+            if filts["from-index-date"] <= z["day"] <= filts["until-index-date"]
+        ]
+        cursor = params["cursor"]
+        start = 0 if cursor == "*" else int(cursor)
+        message = {
+            "total-results": len(works),
+            "items": works[start : start + ROWS],
+            "next-cursor": str(start + ROWS),
+        }
+        return httpx2.Response(
+            200, json={"status": "ok", "message-type": "work-list", "message": message}
+        )
+
+    return handler, active
+
+
+def test_date_windows():
+    """date_windows: disjoint windows covering every day"""
+    windows = date_windows("2024-01-01", "2024-01-10", 3)
+    assert windows == [
+        ("2024-01-01", "2024-01-03"),
+        ("2024-01-04", "2024-01-06"),
+        ("2024-01-07", "2024-01-10"),
+    ]
+    assert date_windows("2024-01-01", "2024-01-02", 5) == [
+        ("2024-01-01", "2024-01-01"),
+        ("2024-01-02", "2024-01-02"),
+    ]
+    with pytest.raises(ValueError):
+        date_windows("2024-01-02", "2024-01-01", 2)
+
+
+def test_iter_works_sharded():
+    """iter_works_sharded: yields every item once, fetching shards in parallel"""
+    handler, active = make_handler(delay=0.01)
+    cr = mock_crossref(handler)
+    items = list(
+        cr.iter_works_sharded("2024-01-01", "2024-01-30", shards=4, limit=ROWS)
+    )
+    assert sorted(z["DOI"] for z in items) == sorted(z["DOI"] for z in WORKS)
+    assert active["peak"] > 1
+
+
+def test_iter_works_sharded_errors():
+    """iter_works_sharded: errors in a shard are raised in the consumer"""
+    handler, _ = make_handler(fail_on="2024-01-16")
+    cr = mock_crossref(handler)
+    with pytest.raises(httpx2.HTTPStatusError):
+        list(cr.iter_works_sharded("2024-01-01", "2024-01-30", shards=2, limit=ROWS))
+
+
+def test_iter_works_sharded_close():
+    """iter_works_sharded: stopping early stops the shards"""
+    handler, _ = make_handler()
+    cr = mock_crossref(handler)
+    it = cr.iter_works_sharded("2024-01-01", "2024-01-30", shards=4, limit=ROWS)
+    next(it)
+    it.close()
+    time.sleep(0.3)
+    requests = cr.session.stats["requests"]
+    time.sleep(0.2)
+    assert cr.session.stats["requests"] == requests
+
+
+def dated_works(days):
+    return [{"DOI": "10.2/%s" % i, "day": day} for i, day in enumerate(days)]
+
+
+def facet_handler(works, seen):
+    """published facet counts and cursor paging over works with a `day`"""
+
+    def handler(request):
+        params = request.url.params
+        filts = dict(z.split(":", 1) for z in params["filter"].split(","))
+        seen.append(filts)
+        matches = [
+            z
+            for z in works
+            if filts["from-pub-date"] <= z["day"] <= filts["until-pub-date"]
+        ]
+        if params.get("facet") == "published:*":
+            assert params["rows"] == "0"
+            years = {}
+            for z in matches:
+                years[z["day"][:4]] = years.get(z["day"][:4], 0) + 1
+            message = {
+                "total-results": len(matches),
+                "items": [],
+                "facets": {"published": {"value-count": len(years), "values": years}},
+            }
+        else:
+            cursor = params["cursor"]
+            start = 0 if cursor == "*" else int(cursor)
+            message = {
+                "total-results": len(matches),
+                "items": matches[start : start + ROWS],
+                "next-cursor": str(start + ROWS),
+            }
+        return httpx2.Response(
+            200, json={"status": "ok", "message-type": "work-list", "message": message}
+        )
+
+    return handler
+
+
+def test_plan_windows():
+    """plan_windows: windows of about the same number of records"""
+    counts = {"2020": 10, "2021": 10, "2022": 20, "2023": 160}
+    windows = plan_windows("2020-01-01", "2023-12-31", counts, 4)
+    assert len(windows) == 4
+    assert windows[0][0][0] == "2020-01-01"
+    assert windows[-1][0][1] == "2023-12-31"
+    # most windows are in the busy last year
+    assert sum(1 for (a, _), _ in windows if a >= "2023") == 3
+    for (_, until), _ in windows[:-1]:
+        assert until < "2024"
+    assert [round(n) for _, n in windows] == [50, 50, 50, 50]
+
+
+def test_plan_shards():
+    """plan_shards: plans from the published facet"""
+    days = ["2020-06-01"] * 10 + ["2023-%02d-01" % (i % 12 + 1) for i in range(90)]
+    seen = []
+    cr = mock_crossref(facet_handler(dated_works(days), seen))
+    plan = cr.plan_shards("2020-01-01", "2023-12-31", shards=4)
+    assert len(seen) == 1
+    assert sum(z["count"] for z in plan) == 100
+    assert plan[0]["from"] == "2020-01-01"
+
+
+def test_iter_works_sharded_balance():
+    """iter_works_sharded: balanced shards, re-split when larger than planned"""
+    # the facet says 2023 is even, but most works are in December
+    days = ["2022-03-01"] * 40 + ["2023-12-%02d" % (i % 28 + 1) for i in range(150)]
+    days += ["2023-0%s-01" % (i % 9 + 1) for i in range(20)]
+    works = dated_works(days)
+    seen = []
+    cr = mock_crossref(facet_handler(works, seen))
+    items = list(
+        cr.iter_works_sharded(
+            "2022-01-01", "2023-12-31", shards=3, balance=True, limit=ROWS
+        )
+    )
+    assert sorted(z["DOI"] for z in items) == sorted(z["DOI"] for z in works)
+    windows = {(z["from-pub-date"], z["until-pub-date"]) for z in seen}
+    # the last window was split again, so there are more than the 3 planned
+    assert len({a for a, _ in windows}) > 3
+
+
+def test_iter_works_sharded_balance_date_filter():
+    """iter_works_sharded: balance only works with published dates"""
+    with pytest.raises(ValueError):
+        next(
+            mock_crossref(None).iter_works_sharded(
+                "2022-01-01", "2023-12-31", balance=True, date_filter="index"
+            )
+        )
@@ -0,0 +1,137 @@
+import asyncio
+import gzip
+import json
+
+import httpx2
+import pytest
+
+from habanero import (
+    NDJSONSink,
+    Work,
+    WorksQuery,
+)
+
+from .helpers import mock_async_crossref, mock_crossref
+
+TOTAL = 45
+ROWS = 20
+
+
+def handler(request):
+    cursor = request.url.params.get("cursor")
+    start = 0 if cursor in (None, "*") else int(cursor)
+    items = [
+        {"DOI": "10.1/%s" % i, "title": ["Ünïcode %s" % i]}
+        for i in range(start, min(start + ROWS, TOTAL))
+    ]
+    message = {"total-results": TOTAL, "items": items}
+    if cursor is not None:
+        message["next-cursor"] = str(start + ROWS)
+    return httpx2.Response(
+        200, json={"status": "ok", "message-type": "work-list", "message": message}
+    )
+
+
+async def async_handler(request):
+    return handler(request)
+
+
+def read_lines(path, opener=open):
+    with opener(path, "rt", encoding="utf-8") as f:
+        return [json.loads(z) for z in f]
+
+
+def test_sink_batches(tmp_path):
+    """NDJSONSink: lines are written in batches, and all of them on close"""
+    path = tmp_path / "out.ndjson"
+    sink = NDJSONSink(path, batch_size=3)
+    sink.write({"a": 1})
+    sink.write({"a": 2})
+    assert not path.exists()
+    sink.write({"a": 3})
+    sink.write({"a": 4})
+    assert len(path.read_bytes().splitlines()) == 3
+    sink.close()
+    assert sink.closed
+    assert read_lines(path) == [{"a": i} for i in range(1, 5)]
+    assert sink.count == 4
+    sink.close()
+    with NDJSONSink(tmp_path / "empty.ndjson"):
+        pass
+    assert (tmp_path / "empty.ndjson").read_bytes() == b""
+
+
+def test_sink_gzip_append(tmp_path):
+    """NDJSONSink: gzip output, appended to as a new member"""
+    path = tmp_path / "out.ndjson.gz"
+    with NDJSONSink(path, compress="gzip") as sink:
+        sink.write_many([{"a": 1}, {"a": 2}])
+    with NDJSONSink(path, compress="gzip", append=True) as sink:
+        sink.write({"a": 3})
+    assert read_lines(path, gzip.open) == [{"a": 1}, {"a": 2}, {"a": 3}]
+
+
+def test_sink_zstd(tmp_path):
+    """NDJSONSink: zstd output"""
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "out.ndjson.zst"
+    with NDJSONSink(path, compress="zstd") as sink:
+        sink.write_many({"a": i} for i in range(10))
+    with zstandard.open(path, "rt") as f:
+        assert [json.loads(z)["a"] for z in f] == list(range(10))
+
+
+def test_sink_work_and_fsync(tmp_path):
+    """NDJSONSink: Work records are written as their raw JSON"""
+    path = tmp_path / "out.ndjson"
+    item = {"DOI": "10.1/a", "license": [{"URL": "x"}]}
+    with NDJSONSink(path, fsync_interval=0) as sink:
+        sink.write(Work.from_dict(item))
+        sink.flush(fsync=True)
+        assert read_lines(path) == [item]
+
+
+def test_sink_bad_compress(tmp_path):
+    """NDJSONSink: unknown compression fails"""
+    with pytest.raises(ValueError):
+        NDJSONSink(tmp_path / "out", compress="bz2")
+
+
+def test_works_sink(tmp_path):
+    """works: sink writes all items of a cursor harvest"""
+    path = tmp_path / "works.ndjson.gz"
+    n = mock_crossref(handler).works(
+        cursor="*", cursor_max=1000, sink=NDJSONSink(path, compress="gzip")
+    )
+    assert n == TOTAL
+    lines = read_lines(path, gzip.open)
+    assert [z["DOI"] for z in lines] == ["10.1/%s" % i for i in range(TOTAL)]
+    assert lines[0]["title"] == ["Ünïcode 0"]
+
+
+def test_works_sink_no_ids(tmp_path):
+    """works: sink can't be used with ids"""
+    with pytest.raises(ValueError):
+        mock_crossref(handler).works(ids="10.1/a", sink=tmp_path / "x.ndjson")
+
+
+def test_worksquery_stream_to(tmp_path):
+    """WorksQuery.stream_to: writes cursor harvests and single pages"""
+    path = tmp_path / "q.ndjson"
+    q = WorksQuery(mock_crossref(handler)).query("ecology").limit(ROWS)
+    assert q.cursor(cursor_max=1000).stream_to(path) == TOTAL
+    assert len(read_lines(path)) == TOTAL
+    assert q.stream_to(path) == ROWS
+    assert len(read_lines(path)) == ROWS
+
+
+def test_async_works_sink(tmp_path):
+    """AsyncCrossref.works: sink writes all items of a cursor harvest"""
+    path = tmp_path / "works.ndjson"
+
+    async def run():
+        async with mock_async_crossref(async_handler) as cr:
+            return await cr.works(cursor="*", cursor_max=1000, sink=path)
+
+    assert asyncio.run(run()) == TOTAL
+    assert len(read_lines(path)) == TOTAL
@@ -0,0 +1,206 @@
+import asyncio
+import json
+import random
+
+import httpx2
+import pytest
+
+from habanero import RequestError, Session, Work
+from habanero.stream import ItemSplitter
+
+from .helpers import mock_async_crossref, mock_crossref
+
+TOTAL = 45
+ROWS = 20
+
+
+def page(request):
+    cursor = request.url.params.get("cursor")
+    start = 0 if cursor == "*" else int(cursor)
+    items = [
+        {"DOI": "10.1/%s" % i, "title": ['a "quoted" [title] {%s}' % i]}
+        for i in range(start, min(start + ROWS, TOTAL))
+    ]
+    message = {
+        "facets": {},
+        "next-cursor": str(start + ROWS),
+        "total-results": TOTAL,
+        "items": items,
+        "items-per-page": ROWS,
+    }
+    return json.dumps(
+        {"status": "ok", "message-type": "work-list", "message": message}
+    ).encode()
+
+
+def chunked(content, size=7):
+    for i in range(0, len(content), size):
+        yield content[i : i + size]
+
+
+def handler(request):
+    return httpx2.Response(
+        200,
+        headers={"Content-Type": "application/json"},
+        content=chunked(page(request)),
+    )
+
+
+async def async_handler(request):
+    return httpx2.Response(
+        200, headers={"Content-Type": "application/json"}, content=page(request)
+    )
+
+
+def test_item_splitter():
+    """ItemSplitter: items and envelope, whatever the chunk boundaries"""
+    doc = {
+        "message": {
+            "next-cursor": 'a\\"b]',
+            "facets": {"x": [{"items": [{"a": 1}]}]},
+            "items": [{"DOI": '10.1/"}', "n": [1, {"items": [2]}]}, {}, {"a": "\\"}],
+            "total-results": 3,
+        }
+    }
+    content = json.dumps(doc).encode()
+    for _ in range(200):
+        splitter = ItemSplitter()
+        items, i = [], 0
+        while i < len(content):
+            n = random.randint(1, 9)
+            items += splitter.feed(content[i : i + n])
+            i += n
+        assert [json.loads(z) for z in items] == doc["message"]["items"]
+        envelope = json.loads(splitter.close())
+        assert envelope["message"]["items"] == []
+        assert envelope["message"]["next-cursor"] == 'a\\"b]'
+        assert envelope["message"]["facets"] == doc["message"]["facets"]
+
+
+def test_item_splitter_unicode():
+    """ItemSplitter: characters split across chunks keep their bytes"""
+    doc = {
+        "message": {
+            "query": "Müller",
+            "items": [{"title": ["Ökologie 🐙"]}, 5, {"a": "\u00e9"}],
+        }
+    }
+    content = json.dumps(doc, ensure_ascii=False).encode()
+    for size in range(1, 8):
+        splitter = ItemSplitter()
+        items = []
+        for chunk in chunked(content, size):
+            items += splitter.feed(chunk)
+        assert [json.loads(z) for z in items] == [
+            {"title": ["Ökologie 🐙"]},
+            {"a": "é"},
+        ]
+        assert b"\xc3\x96kologie" in items[0]
+        assert json.loads(splitter.close())["message"]["query"] == "Müller"
+
+
+def test_item_splitter_incomplete():
+    """ItemSplitter: close fails on a truncated document"""
+    splitter = ItemSplitter()
+    splitter.feed(b'{"message": {"items": [{"a": 1}')
+    with pytest.raises(ValueError):
+        splitter.close()
+    splitter = ItemSplitter()
+    splitter.feed(b'{"message": {"items": [{"a": 1}, {"b": ')
+    with pytest.raises(ValueError):
+        splitter.close()
+
+
+def test_iter_works_stream():
+    """iter_works: stream=True yields the same items as pages"""
+    streamed = list(mock_crossref(handler).iter_works(cursor_max=1000, stream=True))
+    paged = list(mock_crossref(handler).iter_works(cursor_max=1000))
+    assert streamed == paged
+    assert len(streamed) == TOTAL
+
+
+def test_iter_works_stream_cursor_max():
+    """iter_works: stream=True stops at cursor_max as without stream"""
+    cr = mock_crossref(handler)
+    items = list(cr.iter_works(cursor_max=30, stream=True))
+    assert len(items) == 40
+    assert cr.session.stats["requests"] == 2
+
+
+def test_iter_works_stream_typed():
+    """iter_works: stream=True with typed=True yields Work records"""
+    works = list(
+        mock_crossref(handler).iter_works(cursor_max=1000, stream=True, typed=True)
+    )
+    assert all(isinstance(z, Work) for z in works)
+    assert works[3].doi == "10.1/3"
+    assert works[3].to_dict()["title"] == ['a "quoted" [title] {3}']
+
+
+def test_iter_works_stream_errors():
+    """iter_works: stream=True raises or warns on HTTP errors"""
+
+    def error(_request):
+        return httpx2.Response(
+            400,
+            json={"status": "failed", "message": [{"message": "bad filter"}]},
+        )
+
+    with pytest.raises(RequestError, match="bad filter"):
+        list(mock_crossref(error).iter_works(stream=True))
+
+    with pytest.warns(UserWarning):
+        assert list(mock_crossref(not_found).iter_works(stream=True, warn=True)) == []
+    with pytest.raises(ValueError):
+        list(mock_crossref(handler).iter_works(stream=True, prefetch=1))
+
+
+def not_found(_request):
+    return httpx2.Response(404, text="Resource not found.")
+
+
+async def async_not_found(request):
+    return not_found(request)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_iter_works_stream_status_error(stream):
+    """iter_works: a failed request raises the same error with or without stream"""
+    with pytest.raises(httpx2.HTTPStatusError):
+        list(mock_crossref(not_found).iter_works(stream=stream))
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_iter_works_stream_status_error_async(stream):
+    """AsyncCrossref.iter_works: the same error with or without stream"""
+
+    async def run():
+        async with mock_async_crossref(async_not_found) as cr:
+            return [z async for z in cr.iter_works(stream=stream)]
+
+    with pytest.raises(httpx2.HTTPStatusError):
+        asyncio.run(run())
+
+
+def test_session_stream_skips_cache():
+    """Session.stream: responses are read in chunks and not cached"""
+    from habanero import MemoryCache
+
+    s = Session(transport=httpx2.MockTransport(handler), cache=MemoryCache())
+    for _ in range(2):
+        with s.stream("https://api.crossref.org/works", params={"cursor": "*"}) as r:
+            chunks = list(r.iter_bytes())
+        assert len(chunks) > 1
+    assert s.stats["requests"] == 2
+    assert "cache_hits" not in s.stats
+
+
+def test_iter_works_stream_async():
+    """AsyncCrossref.iter_works: stream=True yields every item"""
+
+    async def run():
+        async with mock_async_crossref(async_handler) as cr:
+            return [z async for z in cr.iter_works(cursor_max=1000, stream=True)]
+
+    items = asyncio.run(run())
+    assert [z["DOI"] for z in items] == ["10.1/%s" % i for i in range(TOTAL)]
@@ -0,0 +1,118 @@
+import asyncio
+import json
+
+import httpx2
+
+from habanero import Work
+from habanero.work import decode_work_page
+
+from .helpers import mock_async_crossref, mock_crossref
+
+TOTAL = 45
+ROWS = 20
+
+
+def item(i):
+    return {
+        "DOI": "10.1/%s" % i,
+        "title": ["Work %s" % i],
+        "author": [
+            {
+                "given": "Ada",
+                "family": "Lovelace",
+                "sequence": "first",
+                "affiliation": [{"name": "Somewhere"}],
+            }
+        ],
+        "issued": {"date-parts": [[2020, 1, i % 28 + 1]]},
+        "container-title": ["Journal"],
+        "type": "journal-article",
+        "ISSN": ["1234-5678"],
+        "references-count": i,
+        "is-referenced-by-count": 2 * i,
+        "license": [{"URL": "http://creativecommons.org/licenses/by/4.0/"}],
+    }
+
+
+def handler(request):
+    cursor = request.url.params.get("cursor")
+    start = 0 if cursor == "*" else int(cursor)
+    items = [item(i) for i in range(start, min(start + ROWS, TOTAL))]
+    message = {
+        "total-results": TOTAL,
+        "items": items,
+        "next-cursor": str(start + ROWS),
+    }
+    return httpx2.Response(
+        200, json={"status": "ok", "message-type": "work-list", "message": message}
+    )
+
+
+async def async_handler(request):
+    return handler(request)
+
+
+def test_work_from_dict():
+    """Work: fields are attributes, the rest is kept in raw"""
+    w = Work.from_dict(item(3))
+    assert w.doi == "10.1/3"
+    assert w.title == ["Work 3"]
+    assert w.container_title == ["Journal"]
+    assert w.issn == ["1234-5678"]
+    assert w.references_count == 3
+    assert w.is_referenced_by_count == 6
+    assert w.author[0].family == "Lovelace"
+    assert w.issued.date_parts == [[2020, 1, 4]]
+    assert w.published is None
+    assert w.subject == []
+    assert w.to_dict() == item(3)
+    assert isinstance(w.raw, bytes)
+
+
+def test_work_no_dict():
+    """Work: records have no __dict__"""
+    w = Work.from_dict(item(1))
+    assert not hasattr(w, "__dict__")
+    assert w == Work.from_dict(item(1))
+    assert w != Work.from_dict(item(2))
+
+
+def test_decode_work_page():
+    """decode_work_page: items are Work, paging fields are kept"""
+    content = json.dumps(
+        {
+            "status": "ok",
+            "message-type": "work-list",
+            "message": {
+                "total-results": 1,
+                "next-cursor": "abc",
+                "items": [item(0)],
+            },
+        }
+    ).encode()
+    page = decode_work_page(content)
+    assert page["message"]["total-results"] == 1
+    assert page["message"]["next-cursor"] == "abc"
+    assert [z.doi for z in page["message"]["items"]] == ["10.1/0"]
+
+
+def test_iter_works_typed():
+    """iter_works: typed=True yields Work records across pages"""
+    cr = mock_crossref(handler)
+    works = list(cr.iter_works(cursor_max=1000, typed=True))
+    assert all(isinstance(z, Work) for z in works)
+    assert [z.doi for z in works] == ["10.1/%s" % i for i in range(TOTAL)]
+    assert works[10].to_dict()["license"][0]["URL"].startswith("http")
+
+
+def test_iter_works_typed_async():
+    """AsyncCrossref.iter_works: typed=True yields Work records"""
+
+    async def run():
+        async with mock_async_crossref(async_handler) as cr:
+            return [
+                z async for z in cr.iter_works(cursor_max=1000, typed=True, prefetch=1)
+            ]
+
+    works = asyncio.run(run())
+    assert [z.doi for z in works] == ["10.1/%s" % i for i in range(TOTAL)]
@@ -2,6 +2,8 @@ import pytest
 
 from habanero import Crossref, WorksContainer
 
+from .helpers import work_list
+
 cr = Crossref()
 
 
@@ -15,7 +17,7 @@ def test_workscontainer_with_one_id():
     assert len(x.works) == 1
     for w in dir(x):
         # print(f"{w} {not w.startswith('__')}")
-        if not w.startswith("_") and w != "works_handler":
+        if not w.startswith("_") and not callable(getattr(x, w)):
             assert isinstance(getattr(x, w), list)
             # print(isinstance(getattr(x, w), list))
 
@@ -32,7 +34,7 @@ def test_workscontainer_with_two_ids():
     assert len(x.works) == 2
     for w in dir(x):
         # print(f"{w} {not w.startswith('__')}")
-        if not w.startswith("_") and w != "works_handler":
+        if not w.startswith("_") and not callable(getattr(x, w)):
             assert isinstance(getattr(x, w), list)
             # print(isinstance(getattr(x, w), list))
 
@@ -47,7 +49,7 @@ def test_workscontainer_with_many():
     assert len(x.works) == 5
     for w in dir(x):
         # print(f"{w} {not w.startswith('__')}")
-        if not w.startswith("_") and w != "works_handler":
+        if not w.startswith("_") and not callable(getattr(x, w)):
             assert isinstance(getattr(x, w), list)
             # print(isinstance(getattr(x, w), list))
 
@@ -62,7 +64,7 @@ def test_workscontainer_with_cursor():
     assert len(x.works) == 20
     for w in dir(x):
         # print(f"{w} {not w.startswith('__')}")
-        if not w.startswith("_") and w != "works_handler":
+        if not w.startswith("_") and not callable(getattr(x, w)):
             assert isinstance(getattr(x, w), list)
             # print(isinstance(getattr(x, w), list))
 
@@ -88,3 +90,68 @@ def test_workscontainer_failure_behavior():
     res = cr.members(ids=98)
     with pytest.raises(TypeError):
         WorksContainer(res)
+
+
+def test_workscontainer_union_of_keys():
+    """WorksContainer: columns for keys missing from the first work"""
+    x = WorksContainer(
+        work_list([{"DOI": "10.1/a"}, {"DOI": "10.1/b", "container-title": ["J"]}])
+    )
+    assert x.columns == ["doi", "container_title"]
+    assert x.container_title == [None, ["J"]]
+    assert "container_title" in dir(x)
+    assert not hasattr(x, "abstract")
+
+
+def test_workscontainer_lazy_columns():
+    """WorksContainer: columns are made on first use and kept"""
+    items = [{"DOI": "10.1/%s" % i, "title": ["t%s" % i]} for i in range(5)]
+    x = WorksContainer(work_list(items))
+    assert "title" not in vars(x)
+    title = x.title
+    assert "title" in vars(x)
+    assert x.title is title
+    assert title[3] is items[3]["title"]
+
+
+def test_workscontainer_doi_lookup():
+    """WorksContainer: works by DOI, normalized, with an index made once"""
+    items = [
+        {"DOI": "10.1/ABC", "title": ["a"]},
+        {"DOI": "10.1/def", "title": ["d"]},
+        {"title": ["no doi"]},
+        {"DOI": "10.1/abc", "title": ["duplicate"]},
+    ]
+    x = WorksContainer(work_list(items))
+    assert x._index is None
+    assert x["10.1/abc"] is items[0]
+    assert x["https://doi.org/10.1/DEF"] is items[1]
+    assert x[2] is items[2]
+    assert x[-1] is items[3]
+    index = x._index
+    assert index == {"10.1/abc": 0, "10.1/def": 1}
+    assert "doi:10.1/Abc" in x
+    assert "10.1/xyz" not in x
+    assert x.get("10.1/xyz") is None
+    assert x.get("10.1/xyz", {}) == {}
+    assert x._index is index
+    with pytest.raises(KeyError):
+        x["10.1/xyz"]
+    with pytest.raises(IndexError):
+        x[4]
+
+
+def test_workscontainer_take_and_join():
+    """WorksContainer: take and join against a list of DOIs"""
+    items = [{"DOI": "10.1/%s" % i} for i in range(5)]
+    x = WorksContainer(work_list(items))
+    y = x.take(["10.1/3", "10.1/missing", "10.1/1"])
+    assert isinstance(y, WorksContainer)
+    assert y.doi == ["10.1/3", "10.1/1"]
+    assert len(x.take(["10.1/missing"])) == 0
+    dois = ["10.1/4", "https://doi.org/10.1/0", "10.1/missing"]
+    assert x.join(dois) == [("10.1/4", items[4]), (dois[1], items[0])]
+    assert x.join(dois, how="left")[2] == ("10.1/missing", None)
+    with pytest.raises(ValueError):
+        x.join(dois, how="outer")
+    assert "10.1/0" not in WorksContainer(work_list([{"title": ["t"]}]))
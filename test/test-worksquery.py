@@ -1,9 +1,13 @@
+import datetime
 from unittest.mock import patch
 
+import httpx2
 import pytest
 
 from habanero import Crossref, WorksQuery
 
+from .helpers import mock_crossref
+
 cr = Crossref()
 q = WorksQuery(cr)
 
@@ -94,3 +98,117 @@ def test_worksquery_same_as_wrapped_method_real_requests():
     result_works = cr.members(ids=98, works=True, select=["DOI", "title"], limit=3)
 
     assert result_WorksQuery == result_works
+
+
+def dated_crossref(total, seen):
+    """a Crossref on a mock API with `total` works, one a day from 2024-01-01"""
+    start = datetime.date(2024, 1, 1)
+    works = [
+        {"DOI": "10.1/%s" % i, "day": (start + datetime.timedelta(days=i)).isoformat()}
+        for i in range(total)
+    ]
+
+    def handler(request):
+        params = request.url.params
+        seen.append(params)
+        matches = works
+        for z in filter(None, params.get("filter", "").split(",")):
+            k, v = z.split(":", 1)
+            if k.startswith("from-"):
+                matches = [w for w in matches if w["day"] >= v]
+            if k.startswith("until-"):
+                matches = [w for w in matches if w["day"] <= v]
+        rows = int(params.get("rows", 20))
+        cursor = params.get("cursor")
+        offset = int(
+            params.get("offset") or (cursor if cursor not in (None, "*") else 0)
+        )
+        message = {
+            "total-results": len(matches),
+            "items": matches[offset : offset + rows],
+        }
+        if cursor:
+            message["next-cursor"] = str(offset + rows)
+        return httpx2.Response(
+            200, json={"status": "ok", "message-type": "work-list", "message": message}
+        )
+
+    return mock_crossref(handler)
+
+
+def test_worksquery_filter_sent():
+    """WorksQuery: filters are sent"""
+    seen = []
+    q = WorksQuery(dated_crossref(100, seen)).filter(from_pub_date="2024-02-01")
+    assert q.count() == 69
+    assert seen[0]["filter"] == "from-pub-date:2024-02-01"
+
+
+def test_worksquery_explain():
+    """WorksQuery: explain picks the cheapest strategy"""
+    cr = dated_crossref(100, [])
+    assert WorksQuery(cr).limit(50).explain()["strategy"] == "single"
+    q = WorksQuery(cr).cursor(cursor_max=5000)
+    with patch.object(WorksQuery, "count", return_value=8000):
+        plan = q.strategy().explain()
+        assert plan["strategy"] == "offset"
+        assert plan["requests"] == 5
+        assert set(plan["alternatives"]) == {"cursor"}
+        assert plan["seconds"] < plan["alternatives"]["cursor"]["seconds"]
+        plan = q.strategy("cursor").explain()
+        assert plan["strategy"] == "cursor"
+        assert plan["bytes"] > q.select("DOI").explain()["bytes"]
+        with pytest.raises(ValueError):
+            q.strategy("single").explain()
+    with pytest.raises(ValueError):
+        WorksQuery().strategy("fastest")
+
+
+def test_worksquery_explain_sharded():
+    """WorksQuery: explain picks sharding for large date ranges"""
+    q = WorksQuery(dated_crossref(100, [])).cursor(cursor_max=80000).strategy()
+    with patch.object(WorksQuery, "count", return_value=80000):
+        assert q.explain()["strategy"] == "cursor"
+        dated = q.filter(from_index_date="2024-01-01", until_index_date="2024-12-31")
+        plan = dated.explain()
+    assert plan["strategy"] == "sharded"
+    assert plan["requests"] == 80
+    assert "offset" not in plan["alternatives"]
+
+
+def test_worksquery_sharded_all_unordered():
+    """WorksQuery: sharding only for all the records, in no order"""
+    q = (
+        WorksQuery(dated_crossref(100, []))
+        .filter(from_index_date="2024-01-01", until_index_date="2024-12-31")
+        .cursor(cursor_max=80000)
+    )
+    with patch.object(WorksQuery, "count", return_value=80000):
+        assert q.strategy().explain()["strategy"] == "sharded"
+        for other in (
+            q.sort("published"),
+            q.order("asc"),
+            q.cursor(cursor_max=50000),
+        ):
+            plan = other.strategy().explain()
+            assert plan["strategy"] != "sharded"
+            assert "sharded" not in plan["alternatives"]
+            with pytest.raises(ValueError):
+                other.strategy("sharded").explain()
+
+
+@pytest.mark.parametrize("strategy", ["auto", "single", "cursor", "offset", "sharded"])
+def test_worksquery_strategies(strategy):
+    """WorksQuery: every strategy yields the same items"""
+    seen = []
+    q = (
+        WorksQuery(dated_crossref(100, seen))
+        .filter(from_index_date="2024-01-01", until_index_date="2024-12-31")
+        .limit(10)
+        .cursor(cursor_max=100)
+        .strategy(strategy, max_workers=3)
+    )
+    if strategy == "single":
+        q = q.limit(100)
+    items = list(q)
+    assert sorted(z["DOI"] for z in items) == sorted("10.1/%s" % i for i in range(100))